@@ -0,0 +1,55 @@
+import os
+import shutil
+import zipfile
+
+# 转换结果先写入目标文件夹中的临时文件，校验通过后再改名为最终文件名；
+# 程序崩溃或转换超时只会留下临时文件，不会留下被当作“目标已存在”的半成品
+TEMP_MARKER = ".converting"
+
+
+def is_complete_package(path):
+    """目标文件是否为可读的 ZIP 包（DOCX/XLSX），用于识别写入中断的半成品"""
+    try:
+        with zipfile.ZipFile(path) as package:
+            return "[Content_Types].xml" in package.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class OutputVerificationError(OSError):
+    """转换结果不是完整的 DOCX / XLSX 包（按写入失败处理）"""
+
+
+def temporary_path(target_path):
+    """target_path 对应的临时文件名，保留扩展名以便 Office 按格式保存"""
+    stem, ext = os.path.splitext(target_path)
+    return stem + TEMP_MARKER + ext
+
+
+def discard(temp_path):
+    """删除未完成的临时文件"""
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+
+def commit(temp_path, target_path):
+    """校验临时文件为完整的 ZIP 包后改名为目标文件，校验失败时删除临时文件"""
+    if not os.path.exists(temp_path):
+        raise OutputVerificationError("没有生成转换结果")
+    if not is_complete_package(temp_path):
+        discard(temp_path)
+        raise OutputVerificationError("转换结果不完整（ZIP 校验失败）")
+    os.replace(temp_path, target_path)
+
+
+def copy_file(source_path, target_path):
+    """复制已有的转换结果，同样先写临时文件再改名"""
+    temp_path = temporary_path(target_path)
+    try:
+        shutil.copyfile(source_path, temp_path)
+        commit(temp_path, target_path)
+    except OSError:
+        discard(temp_path)
+        raise
@@ -0,0 +1,100 @@
+"""GUI 日志刷新基准：后台线程推送大量日志消息，测量 Tk 事件循环的响应延迟
+
+每隔 PROBE_INTERVAL_MS 安排一次探测回调，回调实际执行时间比预定时间晚多少即为界面卡顿的时长。
+默认使用合并写入的 BatchedLogView，--per-message 使用逐条 insert + see 的旧实现作对比
+（旧实现处理 100 万条消息需要很长时间，可用 --messages 减少条数）。
+
+用法: python benchmarks/gui_log_latency.py [--messages 1000000] [--per-message]
+需要图形界面（Windows 桌面或设置了 DISPLAY 的环境）。
+"""
+import argparse
+import os
+import queue
+import sys
+import time
+from threading import Thread
+
+import tkinter as tk
+from tkinter import scrolledtext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_view import BatchedLogView, LOG_TICK_MS  # noqa: E402
+
+PROBE_INTERVAL_MS = 10
+DEFAULT_MESSAGES = 1_000_000
+
+
+def produce(log_queue, count):
+    """模拟转换线程：尽快推送日志消息"""
+    for i in range(count):
+        log_queue.put(f"转换成功: D:\\资料\\子目录{i % 100}\\文件{i}.docx（峰值内存 {i % 300} MB）")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(count, per_message):
+    root = tk.Tk()
+    root.title("日志刷新基准")
+    text = scrolledtext.ScrolledText(root, height=15, font=("Consolas", 9))
+    text.pack(fill="both", expand=True)
+
+    log_queue = queue.Queue()
+    view = BatchedLogView(log_queue)
+    rendered = 0
+    ticks = 0
+    latencies = []
+
+    def update_log():
+        nonlocal rendered, ticks
+        ticks += 1
+        if per_message:
+            # 旧实现：每条消息一次 insert 和一次 see
+            try:
+                while True:
+                    text.insert(tk.END, log_queue.get_nowait() + "\n")
+                    text.see(tk.END)
+                    rendered += 1
+            except queue.Empty:
+                pass
+            interval = LOG_TICK_MS
+        else:
+            interval = view.flush(text)
+            rendered = view.rendered_count
+        if rendered >= count:
+            root.quit()
+            return
+        root.after(interval, update_log)
+
+    def probe(expected):
+        latencies.append((time.perf_counter() - expected) * 1000)
+        root.after(PROBE_INTERVAL_MS, probe, time.perf_counter() + PROBE_INTERVAL_MS / 1000)
+
+    started = time.perf_counter()
+    Thread(target=produce, args=(log_queue, count), daemon=True).start()
+    root.after(LOG_TICK_MS, update_log)
+    root.after(PROBE_INTERVAL_MS, probe, time.perf_counter() + PROBE_INTERVAL_MS / 1000)
+    root.mainloop()
+    elapsed = time.perf_counter() - started
+    root.destroy()
+
+    mode = "逐条写入" if per_message else "合并写入"
+    print(f"{mode}: {count} 条消息，{ticks} 次刷新，耗时 {elapsed:.2f} 秒（{count / elapsed:.0f} 条/秒）")
+    print(f"事件循环延迟: 平均 {sum(latencies) / len(latencies):.1f} ms，"
+          f"p50 {percentile(latencies, 0.5):.1f} ms，p99 {percentile(latencies, 0.99):.1f} ms，"
+          f"最大 {max(latencies):.1f} ms（{len(latencies)} 次探测）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI 日志刷新基准")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES, help="推送的日志条数")
+    parser.add_argument("--per-message", action="store_true", help="使用逐条写入的旧实现作对比")
+    args = parser.parse_args()
+    run(args.messages, args.per_message)
+
+
+if __name__ == "__main__":
+    main()
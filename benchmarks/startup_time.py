@@ -0,0 +1,89 @@
+"""冷启动基准：在新的解释器进程中测量命令行试运行、--help 和导入 GUI 模块的耗时
+
+每项运行 --repeat 次取最短时间（排除磁盘缓存等偶然因素）；扫描类命令与 100 ms 的目标比较，
+GUI 模块要加载 tkinter 和转换调度模块，只列出耗时作参考；
+--importtime 额外用 python -X importtime 列出试运行时累计耗时最长的导入模块。
+
+用法: python benchmarks/startup_time.py [--repeat 5] [--importtime]
+导入 GUI 模块只执行到 if __name__ == "__main__" 之前，不创建窗口；
+GUI 模块导入 tkinter，没有 tkinter 的环境跳过这一项。
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(REPO_ROOT, "converter_cli.py")
+GUI_PATH = os.path.join(REPO_ROOT, "office_converter_gui-V2.1.py")
+
+TARGET_MS = 100
+DEFAULT_REPEAT = 5
+IMPORTTIME_TOP = 15
+
+
+def measure(command, repeat):
+    """运行 repeat 次，返回最短耗时（毫秒）；命令失败返回 None"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = (time.perf_counter() - started) * 1000
+        if completed.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def top_imports(command, count):
+    """用 -X importtime 运行命令，返回累计耗时最长的 count 个模块 [(微秒, 模块名)]"""
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + command[1:], cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace")
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        rows.append((int(fields[1]), fields[2].rstrip()))
+    rows.sort(reverse=True)
+    return rows[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每项运行的次数")
+    parser.add_argument("--importtime", action="store_true", help="列出试运行时累计耗时最长的导入模块")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as empty_directory:
+        dry_run = [sys.executable, CLI_PATH, "--dry-run", empty_directory]
+        # (名称, 命令, 是否与目标比较)
+        cases = [
+            ("python 空解释器", [sys.executable, "-c", "pass"], False),
+            ("converter_cli.py --dry-run", dry_run, True),
+            ("converter_cli.py --help", [sys.executable, CLI_PATH, "--help"], True),
+            ("导入 GUI 模块", [sys.executable, "-c",
+                             f"import runpy; runpy.run_path({GUI_PATH!r}, run_name='gui_startup')"], False),
+        ]
+        for name, command, checked in cases:
+            elapsed = measure(command, args.repeat)
+            if elapsed is None:
+                print(f"{name}: 运行失败，跳过")
+            elif checked:
+                verdict = "达标" if elapsed <= TARGET_MS else "超出目标"
+                print(f"{name}: {elapsed:.1f} ms（目标 {TARGET_MS} ms，{verdict}）")
+            else:
+                print(f"{name}: {elapsed:.1f} ms")
+
+        if args.importtime:
+            print(f"\n试运行累计耗时最长的 {IMPORTTIME_TOP} 个导入:")
+            for microseconds, module in top_imports(dry_run, IMPORTTIME_TOP):
+                print(f"{microseconds / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
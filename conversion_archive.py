@@ -0,0 +1,125 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+from threading import Lock
+
+# 归档文件夹中记录 原文件路径 → 归档路径 的索引（每行一条 JSON，追加写入）
+ARCHIVE_INDEX_FILE_NAME = ".archive_index.jsonl"
+
+# 源目录之外的文件按所在文件夹路径的哈希前缀分片存放
+EXTERNAL_FOLDER_NAME = "_外部文件"
+
+# Windows 上跨卷改名的错误码 ERROR_NOT_SAME_DEVICE
+ERROR_NOT_SAME_DEVICE = 17
+
+
+def _is_cross_device(error):
+    return error.errno == errno.EXDEV or getattr(error, "winerror", None) == ERROR_NOT_SAME_DEVICE
+
+
+class ArchiveTree:
+    """按源目录结构归档原文件
+
+    原文件移动到归档文件夹中与源目录相同的相对位置，不同子文件夹中的同名文件不会冲突，
+    也不会在一个文件夹中堆积数万个文件；归档位置已有同名文件时改用“名称 (1).扩展名”。
+    同一卷上的移动只是改名，不复制文件内容。每次归档都追加写入索引，可按原路径查到归档位置。
+    """
+
+    def __init__(self, archive_root, source_directory):
+        self.archive_root = os.path.abspath(archive_root)
+        self.source_directory = os.path.abspath(source_directory)
+        self.index_path = os.path.join(self.archive_root, ARCHIVE_INDEX_FILE_NAME)
+        self.moved_count = 0
+        self.renamed_count = 0
+        self._created_dirs = set()
+        self._index_file = None
+        self._lock = Lock()
+
+    def archive_path_for(self, source_path):
+        """source_path 在归档文件夹中的位置（尚未处理重名）"""
+        source_path = os.path.abspath(source_path)
+        try:
+            relative = os.path.relpath(source_path, self.source_directory)
+        except ValueError:
+            # Windows 上位于其他驱动器
+            relative = None
+        if relative is None or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            parent = os.path.dirname(source_path)
+            shard = hashlib.sha1(os.path.normcase(parent).encode("utf-8")).hexdigest()
+            relative = os.path.join(EXTERNAL_FOLDER_NAME, shard[:2], shard[2:12], os.path.basename(source_path))
+        return os.path.join(self.archive_root, relative)
+
+    def _unique_path(self, path):
+        if not os.path.exists(path):
+            return path
+        stem, ext = os.path.splitext(path)
+        counter = 1
+        while os.path.exists(f"{stem} ({counter}){ext}"):
+            counter += 1
+        return f"{stem} ({counter}){ext}"
+
+    def _ensure_dir(self, directory):
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def move(self, source_path):
+        """把原文件移入归档文件夹，返回归档路径；移动失败时抛出 OSError"""
+        with self._lock:
+            archived_path = self.archive_path_for(source_path)
+            self._ensure_dir(os.path.dirname(archived_path))
+            archived_path = self._unique_path(archived_path)
+            try:
+                os.rename(source_path, archived_path)
+                self.renamed_count += 1
+            except OSError as e:
+                if not _is_cross_device(e):
+                    raise
+                # 归档文件夹在其他卷上：复制后删除原文件
+                shutil.move(source_path, archived_path)
+            self.moved_count += 1
+            self._record(source_path, archived_path)
+            return archived_path
+
+    def _record(self, source_path, archived_path):
+        if self._index_file is None:
+            self._index_file = open(self.index_path, "a", encoding="utf-8")
+        self._index_file.write(json.dumps({"source": os.path.abspath(source_path), "archived": archived_path},
+                                          ensure_ascii=False) + "\n")
+        self._index_file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+
+    def summary(self):
+        copied = self.moved_count - self.renamed_count
+        text = f"归档原文件 {self.moved_count} 个（按源目录结构存放，索引: {self.index_path}）"
+        if copied:
+            text += f"，其中 {copied} 个跨卷复制"
+        return text
+
+
+def load_archive_index(archive_root):
+    """读取归档索引：原文件路径 → 归档路径（同一文件多次归档时取最后一次）"""
+    index = {}
+    path = os.path.join(archive_root, ARCHIVE_INDEX_FILE_NAME)
+    if not os.path.exists(path):
+        return index
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            index[record["source"]] = record["archived"]
+    return index
+
+
+def lookup_archived(archive_root, source_path):
+    """按原文件路径查找归档位置，没有记录时返回 None"""
+    return load_archive_index(archive_root).get(os.path.abspath(source_path))
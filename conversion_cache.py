@@ -0,0 +1,149 @@
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from threading import Lock
+
+import atomic_output
+
+# 缓存总大小上限（MB）
+DEFAULT_CACHE_MAX_MB = 10240
+
+CACHE_DIR_NAME = "OfficeConverterCache"
+
+
+def default_cache_dir():
+    """默认缓存目录：本机用户的 LocalAppData（非 Windows 时为主目录）下"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, CACHE_DIR_NAME)
+
+
+def cache_key(content_hash, engine_name, engine_version, options=""):
+    """缓存键：源文件内容哈希 + 引擎名称 + 引擎版本 + 影响输出的选项"""
+    return hashlib.sha256(f"{content_hash}|{engine_name}|{engine_version}|{options}".encode("utf-8")).hexdigest()
+
+
+class ConversionCache:
+    """按内容寻址的转换结果缓存，可跨运行、跨机器（共享目录）使用
+
+    每个转换结果以缓存键命名，存放在键前两位命名的子目录中；
+    命中时更新文件的修改时间作为最近使用时间，总大小超过上限时按最近使用时间淘汰最旧的条目。
+    写入先复制到临时文件再改名，多台机器同时写入同一条目也不会读到不完整的文件。
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._entries = self._scan()
+        self._total = sum(size for size, _ in self._entries.values())
+
+    def _scan(self):
+        """启动时读取已有条目：路径 → (大小, 最近使用时间)"""
+        entries = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.startswith("."):
+                    # 上次中断留下的临时文件
+                    try:
+                        if time.time() - os.stat(path).st_mtime > 3600:
+                            os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries[path] = (stat.st_size, stat.st_mtime)
+        return entries
+
+    def _path(self, key, target_ext):
+        return os.path.join(self.directory, key[:2], key + target_ext)
+
+    def fetch(self, key, target_path):
+        """命中时把缓存的转换结果复制到 target_path 并返回 True"""
+        path = self._path(key, os.path.splitext(target_path)[1])
+        try:
+            atomic_output.copy_file(path, target_path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._forget(path)
+            return False
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if path in self._entries:
+                self._entries[path] = (self._entries[path][0], now)
+        return True
+
+    def store(self, key, output_path):
+        """把新的转换结果放入缓存，必要时淘汰最久未使用的条目
+
+        缓存文件夹无法访问、写入失败或条目刚被其他机器淘汰时返回 False，不影响转换本身。
+        """
+        path = self._path(key, os.path.splitext(output_path)[1])
+        temp_path = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}.tmp")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(output_path, temp_path)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        with self._lock:
+            self.stores += 1
+            self._forget(path)
+            self._entries[path] = (size, time.time())
+            self._total += size
+            self._evict()
+        return True
+
+    def _forget(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total -= entry[0]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for path, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # 正在被其他机器读取的条目下次再淘汰
+                continue
+            self._forget(path)
+            self.evictions += 1
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+    def summary(self):
+        return (f"转换缓存: 命中 {self.hits} 次，未命中 {self.misses} 次，淘汰 {self.evictions} 个，"
+                f"当前 {len(self._entries)} 个文件，共 {self._total / (1024 * 1024):.0f} MB")
@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from collections import Counter
+
+from conversion_manifest import default_state_dir
+
+JOURNAL_FILE_NAME = ".office_converter_journal.jsonl"
+
+# 日志记录类型
+EVENT_RUN_START = "run_start"
+EVENT_SUBMITTED = "submitted"
+EVENT_DONE = "done"
+
+
+def default_journal_path(source_directory):
+    return os.path.join(default_state_dir(source_directory), JOURNAL_FILE_NAME)
+
+
+class ConversionJournal:
+    """防崩溃的断点续传日志
+
+    每个提交和完成的文件都以一行 JSON 追加写入，按批次 fsync；
+    程序崩溃或被停止后再次运行时，已完成的文件直接跳过，
+    只有提交后尚未完成（转换中断）的文件需要重新检查目标文件。
+    运行完整结束后日志文件被删除。
+    """
+
+    def __init__(self, path, sync_every=50, sync_seconds=2.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        self.completed = {}
+        self.in_flight = {}
+        self.previous_stats = Counter()
+        self.stats = Counter()
+        self.resumed = False
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def load(self):
+        """读取上次未完成运行留下的日志"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 崩溃时最后一行可能只写了一半
+                    continue
+                event = record.get("event")
+                if event == EVENT_SUBMITTED:
+                    self.in_flight[record["source"]] = record["target"]
+                elif event == EVENT_DONE:
+                    self.in_flight.pop(record["source"], None)
+                    self.completed[record["source"]] = record["status"]
+        self.previous_stats = Counter(self.completed.values())
+        self.stats = Counter(self.previous_stats)
+        self.resumed = bool(self.completed or self.in_flight)
+
+    def start_run(self):
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            # 上次崩溃时最后一行没有写完，另起一行继续追加
+            self._file.write("\n")
+        self._write({"event": EVENT_RUN_START, "time": time.time()}, force_sync=True)
+
+    def is_completed(self, source_path):
+        return source_path in self.completed
+
+    def was_interrupted(self, source_path):
+        """该文件在上次运行中已提交但未完成"""
+        return source_path in self.in_flight
+
+    def record_submitted(self, source_path, target_path):
+        self._write({"event": EVENT_SUBMITTED, "source": source_path, "target": target_path})
+
+    def record_done(self, source_path, target_path, status):
+        self.completed[source_path] = status
+        self.in_flight.pop(source_path, None)
+        self.stats[status] += 1
+        self._write({"event": EVENT_DONE, "source": source_path, "target": target_path, "status": status})
+
+    def _write(self, record, force_sync=False):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if (force_sync or self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_seconds):
+            self.sync()
+
+    def sync(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """保留日志以便下次继续"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """运行完整结束：删除日志"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+# 清单中记录的处理结果（与 conversion_pool 的结果状态取值一致）
+OUTCOME_CONVERTED = "converted"
+OUTCOME_EXISTS = "exists"
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_ERROR = "error"
+
+# 这些结果在源文件未变化时无需再次处理
+FINAL_OUTCOMES = (OUTCOME_CONVERTED, OUTCOME_EXISTS, OUTCOME_SKIPPED)
+
+MANIFEST_FILE_NAME = ".office_converter_manifest.db"
+
+STATE_DIR_NAME = "OfficeConverterState"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_state_dir(source_directory):
+    """源文件夹的转换清单和断点续传日志所在目录
+
+    放在本机用户的 LocalAppData（非 Windows 时为主目录）下、以源文件夹路径的哈希命名，
+    不写入源文件夹：写入会改变源文件夹的修改时间，下次运行时源文件夹就不能按清单跳过枚举。
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(source_directory)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(base, STATE_DIR_NAME, key)
+
+
+def default_manifest_path(source_directory):
+    return os.path.join(default_state_dir(source_directory), MANIFEST_FILE_NAME)
+
+
+class ConversionManifest:
+    """持久化转换清单（SQLite）
+
+    以源文件路径为键记录大小、修改时间、内容哈希、输出路径和处理结果，
+    再次运行时未变化的文件直接跳过；
+    上次运行中全部文件都已处理完毕、且修改时间和扫描配置（转换类型、排除规则）都未变的目录
+    不再枚举其文件，只按记录的子目录列表继续遍历。
+    发现线程和转换线程共用同一个连接，所有访问都经过锁。
+    """
+
+    def __init__(self, db_path, commit_interval=200):
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self._lock = Lock()
+        self._uncommitted = 0
+        self._scanned_dirs = {}
+        self._dirty_dirs = set()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                source_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT,
+                target_path TEXT,
+                outcome TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS directories (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                subdirs TEXT NOT NULL,
+                scan_config TEXT
+            );
+        """)
+        # 旧版清单的目录表没有 scan_config 列，补上后旧记录一律视为已变化
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(directories)")]
+        if "scan_config" not in columns:
+            self._conn.execute("ALTER TABLE directories ADD COLUMN scan_config TEXT")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def is_unchanged(self, source_path, size, mtime):
+        """源文件自上次处理后是否未变化（大小和修改时间一致，或内容哈希一致）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, content_hash, outcome FROM files WHERE source_path = ?",
+                (self._key(source_path),)
+            ).fetchone()
+        if row is None or row[3] not in FINAL_OUTCOMES or row[0] != size:
+            return False
+        if row[1] == mtime:
+            return True
+        if not row[2]:
+            return False
+        # 仅修改时间变化（例如被复制过）：比较内容哈希
+        try:
+            if hash_file(source_path) != row[2]:
+                return False
+        except OSError:
+            return False
+        with self._lock:
+            self._conn.execute("UPDATE files SET mtime = ? WHERE source_path = ?",
+                               (mtime, self._key(source_path)))
+            self._note_write()
+        return True
+
+    def record(self, source_path, target_path, outcome, content_hash=None):
+        """记录源文件的处理结果，需在源文件被移动或删除之前调用
+
+        content_hash 为调度器去重或查找缓存时已计算的内容哈希，传入时不再重新读取源文件。
+        """
+        try:
+            source_stat = os.stat(source_path)
+        except OSError:
+            return
+        if content_hash is None and outcome == OUTCOME_CONVERTED:
+            try:
+                content_hash = hash_file(source_path)
+            except OSError:
+                content_hash = None
+        if outcome not in FINAL_OUTCOMES:
+            self.mark_dirty(os.path.dirname(source_path))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (source_path, size, mtime, content_hash, target_path, outcome, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(source_path), source_stat.st_size, source_stat.st_mtime, content_hash,
+                 target_path, outcome, time.time())
+            )
+            self._note_write()
+
+    def mark_dirty(self, directory):
+        """目录中有文件尚未成功处理，本次运行结束后不记录为已完成"""
+        with self._lock:
+            self._dirty_dirs.add(self._key(directory))
+
+    def unchanged_subdirs(self, directory, scan_config=None):
+        """目录修改时间和扫描配置都与清单一致时返回记录的子目录列表，否则返回 None
+
+        scan_config 为 file_discovery.scan_config 生成的扫描配置；
+        上次按其他转换类型或排除规则枚举的目录，其中的文件和子目录列表不能沿用。
+        """
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime, subdirs, scan_config FROM directories WHERE path = ?", (self._key(directory),)
+            ).fetchone()
+        if row is None or row[0] != mtime or row[2] != scan_config:
+            return None
+        return json.loads(row[1])
+
+    def remember_directory(self, directory, subdirs, scan_config=None):
+        """记录本次完整枚举过的目录、子目录及扫描配置，运行结束时由 finalize_directories 写入"""
+        with self._lock:
+            self._scanned_dirs[self._key(directory)] = (directory, list(subdirs), scan_config)
+
+    def finalize_directories(self):
+        """运行完整结束后，把所有文件都已处理完毕的目录按当前修改时间写入清单"""
+        with self._lock:
+            for key, (directory, subdirs, scan_config) in self._scanned_dirs.items():
+                if key in self._dirty_dirs:
+                    self._conn.execute("DELETE FROM directories WHERE path = ?", (key,))
+                    continue
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO directories (path, mtime, subdirs, scan_config) VALUES (?, ?, ?, ?)",
+                    (key, mtime, json.dumps(subdirs, ensure_ascii=False), scan_config)
+                )
+            self._scanned_dirs.clear()
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def _note_write(self):
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_interval:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
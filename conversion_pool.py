@@ -0,0 +1,453 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections import namedtuple
+
+import atomic_output
+from office_engines import ConversionSkipped, process_memory_usage
+
+# 转换结果状态
+STATUS_CONVERTED = "converted"
+STATUS_SKIPPED = "skipped"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+STATUS_TIMEOUT = "timeout"
+
+# Office 实例回收原因
+RECYCLE_FILE_COUNT = "files"
+RECYCLE_MEMORY = "memory"
+
+RecycleEvent = namedtuple("RecycleEvent", ["worker_id", "reason", "files", "memory", "restart_seconds"])
+
+# peak_memory 为转换该文件期间工作进程与 Office 进程内存之和的峰值（字节），无法测量时为 None；
+# content_hash 为调度器计算过的源文件内容哈希（SHA-256），未计算时为 None
+ConversionResult = namedtuple(
+    "ConversionResult",
+    ["seq", "source_path", "target_path", "status", "reason", "message", "elapsed", "worker_id", "peak_memory",
+     "content_hash"],
+    defaults=(None, None)
+)
+
+# 转换期间采样内存的间隔（秒）
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+
+def default_worker_count():
+    """默认工作进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def _recycle_reason(engine, files_converted, recycle_after, recycle_memory):
+    """判断引擎是否需要重启，返回 (原因, 当前内存字节数)，不需要时原因为 None"""
+    if recycle_after and files_converted >= recycle_after:
+        return RECYCLE_FILE_COUNT, 0
+    if recycle_memory:
+        memory = engine.memory_usage()
+        if memory is not None and memory >= recycle_memory:
+            return RECYCLE_MEMORY, memory
+    return None, 0
+
+
+class _PeakMemorySampler:
+    """在后台线程中定时采样指定进程的内存，记录单个文件转换期间的峰值；无法测量时 peak 为 None"""
+
+    def __init__(self, pids, interval=MEMORY_SAMPLE_INTERVAL):
+        self.pids = pids
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        memory = process_memory_usage(self.pids)
+        if memory is not None and (self.peak is None or memory > self.peak):
+            self.peak = memory
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop_event.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+
+
+def _worker_main(worker_id, incarnation, engine_factory, task_queue, result_queue, cancel_event, start_lock,
+                 recycle_after=None, recycle_memory=None):
+    """工作进程主循环：启动独立引擎，从共享队列领取任务直到收到结束标记
+
+    每转换 recycle_after 个文件，或 Office 进程内存超过 recycle_memory 字节时，
+    在两个文件之间重启引擎，并把重启耗时报告给转换池。
+    每个文件转换期间采样本进程和 Office 进程的内存，峰值随结果返回。
+    引擎把结果写入临时文件，校验为完整的 ZIP 包后才改名为目标文件。
+    发出的消息都带有 (进程编号, 进程代数)，转换池据此丢弃已被结束的进程迟到的消息。
+    """
+    def post(kind, *payload):
+        result_queue.put((kind, worker_id, incarnation) + payload)
+
+    engine = engine_factory()
+    try:
+        # 依次启动引擎，便于引擎通过进程列表差异识别自己的 Office 进程
+        with start_lock:
+            engine.start()
+    except Exception as e:
+        post("worker_failed", str(e))
+        return
+    office_pids = list(engine.process_ids())
+    post("ready", office_pids)
+    files_converted = 0
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, source_path, target_path, timeout = task
+            if cancel_event.is_set():
+                post("result", ConversionResult(
+                    seq, source_path, target_path, STATUS_CANCELLED, "", "", 0.0, worker_id))
+                continue
+
+            post("started", seq, time.time(), timeout)
+            started = time.perf_counter()
+            reason = ""
+            message = ""
+            temp_path = atomic_output.temporary_path(target_path)
+            # 上次崩溃或超时留下的临时文件
+            atomic_output.discard(temp_path)
+            with _PeakMemorySampler([os.getpid()] + office_pids) as sampler:
+                try:
+                    message = engine.convert(source_path, temp_path) or ""
+                    atomic_output.commit(temp_path, target_path)
+                    status = STATUS_CONVERTED
+                except ConversionSkipped as e:
+                    status = STATUS_SKIPPED
+                    reason = e.reason
+                    message = e.detail
+                except Exception as e:
+                    status = STATUS_ERROR
+                    message = str(e)
+            if status != STATUS_CONVERTED:
+                atomic_output.discard(temp_path)
+            post("result", ConversionResult(
+                seq, source_path, target_path, status, reason, message,
+                time.perf_counter() - started, worker_id, sampler.peak))
+            if list(engine.process_ids()) != office_pids:
+                # 引擎按需启动了 Office（如内置引擎的兜底），通知看门狗
+                office_pids = list(engine.process_ids())
+                post("ready", office_pids)
+
+            files_converted += 1
+            recycle_reason, memory = _recycle_reason(engine, files_converted, recycle_after, recycle_memory)
+            if recycle_reason is None or cancel_event.is_set():
+                continue
+            restart_started = time.perf_counter()
+            try:
+                engine.stop()
+            except Exception:
+                pass
+            engine = engine_factory()
+            try:
+                with start_lock:
+                    engine.start()
+            except Exception as e:
+                post("worker_failed", f"重启失败: {e}")
+                return
+            office_pids = list(engine.process_ids())
+            post("recycled", office_pids, RecycleEvent(
+                worker_id, recycle_reason, files_converted, memory,
+                time.perf_counter() - restart_started))
+            files_converted = 0
+    finally:
+        try:
+            engine.stop()
+        except Exception:
+            pass
+
+
+def _kill_process(pid):
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+class ConversionPool:
+    """多进程转换池
+
+    启动 N 个相互隔离的工作进程，每个进程持有一个由 engine_factory 创建的引擎实例，
+    从共享任务队列领取 (源文件, 目标文件) 并把结果流式返回给调用方。
+    engine_factory 必须可被 pickle（例如模块级的类）。
+
+    看门狗：设置 timeout 后，单个文件的转换时间超过
+    timeout + 文件大小(MB) * timeout_per_mb 秒时，该工作进程及其 Office 进程被强制结束，
+    文件以 STATUS_TIMEOUT 返回，并启动新的工作进程继续处理队列。
+    检查超时之前先取出队列中已到达的消息，已经报告结果的文件不会被判为超时；
+    每次启动的工作进程有新的代数，被结束的进程迟到的消息按代数丢弃。
+
+    实例回收：recycle_after 为每个 Office 实例最多转换的文件数，
+    recycle_memory_mb 为 Office 进程内存上限，达到任一阈值时工作进程在两个文件之间重启引擎，
+    每次重启记录在 recycle_events 中。
+    """
+
+    def __init__(self, engine_factory, workers=None, timeout=None, timeout_per_mb=0.0,
+                 recycle_after=None, recycle_memory_mb=None):
+        self.engine_factory = engine_factory
+        self.worker_count = max(1, workers or default_worker_count())
+        self.timeout = timeout
+        self.timeout_per_mb = timeout_per_mb
+        self.recycle_after = recycle_after
+        self.recycle_memory_mb = recycle_memory_mb
+        self._ctx = multiprocessing.get_context("spawn")
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._cancel_event = self._ctx.Event()
+        self._start_lock = self._ctx.Lock()
+        self._processes = {}
+        self._incarnations = {}      # 进程编号 → 当前工作进程的代数
+        self._next_incarnation = 0
+        self._office_pids = {}
+        self._running = {}
+        self._pending = {}
+        self._next_seq = 0
+        self._reorder_buffer = {}
+        self._next_ordered_seq = 0
+        self._closed = False
+        self.worker_errors = []
+        self.timeouts = 0
+        self.recycle_events = []
+        # 单个文件峰值内存的统计：(已测量文件数, 峰值之和, 最大峰值, 最大峰值对应的文件)
+        self.memory_peaks = (0, 0, 0, None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def start(self):
+        for worker_id in range(self.worker_count):
+            self._spawn_worker(worker_id)
+
+    def _spawn_worker(self, worker_id):
+        incarnation = self._next_incarnation
+        self._next_incarnation += 1
+        self._incarnations[worker_id] = incarnation
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, incarnation, self.engine_factory, self._task_queue, self._result_queue,
+                  self._cancel_event, self._start_lock, self.recycle_after,
+                  int(self.recycle_memory_mb * 1024 * 1024) if self.recycle_memory_mb else None),
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def deadline_for(self, size):
+        """单个文件允许的最长转换时间（秒），未启用看门狗时返回 None"""
+        if not self.timeout:
+            return None
+        return self.timeout + (size or 0) / (1024 * 1024) * self.timeout_per_mb
+
+    def submit(self, source_path, target_path, size=None):
+        """提交一个转换任务，返回任务序号"""
+        if self._closed:
+            raise RuntimeError("转换池已关闭，不能再提交任务")
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending[seq] = (source_path, target_path)
+        self._task_queue.put((seq, source_path, target_path, self.deadline_for(size)))
+        return seq
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def close(self):
+        """不再提交新任务，工作进程处理完队列后退出"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._task_queue.put(None)
+
+    def cancel(self):
+        """取消尚未开始的任务，正在转换的文件会完成后再退出"""
+        self._cancel_event.set()
+        self.close()
+
+    def _any_worker_alive(self):
+        return any(process.is_alive() for process in self._processes.values())
+
+    def _drain_messages(self):
+        """不阻塞地取出队列中已到达的全部消息"""
+        messages = []
+        try:
+            while True:
+                messages.append(self._result_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def _handle_message(self, message):
+        kind, worker_id, incarnation = message[:3]
+        if self._incarnations.get(worker_id) != incarnation:
+            # 已被看门狗结束的工作进程迟到的消息：其文件已按超时处理，
+            # 迟到的 "started" 不能把下一个文件记到替代进程名下
+            return None
+        if kind == "worker_failed":
+            self.worker_errors.append((worker_id, message[3]))
+            return None
+        if kind == "ready":
+            self._office_pids[worker_id] = message[3]
+            return None
+        if kind == "recycled":
+            _, _, _, pids, event = message
+            self._office_pids[worker_id] = pids
+            self.recycle_events.append(event)
+            return None
+        if kind == "started":
+            _, _, _, seq, started_at, timeout = message
+            if seq in self._pending:
+                self._running[worker_id] = (seq, started_at, timeout)
+            return None
+        result = message[3]
+        running = self._running.get(result.worker_id)
+        if running is not None and running[0] == result.seq:
+            del self._running[result.worker_id]
+        if self._pending.pop(result.seq, None) is None:
+            # 看门狗已按超时处理过该任务
+            return None
+        if result.peak_memory:
+            count, total, largest, largest_path = self.memory_peaks
+            if result.peak_memory > largest:
+                largest, largest_path = result.peak_memory, result.source_path
+            self.memory_peaks = (count + 1, total + result.peak_memory, largest, largest_path)
+        return result
+
+    def _receive_pending(self):
+        """处理队列中已到达的消息，产出其中的转换结果"""
+        for message in self._drain_messages():
+            result = self._handle_message(message)
+            if result is not None:
+                yield result
+
+    def _enforce_deadlines(self):
+        """强制结束超时的工作进程及其 Office 进程，并启动替代进程
+
+        调用前应先处理队列中已到达的消息（_receive_pending）。
+        """
+        for worker_id, running in list(self._running.items()):
+            seq, started_at, timeout = running
+            now = time.time()
+            # 处理其他进程的消息时该进程可能已报告结果并开始下一个文件
+            if self._running.get(worker_id) != running or timeout is None or now - started_at < timeout:
+                continue
+            del self._running[worker_id]
+            process = self._processes.get(worker_id)
+            if process is not None:
+                process.terminate()
+                process.join(5)
+            # 进程在检查之后、被结束之前提交的结果仍然有效
+            yield from self._receive_pending()
+            del self._incarnations[worker_id]
+            for pid in self._office_pids.pop(worker_id, []):
+                _kill_process(pid)
+            if not self._cancel_event.is_set():
+                self._spawn_worker(worker_id)
+            pending = self._pending.pop(seq, None)
+            if pending is None:
+                continue
+            self.timeouts += 1
+            source_path, target_path = pending
+            # 工作进程已被结束，删除它留下的临时文件
+            atomic_output.discard(atomic_output.temporary_path(target_path))
+            yield ConversionResult(
+                seq, source_path, target_path, STATUS_TIMEOUT, "",
+                f"超过 {timeout:.0f} 秒未完成，已强制结束Office进程", now - started_at, worker_id)
+
+    def results(self, wait=True, ordered=False):
+        """产出转换结果
+
+        默认按完成顺序产出；ordered=True 时按提交顺序产出（先完成的结果会被暂存）。
+        wait=False 时只返回当前已完成的结果，不阻塞；
+        wait=True 时一直等待到所有已提交任务都有结果。
+        """
+        if ordered:
+            yield from self._ordered(self._completed_results(wait))
+        else:
+            yield from self._completed_results(wait)
+
+    def _ordered(self, results):
+        for result in results:
+            self._reorder_buffer[result.seq] = result
+            while self._next_ordered_seq in self._reorder_buffer:
+                yield self._reorder_buffer.pop(self._next_ordered_seq)
+                self._next_ordered_seq += 1
+
+    def _completed_results(self, wait):
+        while self._pending:
+            # 先处理已到达的结果和 "started" 消息，再按最新的状态检查超时
+            yield from self._receive_pending()
+            yield from self._enforce_deadlines()
+            if not self._pending:
+                return
+            try:
+                if wait:
+                    message = self._result_queue.get(timeout=0.2)
+                else:
+                    message = self._result_queue.get_nowait()
+            except queue.Empty:
+                if self._any_worker_alive():
+                    if not wait:
+                        return
+                    continue
+                # 所有工作进程都已退出：再取一次残留结果，其余任务视为失败
+                try:
+                    message = self._result_queue.get(timeout=1)
+                except queue.Empty:
+                    yield from self._fail_pending("所有转换进程均已退出")
+                    return
+            result = self._handle_message(message)
+            if result is not None:
+                yield result
+
+    def _fail_pending(self, message):
+        detail = message
+        if self.worker_errors:
+            detail = f"{message}: {self.worker_errors[-1][1]}"
+        for seq in sorted(self._pending):
+            source_path, target_path = self._pending[seq]
+            yield ConversionResult(seq, source_path, target_path, STATUS_ERROR, "", detail, 0.0, -1)
+        self._pending.clear()
+
+    def shutdown(self, timeout=10):
+        """关闭转换池并等待工作进程退出，超时仍未退出的进程将被终止"""
+        self.close()
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(0, deadline - time.monotonic()))
+        for worker_id, process in self._processes.items():
+            if process.is_alive():
+                process.terminate()
+                process.join(1)
+                for pid in self._office_pids.get(worker_id, []):
+                    _kill_process(pid)
+        self._processes = {}
+        # 收取工作进程退出前发出的回收记录等控制消息
+        while True:
+            try:
+                self._handle_message(self._result_queue.get_nowait())
+            except queue.Empty:
+                break
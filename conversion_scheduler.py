@@ -0,0 +1,497 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import atomic_output
+from conversion_cache import cache_key
+from conversion_manifest import hash_file
+from conversion_pool import (
+    ConversionPool,
+    ConversionResult,
+    STATUS_CANCELLED,
+    STATUS_CONVERTED,
+    STATUS_ERROR,
+    STATUS_SKIPPED,
+    RECYCLE_FILE_COUNT,
+    RECYCLE_MEMORY,
+)
+from output_verifier import DEFAULT_VERIFY_WORKERS, verify_output
+
+# 计算源文件内容哈希的线程数（受磁盘 / 网络共享带宽限制，不随 CPU 核心数增加）
+DEFAULT_HASH_WORKERS = 4
+
+
+def clone_output(source_path, target_path):
+    """把已转换的目标文件复制给内容相同的另一个源文件
+
+    不使用硬链接：硬链接共享同一组时间戳，无法再按各自的源文件设置；
+    shutil.copyfile 会使用系统提供的快速复制（支持时为写时复制）。
+    """
+    atomic_output.copy_file(source_path, target_path)
+
+
+class ConversionScheduler:
+    """统一调度器：把一条文件发现流按扩展名分派给各自的转换池并行运行
+
+    每种文件类型（如 .doc → Word、.xls → Excel）拥有独立的转换池和并发上限，
+    各转换池同时工作，总耗时接近最慢的一类而不是各类之和。
+    """
+
+    def __init__(self, dedupe=False, cache=None, staging=None, hash_workers=DEFAULT_HASH_WORKERS,
+                 verify=False, verify_workers=DEFAULT_VERIFY_WORKERS):
+        self._routes = {}
+        self.submitted_count = 0
+        self.completed_count = 0
+        # 内容去重：同一类型中内容相同的源文件只交给 Office 转换一次，其余复制转换结果
+        self.dedupe = dedupe
+        self.hash_workers = hash_workers
+        self._preparer = None
+        self._incoming = deque()     # [源文件, 目标文件, 大小, 预处理 future]，future 为 None 表示尚未开始
+        self._primaries = {}         # 正在转换的源文件 → 内容键
+        self._waiting = {}           # 内容键 → 等待首个文件结果的 [(源文件, 目标文件, 大小, 本地副本)]
+        self._finished = {}          # 内容键 → 已有结果的 (源文件, 目标文件, ConversionResult)
+        self._closing = False
+        self._cancelled = False
+        self.duplicate_count = 0
+        self.opens_saved = 0
+        # 跨运行的转换缓存（ConversionCache），提交给转换池之前先按内容哈希查找
+        self.cache = cache
+        self._cache_keys = {}        # 未命中缓存、交给转换池的源文件 → 缓存键
+        self._digests = {}           # 已计算内容哈希、尚未产出结果的源文件 → 哈希，随结果交给调用方写入清单
+        self._engine_versions = {}
+        # 本地暂存（StagingArea）：网络共享上的文件先复制到本地再转换
+        self.staging = staging
+        self._staged = {}            # 本地源文件 → (源文件, 目标文件, 本地目标文件, 大小)
+        # 转换结果校验：在独立的线程池中检查转换池产出的文件，通过后才交给调用方处理原文件
+        self.verify = verify
+        self.verify_workers = verify_workers
+        self._verifier = None
+        self._verifying = deque()    # (ConversionResult, 校验 future)，按完成顺序排列
+        self.verify_failures = 0
+
+    def add_route(self, source_ext, target_ext, engine_factory, workers=None, timeout=None, timeout_per_mb=0.0,
+                  recycle_after=None, recycle_memory_mb=None):
+        """登记一种文件类型：source_ext 的文件交给独立的转换池转换为 target_ext
+
+        timeout / timeout_per_mb 为单个文件的超时设置，
+        recycle_after / recycle_memory_mb 为 Office 实例回收阈值，见 ConversionPool。
+        """
+        pool = ConversionPool(engine_factory, workers=workers, timeout=timeout, timeout_per_mb=timeout_per_mb,
+                              recycle_after=recycle_after, recycle_memory_mb=recycle_memory_mb)
+        self._routes[source_ext.lower()] = (target_ext, pool)
+        return pool
+
+    @property
+    def pools(self):
+        return [pool for _, pool in self._routes.values()]
+
+    def route_for(self, source_path):
+        """返回源文件对应的 (目标扩展名, 转换池)，不支持的类型返回 None"""
+        return self._routes.get(os.path.splitext(source_path)[1].lower())
+
+    def target_path_for(self, source_path):
+        route = self.route_for(source_path)
+        if route is None:
+            return None
+        return os.path.splitext(source_path)[0] + route[0]
+
+    @property
+    def _hashing(self):
+        return self.dedupe or self.cache is not None
+
+    def start(self):
+        if self.staging is not None:
+            self._preparer = ThreadPoolExecutor(max_workers=self.staging.read_ahead_workers,
+                                                thread_name_prefix="prefetch")
+        elif self._hashing:
+            self._preparer = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="hash")
+        if self.verify:
+            self._verifier = ThreadPoolExecutor(max_workers=self.verify_workers, thread_name_prefix="verify")
+        for pool in self.pools:
+            pool.start()
+
+    def submit(self, source_path, target_path=None, size=None):
+        """把文件提交给对应类型的转换池，size 用于按文件大小放宽超时
+
+        启用去重或缓存时先在线程池中分块计算内容哈希，启用本地暂存时先预取到本地，
+        由 results() 决定交给转换池、从缓存复制还是等待复制。
+        """
+        route = self.route_for(source_path)
+        if route is None:
+            raise ValueError(f"不支持的文件类型: {source_path}")
+        if target_path is None:
+            target_path = os.path.splitext(source_path)[0] + route[0]
+        if self._preparer is not None:
+            self._incoming.append([source_path, target_path, size, None])
+            self._start_preparing()
+        else:
+            route[1].submit(source_path, target_path, size)
+        self.submitted_count += 1
+
+    def _prepare(self, source_path, size):
+        """在线程池中运行：返回 (本地副本或 None, 内容哈希或 None)"""
+        if self.staging is not None:
+            return self.staging.fetch(source_path, size, want_hash=self._hashing)
+        return None, hash_file(source_path)
+
+    def _start_preparing(self):
+        """按提交顺序开始预处理；本地暂存的预取文件数和空间达到上限时暂停"""
+        for entry in self._incoming:
+            if entry[3] is not None:
+                continue
+            if self._cancelled:
+                return
+            if self.staging is not None:
+                if not self.staging.has_room():
+                    return
+                self.staging.reserve(entry[2])
+            entry[3] = self._preparer.submit(self._prepare, entry[0], entry[2])
+
+    @property
+    def pending_count(self):
+        """尚未产出结果的文件数（含正在预处理、校验和等待复制转换结果的文件）"""
+        return self.queued_count + len(self._verifying) + sum(len(waiting) for waiting in self._waiting.values())
+
+    @property
+    def queued_count(self):
+        """正在预处理或在转换池中排队、转换的文件数"""
+        return len(self._incoming) + sum(pool.pending_count for pool in self.pools)
+
+    def _content_key(self, source_path, digest):
+        return os.path.splitext(source_path)[1].lower(), digest
+
+    def _release(self, local_source, size, local_target=None):
+        if local_source is not None:
+            self.staging.release(local_source, local_target, size)
+
+    def _cancelled_result(self, source_path, target_path):
+        return ConversionResult(-1, source_path, target_path, STATUS_CANCELLED, "", "", 0.0, -1)
+
+    def _submit_to_pool(self, source_path, target_path, size, local_source=None):
+        """交给转换池；有本地副本时转换本地文件，结果由 _unstage 写回"""
+        target_ext, pool = self.route_for(source_path)
+        if local_source is None:
+            pool.submit(source_path, target_path, size)
+            return
+        local_target = self.staging.local_target(local_source, target_ext)
+        self._staged[local_source] = (source_path, target_path, local_target, size)
+        pool.submit(local_source, local_target, size)
+
+    def _dispatch_prepared(self):
+        """把预处理完的文件交给转换池，或登记为重复文件；产出可以直接给出结果的文件"""
+        while self._incoming:
+            source_path, target_path, size, future = self._incoming[0]
+            if self._cancelled and (future is None or future.done()):
+                self._incoming.popleft()
+                if future is not None and not future.cancelled() and future.exception() is None:
+                    self._release(future.result()[0], size)
+                yield self._cancelled_result(source_path, target_path)
+                continue
+            if future is None or not future.done():
+                break
+            self._incoming.popleft()
+            try:
+                local_source, digest = future.result()
+            except OSError:
+                # 无法读取的文件交给 Office 报告具体错误
+                self._submit_to_pool(source_path, target_path, size)
+                continue
+            if not self._hashing:
+                self._submit_to_pool(source_path, target_path, size, local_source)
+                continue
+            self._digests[source_path] = digest
+            key = self._content_key(source_path, digest)
+            if self.dedupe and key in self._finished:
+                self.duplicate_count += 1
+                duplicate = self._duplicate_result(source_path, target_path, size, local_source, self._finished[key])
+                if duplicate is not None:
+                    yield duplicate
+            elif self.dedupe and key in self._waiting:
+                self.duplicate_count += 1
+                self._waiting[key].append((source_path, target_path, size, local_source))
+            else:
+                cached = self._fetch_cached(source_path, target_path, digest)
+                if cached is not None:
+                    self._release(local_source, size)
+                    if self.dedupe:
+                        self._finished[key] = (source_path, target_path, cached)
+                    yield cached
+                    continue
+                if self.dedupe:
+                    self._waiting[key] = []
+                    self._primaries[source_path] = key
+                self._submit_to_pool(source_path, target_path, size, local_source)
+        self._start_preparing()
+
+    def _cache_key(self, source_path, digest):
+        target_ext, pool = self.route_for(source_path)
+        engine_factory = pool.engine_factory
+        version = self._engine_versions.get(engine_factory)
+        if version is None:
+            version = self._engine_versions[engine_factory] = engine_factory.engine_version()
+        return cache_key(digest, engine_factory.name, version, target_ext)
+
+    def _fetch_cached(self, source_path, target_path, digest):
+        """缓存命中时复制转换结果并返回成功结果，未命中时记下缓存键并返回 None"""
+        if self.cache is None:
+            return None
+        key = self._cache_key(source_path, digest)
+        if self.cache.fetch(key, target_path):
+            return ConversionResult(-1, source_path, target_path, STATUS_CONVERTED, "", "命中转换缓存", 0.0, -1)
+        self._cache_keys[source_path] = key
+        return None
+
+    def _store_cached(self, result, output_path=None):
+        key = self._cache_keys.pop(result.source_path, None)
+        if key is not None and result.status == STATUS_CONVERTED:
+            self.cache.store(key, output_path or result.target_path)
+
+    def _duplicate_result(self, source_path, target_path, size, local_source, finished):
+        """根据内容相同文件的结果给出本文件的结果；无法复用时交给转换池并返回 None"""
+        first_source, first_target, result = finished
+        message = f"与 {os.path.basename(first_source)} 内容相同"
+        if result.status == STATUS_CONVERTED:
+            try:
+                clone_output(first_target, target_path)
+            except OSError as e:
+                message = f"{message}，复制转换结果失败（{e}），重新转换"
+            else:
+                self.opens_saved += 1
+                self._release(local_source, size)
+                return result._replace(seq=-1, source_path=source_path, target_path=target_path,
+                                       message=f"{message}，已复制转换结果", elapsed=0.0, peak_memory=None)
+        elif result.status == STATUS_SKIPPED:
+            # 密码保护、扩展名与内容不符等由内容决定的结论直接沿用
+            self.opens_saved += 1
+            self._release(local_source, size)
+            if result.message:
+                message = f"{message}：{result.message}"
+            return result._replace(seq=-1, source_path=source_path, target_path=target_path,
+                                   message=message, elapsed=0.0, peak_memory=None)
+        if self._cancelled:
+            self._release(local_source, size)
+            return self._cancelled_result(source_path, target_path)
+        self._submit_to_pool(source_path, target_path, size, local_source)
+        return None
+
+    def _resolve_duplicates(self, result):
+        """首个文件有结果后处理等待中的重复文件"""
+        key = self._primaries.pop(result.source_path, None)
+        if key is None:
+            return
+        waiting = self._waiting.pop(key, [])
+        if result.status in (STATUS_CONVERTED, STATUS_SKIPPED):
+            finished = (result.source_path, result.target_path, result)
+            self._finished[key] = finished
+            for source_path, target_path, size, local_source in waiting:
+                duplicate = self._duplicate_result(source_path, target_path, size, local_source, finished)
+                if duplicate is not None:
+                    yield duplicate
+        elif result.status == STATUS_CANCELLED or self._cancelled:
+            for source_path, target_path, size, local_source in waiting:
+                self._release(local_source, size)
+                yield self._cancelled_result(source_path, target_path)
+        elif waiting:
+            # 出错或超时可能与具体实例有关：由下一个重复文件重新尝试
+            source_path, target_path, size, local_source = waiting.pop(0)
+            self._waiting[key] = waiting
+            self._primaries[source_path] = key
+            self._submit_to_pool(source_path, target_path, size, local_source)
+
+    def _unstage(self, result):
+        """把本地转换的结果写回目标位置，换回原始路径，并把结果放入缓存"""
+        local_source = result.source_path
+        staged = self._staged.pop(local_source, None)
+        if staged is None:
+            self._store_cached(result)
+            return result
+        source_path, target_path, local_target, size = staged
+        result = result._replace(source_path=source_path, target_path=target_path)
+        if result.status == STATUS_CONVERTED:
+            self._store_cached(result, local_target)
+            try:
+                self.staging.write_back(local_target, target_path)
+            except OSError as e:
+                result = result._replace(status=STATUS_ERROR, message=f"转换结果写回失败: {e}")
+        self._release(local_source, size, local_target)
+        return result
+
+    def _close_pools_when_idle(self):
+        # 重复文件可能还要交给转换池，等预处理、校验和等待的文件都处理完再关闭
+        if self._closing and not self._incoming and not self._waiting and not self._verifying:
+            for pool in self.pools:
+                pool.close()
+
+    def results(self, wait=True, poll_interval=0.05):
+        """汇总所有转换池的结果，按完成顺序产出
+
+        wait=False 时只返回当前已完成的结果；wait=True 时等待所有已提交任务完成。
+        """
+        while True:
+            produced = False
+            for result in self._collect():
+                produced = True
+                digest = self._digests.pop(result.source_path, None)
+                if digest is not None:
+                    result = result._replace(content_hash=digest)
+                if result.status != STATUS_CANCELLED:
+                    self.completed_count += 1
+                yield result
+            self._close_pools_when_idle()
+            if not wait or self.pending_count == 0:
+                return
+            if not produced:
+                time.sleep(poll_interval)
+
+    def _collect(self):
+        yield from self._dispatch_prepared()
+        for pool in self.pools:
+            for result in pool.results(wait=False):
+                if self._verifier is not None and result.status == STATUS_CONVERTED:
+                    # 暂存时 result 中是本地路径，校验本地文件，通过后再写回
+                    future = self._verifier.submit(verify_output, result.source_path, result.target_path)
+                    self._verifying.append((result, future))
+                    continue
+                yield from self._finish(result)
+        yield from self._finish_verified()
+
+    def _finish(self, result):
+        # 写回并放入缓存后再交给调用方，调用方随后可能移动或覆盖源文件
+        result = self._unstage(result)
+        yield result
+        yield from self._resolve_duplicates(result)
+
+    def _finish_verified(self):
+        """产出已完成校验的结果；校验失败的转换结果删除，按转换出错处理，原文件保持不变"""
+        for entry in [entry for entry in self._verifying if entry[1].done()]:
+            self._verifying.remove(entry)
+            result, future = entry
+            try:
+                problem = future.result()
+            except Exception as e:
+                problem = f"校验过程出错（{e}）"
+            if problem is not None:
+                self.verify_failures += 1
+                atomic_output.discard(result.target_path)
+                result = result._replace(status=STATUS_ERROR, message=f"转换结果校验失败: {problem}")
+            yield from self._finish(result)
+
+    def wait_for_capacity(self, max_pending, poll_interval=0.05):
+        """转换池积压的任务达到 max_pending 时等待，期间产出已完成的结果
+
+        等待复制转换结果的重复文件不占用转换池，不计入积压。
+        """
+        while self.queued_count >= max_pending:
+            produced = False
+            for result in self.results(wait=False):
+                produced = True
+                yield result
+            if not produced:
+                time.sleep(poll_interval)
+
+    @property
+    def worker_count(self):
+        return sum(pool.worker_count for pool in self.pools)
+
+    def close(self):
+        """不再提交新文件；启用预处理时转换池在排队和重复文件都处理完后关闭"""
+        self._closing = True
+        if self._preparer is None:
+            for pool in self.pools:
+                pool.close()
+        else:
+            self._close_pools_when_idle()
+
+    def cancel(self):
+        self._cancelled = True
+        self._closing = True
+        for pool in self.pools:
+            pool.cancel()
+
+    def shutdown(self):
+        if self._preparer is not None:
+            self._preparer.shutdown(wait=True, cancel_futures=True)
+        if self._verifier is not None:
+            self._verifier.shutdown(wait=True, cancel_futures=True)
+        for pool in self.pools:
+            pool.shutdown()
+        if self.staging is not None:
+            self.staging.cleanup()
+
+    @property
+    def timeouts(self):
+        return sum(pool.timeouts for pool in self.pools)
+
+    @property
+    def recycle_events(self):
+        """所有转换池的 Office 实例回收记录：(引擎名称, RecycleEvent)"""
+        return [
+            (getattr(pool.engine_factory, "name", ""), event)
+            for pool in self.pools
+            for event in pool.recycle_events
+        ]
+
+    def recycle_summary(self):
+        """各引擎的实例回收统计文本，每个发生过回收的引擎一行"""
+        lines = []
+        for pool in self.pools:
+            events = pool.recycle_events
+            if not events:
+                continue
+            by_count = sum(1 for event in events if event.reason == RECYCLE_FILE_COUNT)
+            by_memory = sum(1 for event in events if event.reason == RECYCLE_MEMORY)
+            restart_times = [event.restart_seconds for event in events]
+            lines.append(
+                f"{getattr(pool.engine_factory, 'name', '')}: 实例回收 {len(events)} 次"
+                f"（达到文件数 {by_count} 次，超过内存 {by_memory} 次），"
+                f"重启耗时平均 {sum(restart_times) / len(restart_times):.2f} 秒，最长 {max(restart_times):.2f} 秒"
+            )
+        return lines
+
+    def dedupe_summary(self):
+        """内容去重统计文本，没有重复文件时返回 None"""
+        if not self.duplicate_count:
+            return None
+        return (f"内容相同的重复文件 {self.duplicate_count} 个，"
+                f"复用转换结果节省 {self.opens_saved} 次Office打开")
+
+    def verify_summary(self):
+        """转换结果校验统计文本，没有校验失败的文件时返回 None"""
+        if not self.verify_failures:
+            return None
+        return f"转换结果校验失败 {self.verify_failures} 个，已删除转换结果并保留原文件"
+
+    def cache_summary(self):
+        """转换缓存统计文本，未启用缓存时返回 None"""
+        if self.cache is None:
+            return None
+        return self.cache.summary()
+
+    def staging_summary(self):
+        """本地暂存的读写字节数和吞吐量，未启用暂存时返回 None"""
+        if self.staging is None:
+            return None
+        return self.staging.summary()
+
+    def memory_summary(self):
+        """各引擎单个文件转换期间的峰值内存统计文本，没有测量数据的引擎不输出"""
+        lines = []
+        for pool in self.pools:
+            count, total, largest, largest_path = pool.memory_peaks
+            if not count:
+                continue
+            lines.append(
+                f"{getattr(pool.engine_factory, 'name', '')}: 单个文件峰值内存平均 {total / count / (1024 * 1024):.0f} MB，"
+                f"最高 {largest / (1024 * 1024):.0f} MB（{os.path.basename(largest_path)}）"
+            )
+        return lines
+
+    @property
+    def worker_errors(self):
+        """所有转换池中启动失败的工作进程：(引擎名称, 进程编号, 错误信息)"""
+        return [
+            (getattr(pool.engine_factory, "name", ""), worker_id, error)
+            for pool in self.pools
+            for worker_id, error in pool.worker_errors
+        ]
@@ -0,0 +1,144 @@
+import hashlib
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from threading import Lock
+
+import atomic_output
+
+# 暂存模式：auto 只在源目录位于网络路径时启用
+STAGING_AUTO = "auto"
+STAGING_ALWAYS = "always"
+STAGING_NEVER = "never"
+
+# 预取的文件数（已复制到本地、尚未转换完成）和本地暂存空间上限
+DEFAULT_PREFETCH_DEPTH = 8
+DEFAULT_SCRATCH_MAX_MB = 2048
+DEFAULT_READ_AHEAD_WORKERS = 4
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+DRIVE_REMOTE = 4
+
+
+def is_network_path(path):
+    """UNC 路径（\\\\server\\share）或映射的网络驱动器"""
+    path = os.path.abspath(path)
+    if path.startswith(("\\\\", "//")):
+        return True
+    drive = os.path.splitdrive(path)[0]
+    if not drive:
+        return False
+    try:
+        import win32file
+        return win32file.GetDriveType(drive + "\\") == DRIVE_REMOTE
+    except Exception:
+        return False
+
+
+def should_stage(mode, source_directory):
+    if mode == STAGING_ALWAYS:
+        return True
+    if mode == STAGING_AUTO:
+        return is_network_path(source_directory)
+    return False
+
+
+class _Throughput:
+    def __init__(self):
+        self.bytes = 0
+        self.seconds = 0.0
+        self.files = 0
+
+    def add(self, size, seconds):
+        self.bytes += size
+        self.seconds += seconds
+        self.files += 1
+
+    def text(self):
+        rate = self.bytes / self.seconds / (1024 * 1024) if self.seconds else 0.0
+        return f"{self.files} 个文件 {self.bytes / (1024 * 1024):.1f} MB（平均 {rate:.1f} MB/s）"
+
+
+class StagingArea:
+    """网络共享上的文件先复制到本地临时目录再交给 Office 转换
+
+    预读线程把即将转换的源文件复制到本地（需要时顺带计算内容哈希，避免再读一遍网络文件），
+    Office 只读写本地磁盘；转换结果用一次顺序复制写回目标位置，随后删除本地副本。
+    预取文件数和本地占用空间都有上限，超过时暂停预取，等已有文件转换完成后继续。
+    """
+
+    def __init__(self, scratch_root=None, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                 max_bytes=DEFAULT_SCRATCH_MAX_MB * 1024 * 1024, read_ahead_workers=DEFAULT_READ_AHEAD_WORKERS):
+        self.scratch_dir = tempfile.mkdtemp(prefix="office_staging_", dir=scratch_root)
+        self.prefetch_depth = max(1, prefetch_depth)
+        self.max_bytes = max_bytes
+        self.read_ahead_workers = max(1, read_ahead_workers)
+        self.read = _Throughput()
+        self.written = _Throughput()
+        self._counter = itertools.count(1)
+        self._lock = Lock()
+        self._staged_count = 0
+        self._staged_bytes = 0
+
+    def has_room(self):
+        """还能否预取下一个文件；本地没有暂存文件时总允许一个，避免超过上限的大文件永远无法转换"""
+        with self._lock:
+            if self._staged_count == 0:
+                return True
+            return self._staged_count < self.prefetch_depth and self._staged_bytes < self.max_bytes
+
+    def reserve(self, size):
+        with self._lock:
+            self._staged_count += 1
+            self._staged_bytes += size or 0
+
+    def fetch(self, source_path, size, want_hash=False):
+        """把源文件复制到本地，返回 (本地路径, 内容哈希或 None)；需先调用 reserve()"""
+        local_path = os.path.join(self.scratch_dir, f"{next(self._counter):06d}{os.path.splitext(source_path)[1]}")
+        digest = hashlib.sha256() if want_hash else None
+        started = time.perf_counter()
+        copied = 0
+        try:
+            with open(source_path, "rb") as src, open(local_path, "wb") as dst:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                    dst.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                    copied += len(chunk)
+        except OSError:
+            self.release(local_path, None, size)
+            raise
+        with self._lock:
+            self.read.add(copied, time.perf_counter() - started)
+        return local_path, digest.hexdigest() if digest is not None else None
+
+    def local_target(self, local_source, target_ext):
+        return os.path.splitext(local_source)[0] + target_ext
+
+    def write_back(self, local_target, target_path):
+        """把本地的转换结果顺序复制到目标位置（先写临时文件，校验后改名）"""
+        started = time.perf_counter()
+        atomic_output.copy_file(local_target, target_path)
+        with self._lock:
+            self.written.add(os.path.getsize(local_target), time.perf_counter() - started)
+
+    def release(self, local_source, local_target, size):
+        """删除本地副本并归还预取额度"""
+        for path in (local_source, local_target):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._staged_count -= 1
+            self._staged_bytes -= size or 0
+
+    def cleanup(self):
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    def summary(self):
+        return f"本地暂存: 读取 {self.read.text()}，写回 {self.written.text()}"
@@ -0,0 +1,289 @@
+"""命令行入口：不需要图形界面，每处理完一个文件向标准输出写一行 JSON
+
+    python converter_cli.py D:\\资料 E:\\归档 --types doc --doc-engine fast --word-workers 4
+
+标准输出只有 JSON 行，便于交给计划任务运行、接入监控：
+    {"type": "file", "source": ..., "target": ..., "status": "converted", ...}   每个文件一行
+    {"type": "stats", "elapsed": ..., "processed": ..., "files_per_second": ...}  每隔 --stats-interval 秒一行
+    {"type": "error", "source": ..., "message": ...}                            文件夹无效或转换中途出错
+    {"type": "summary", ...}                                                      全部结束后一行
+原有的中文过程信息写到标准错误。有文件转换失败、超时或转换中途出错时退出码为 1。
+
+--dry-run 只遍历目录，列出会转换的文件（{"type": "file", "status": "would_convert" | "target_exists"}），
+不导入转换池、Office 引擎和 pywin32，适合快速扫描。
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from threading import Event, Lock, Thread
+
+# 扫描只需要文件遍历模块；转换池、缓存、Office 引擎等在真正转换时才导入（见 load_conversion_options）
+from file_discovery import (
+    DEFAULT_EXCLUDE_PATTERNS,
+    KIND_DOC,
+    KIND_XLS,
+    DiscoveryStats,
+    build_extension_map,
+    converter_folders,
+    iter_work_items,
+    parse_exclude_patterns,
+)
+
+TYPE_DOC = KIND_DOC
+TYPE_XLS = KIND_XLS
+TARGET_EXTENSIONS = {KIND_DOC: ".docx", KIND_XLS: ".xlsx"}
+
+# 试运行的文件状态
+DRY_RUN_CONVERT = "would_convert"
+DRY_RUN_EXISTS = "target_exists"
+
+# 汇总吞吐量行的默认间隔（秒）
+DEFAULT_STATS_INTERVAL = 10.0
+
+
+class JsonLinesReporter:
+    """把每个文件的结果和定时汇总写成 JSON 行；转换线程和定时线程共用一个输出锁"""
+
+    def __init__(self, stream, stats_interval=DEFAULT_STATS_INTERVAL):
+        self.stream = stream
+        self.stats_interval = stats_interval
+        self.counts = Counter()
+        self.started = time.perf_counter()
+        self.convert_seconds = 0.0
+        self.aborted = 0
+        self._lock = Lock()
+        self._stop = Event()
+        self._timer = None
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def on_result(self, result):
+        with self._lock:
+            self.counts[result.status] += 1
+            self.convert_seconds += result.elapsed
+        self.write({
+            "type": "file",
+            "source": result.source_path,
+            "target": result.target_path,
+            "status": result.status,
+            "reason": result.reason or None,
+            "message": result.message or None,
+            "elapsed": round(result.elapsed, 3),
+            "worker": result.worker_id,
+            "peak_memory_mb": round(result.peak_memory / (1024 * 1024), 1) if result.peak_memory else None,
+        })
+
+    def abort(self, source_directory, error):
+        """记录中途出错、没有完成的源文件夹"""
+        with self._lock:
+            self.aborted += 1
+        self.write({"type": "error", "source": source_directory, "message": f"转换中止: {error}"})
+
+    def stats(self, record_type="stats"):
+        # 只在转换时调用，转换池模块此时已导入
+        from conversion_manifest import OUTCOME_EXISTS
+        from conversion_pool import STATUS_CONVERTED, STATUS_ERROR, STATUS_SKIPPED, STATUS_TIMEOUT
+
+        with self._lock:
+            counts = Counter(self.counts)
+            convert_seconds = self.convert_seconds
+            aborted = self.aborted
+        elapsed = time.perf_counter() - self.started
+        processed = sum(counts.values())
+        return {
+            "type": record_type,
+            "elapsed": round(elapsed, 1),
+            "processed": processed,
+            "converted": counts[STATUS_CONVERTED],
+            "exists": counts[OUTCOME_EXISTS],
+            "skipped": counts[STATUS_SKIPPED],
+            "errors": counts[STATUS_ERROR],
+            "timeouts": counts[STATUS_TIMEOUT],
+            "aborted": aborted,
+            "files_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+            "avg_convert_seconds": round(convert_seconds / counts[STATUS_CONVERTED], 3)
+            if counts[STATUS_CONVERTED] else None,
+        }
+
+    def _run_timer(self):
+        while not self._stop.wait(self.stats_interval):
+            self.write(self.stats())
+
+    def start(self):
+        if self.stats_interval > 0:
+            self._timer = Thread(target=self._run_timer, name="stats", daemon=True)
+            self._timer.start()
+
+    def finish(self):
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+        summary = self.stats("summary")
+        self.write(summary)
+        return summary
+
+
+def build_parser():
+    # 取值范围依赖转换模块的选项（引擎、原文件处理方式、暂存模式）由 load_conversion_options 检查和补全默认值
+    parser = argparse.ArgumentParser(description="批量把 DOC / XLS 转换为 DOCX / XLSX（无图形界面，JSON 行输出）")
+    parser.add_argument("sources", nargs="+", help="要转换的文件夹（可多个）")
+    parser.add_argument("--types", choices=(TYPE_DOC, TYPE_XLS), nargs="+", default=[TYPE_DOC, TYPE_XLS],
+                        help="转换的文件类型，默认两种都转换")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="只扫描并列出会转换的文件，不转换、不移动文件，也不加载 Office")
+    parser.add_argument("--exclude", help="排除的文件夹名称或通配符，以分号分隔（默认排除归档、隔离和系统文件夹）")
+    parser.add_argument("--originals",
+                        help="原文件处理方式：archive 移入归档文件夹（默认），overwrite 删除，keep 保留在原位")
+    parser.add_argument("--archive-dir", help="归档文件夹，默认为每个源文件夹下的“旧格式文件”")
+    parser.add_argument("--word-workers", type=int, help="Word 进程数")
+    parser.add_argument("--excel-workers", type=int, help="Excel 进程数")
+    parser.add_argument("--doc-engine", help="DOC 转换引擎：office（默认，Word）或 fast（内置快速引擎，不支持时用 Word）")
+    parser.add_argument("--xls-engine", help="XLS 转换引擎：office（默认，Excel）或 native（内置引擎，不支持时用 Excel）")
+    parser.add_argument("--timeout", type=int, help="单个文件的基础超时秒数")
+    parser.add_argument("--recycle-after", type=int, help="每个 Office 实例转换多少个文件后重启")
+    parser.add_argument("--recycle-memory-mb", type=int, help="Office 进程内存超过多少 MB 后重启")
+    parser.add_argument("--full", action="store_true", help="不使用转换清单，完整转换")
+    parser.add_argument("--no-dedupe", action="store_true", help="内容相同的文件也分别转换")
+    parser.add_argument("--no-verify", action="store_true", help="不校验转换结果")
+    parser.add_argument("--cache-dir", help="转换缓存文件夹（可为共享文件夹）")
+    parser.add_argument("--cache-max-mb", type=int, help="转换缓存的大小上限（MB）")
+    parser.add_argument("--staging", help="网络路径上的文件是否先复制到本地转换：auto（默认）、always、never")
+    parser.add_argument("--stats-interval", type=float, default=DEFAULT_STATS_INTERVAL,
+                        help="输出汇总吞吐量行的间隔秒数，0 表示不输出")
+    return parser
+
+
+def _check_choice(parser, args, name, choices, default):
+    value = getattr(args, name)
+    if value is None:
+        setattr(args, name, default)
+    elif value not in choices:
+        parser.error(f"--{name.replace('_', '-')} 的取值应为 {', '.join(sorted(choices))}，而不是 {value}")
+
+
+def load_conversion_options(parser, args):
+    """导入转换模块，检查取值并补全默认值；试运行不调用"""
+    from conversion_cache import DEFAULT_CACHE_MAX_MB
+    from conversion_staging import STAGING_ALWAYS, STAGING_AUTO, STAGING_NEVER
+    from office_converter import (
+        DEFAULT_FILE_TIMEOUT,
+        DEFAULT_RECYCLE_AFTER,
+        DEFAULT_RECYCLE_MEMORY_MB,
+        ORIGINALS_ARCHIVE,
+        ORIGINALS_KEEP,
+        ORIGINALS_OVERWRITE,
+    )
+    from office_engines import DOC_ENGINES, DOC_ENGINE_OFFICE, XLS_ENGINES, XLS_ENGINE_OFFICE
+
+    _check_choice(parser, args, "originals", (ORIGINALS_ARCHIVE, ORIGINALS_OVERWRITE, ORIGINALS_KEEP),
+                  ORIGINALS_ARCHIVE)
+    _check_choice(parser, args, "doc_engine", DOC_ENGINES, DOC_ENGINE_OFFICE)
+    _check_choice(parser, args, "xls_engine", XLS_ENGINES, XLS_ENGINE_OFFICE)
+    _check_choice(parser, args, "staging", (STAGING_AUTO, STAGING_ALWAYS, STAGING_NEVER), STAGING_AUTO)
+    for name, default in (("timeout", DEFAULT_FILE_TIMEOUT), ("recycle_after", DEFAULT_RECYCLE_AFTER),
+                          ("recycle_memory_mb", DEFAULT_RECYCLE_MEMORY_MB), ("cache_max_mb", DEFAULT_CACHE_MAX_MB)):
+        if getattr(args, name) is None:
+            setattr(args, name, default)
+
+
+def exclude_patterns(args):
+    """用户的排除规则；归档和隔离文件夹另由 converter_folders 始终排除"""
+    return parse_exclude_patterns(args.exclude) if args.exclude is not None else DEFAULT_EXCLUDE_PATTERNS
+
+
+def dry_run(args, stdout):
+    """只遍历目录，列出会转换的文件和目标已存在的文件"""
+    reporter = JsonLinesReporter(stdout, 0)
+    extensions = build_extension_map(TYPE_DOC in args.types, TYPE_XLS in args.types)
+    counts = Counter()
+    total_bytes = 0
+    for source_directory in args.sources:
+        source_directory = os.path.abspath(source_directory)
+        if not os.path.isdir(source_directory):
+            reporter.write({"type": "error", "source": source_directory, "message": "不是有效的文件夹"})
+            continue
+        stats = DiscoveryStats()
+        # 与实际转换排除相同的文件夹
+        archive_dir = os.path.abspath(args.archive_dir) if args.archive_dir else None
+        for item in iter_work_items(source_directory, extensions,
+                                    exclude_dirs=converter_folders(source_directory, archive_dir),
+                                    exclude_patterns=exclude_patterns(args), stats=stats):
+            target_path = os.path.splitext(item.path)[0] + TARGET_EXTENSIONS[item.kind]
+            status = DRY_RUN_EXISTS if os.path.exists(target_path) else DRY_RUN_CONVERT
+            counts[status] += 1
+            total_bytes += item.size
+            reporter.write({"type": "file", "source": item.path, "target": target_path, "status": status,
+                            "kind": item.kind, "size": item.size})
+        reporter.write({"type": "scan", "source": source_directory, "dirs_scanned": stats.dirs_scanned,
+                        "dirs_pruned": stats.dirs_pruned, "errors": stats.errors})
+    reporter.write({"type": "summary", "elapsed": round(time.perf_counter() - reporter.started, 3),
+                    "processed": sum(counts.values()), "would_convert": counts[DRY_RUN_CONVERT],
+                    "target_exists": counts[DRY_RUN_EXISTS], "total_mb": round(total_bytes / (1024 * 1024), 1)})
+    return 0
+
+
+def run(args, stdout):
+    from office_converter import ORIGINALS_ARCHIVE, TIMEOUT_PER_MB, convert_office_files, create_old_files_folder
+
+    reporter = JsonLinesReporter(stdout, args.stats_interval)
+    reporter.start()
+    try:
+        for source_directory in args.sources:
+            source_directory = os.path.abspath(source_directory)
+            if not os.path.isdir(source_directory):
+                reporter.write({"type": "error", "source": source_directory, "message": "不是有效的文件夹"})
+                continue
+            old_files_path = None
+            if args.originals == ORIGINALS_ARCHIVE:
+                if args.archive_dir:
+                    old_files_path = os.path.abspath(args.archive_dir)
+                    os.makedirs(old_files_path, exist_ok=True)
+                else:
+                    old_files_path = create_old_files_folder(source_directory)
+                if old_files_path is None:
+                    reporter.write({"type": "error", "source": source_directory, "message": "无法创建归档文件夹"})
+                    continue
+            try:
+                convert_office_files(
+                    source_directory, old_files_path,
+                    convert_doc=TYPE_DOC in args.types, convert_xls=TYPE_XLS in args.types,
+                    word_workers=args.word_workers, excel_workers=args.excel_workers,
+                    exclude_patterns=exclude_patterns(args),
+                    incremental=not args.full, file_timeout=args.timeout, timeout_per_mb=TIMEOUT_PER_MB,
+                    recycle_after=args.recycle_after, recycle_memory_mb=args.recycle_memory_mb,
+                    xls_engine=args.xls_engine, doc_engine=args.doc_engine, dedupe=not args.no_dedupe,
+                    cache_dir=args.cache_dir, cache_max_mb=args.cache_max_mb, staging=args.staging,
+                    verify=not args.no_verify, originals=args.originals, on_result=reporter.on_result,
+                )
+            except Exception as e:
+                # 遍历或调度中途出错：本文件夹的转换没有完成
+                reporter.abort(source_directory, e)
+    finally:
+        summary = reporter.finish()
+    return 1 if summary["errors"] or summary["timeouts"] or summary["aborted"] else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        return dry_run(args, sys.stdout)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    load_conversion_options(parser, args)
+    stdout = sys.stdout
+    # 原有的过程信息改写到标准错误，标准输出只保留 JSON 行
+    with contextlib.redirect_stdout(sys.stderr):
+        return run(args, stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
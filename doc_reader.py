@@ -0,0 +1,791 @@
+import re
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+
+from ole_reader import OleFile
+
+# 读取 Word 97-2003 文档（.doc），供内置的 DOC → DOCX 快速引擎使用。
+# 按 FIB、片段表（piece table）和 CHPX / PAPX 格式页还原段落、基本字符格式、段落样式、表格和分节；
+# 遇到图片、脚注、批注、修订、列表等快速引擎无法保留的内容时抛出 UnsupportedFeature，由 Word 转换。
+
+
+class UnsupportedFeature(Exception):
+    """文档包含快速引擎不支持的内容，需要交给 Word 转换"""
+
+
+class DocFormatError(Exception):
+    """文档结构损坏"""
+
+
+FIB_IDENT = 0xA5EC
+# Word 97 及以后版本的 nFib 不小于该值，更早的是 Word 6.0/95 格式
+NFIB_WORD97 = 0x00C0
+
+FIB_COMPLEX = 0x0004
+FIB_ENCRYPTED = 0x0100
+FIB_WHICH_TABLE = 0x0200
+
+# FibRgLw97 中的字符数
+LW_CCP_TEXT = 3
+LW_CCP_FTN = 4
+LW_CCP_HDD = 5
+LW_CCP_ATN = 7
+LW_CCP_EDN = 8
+LW_CCP_TXBX = 9
+LW_CCP_HDR_TXBX = 10
+
+# FibRgFcLcb97 中的 (fc, lcb) 序号
+FC_STSHF = 1
+FC_PLCF_SED = 6
+FC_PLCF_BTE_CHPX = 12
+FC_PLCF_BTE_PAPX = 13
+FC_STTBF_FFN = 15
+FC_CLX = 33
+FC_PLC_SPA_MOM = 38
+
+FKP_SIZE = 512
+
+# 特殊字符
+CHAR_PARAGRAPH = "\r"
+CHAR_CELL = "\x07"
+CHAR_SECTION = "\x0c"
+CHAR_PICTURE = "\x01"
+CHAR_DRAWN_OBJECT = "\x08"
+FIELD_BEGIN = "\x13"
+FIELD_SEPARATOR = "\x14"
+FIELD_END = "\x15"
+
+# 字符属性
+SPRM_C_RMARK_DEL = 0x0800
+SPRM_C_RMARK_INS = 0x0801
+SPRM_C_BOLD = 0x0835
+SPRM_C_ITALIC = 0x0836
+SPRM_C_STRIKE = 0x0837
+SPRM_C_SMALL_CAPS = 0x083A
+SPRM_C_CAPS = 0x083B
+SPRM_C_VANISH = 0x083C
+SPRM_C_DSTRIKE = 0x2A53
+SPRM_C_HIGHLIGHT = 0x2A0C
+SPRM_C_UNDERLINE = 0x2A3E
+SPRM_C_ICO = 0x2A42
+SPRM_C_ISS = 0x2A48
+SPRM_C_ISTD = 0x4A30
+SPRM_C_HPS = 0x4A43
+SPRM_C_FONT_ASCII = 0x4A4F
+SPRM_C_FONT_EAST_ASIA = 0x4A50
+SPRM_C_FONT_OTHER = 0x4A51
+SPRM_C_CV = 0x6870
+
+# 段落属性
+SPRM_P_JC80 = 0x2403
+SPRM_P_JC = 0x2461
+SPRM_P_ILFO = 0x460B
+SPRM_P_DYA_LINE = 0x6412
+SPRM_P_DXA_RIGHT80 = 0x840E
+SPRM_P_DXA_LEFT80 = 0x840F
+SPRM_P_DXA_LEFT1_80 = 0x8411
+SPRM_P_DXA_RIGHT = 0x845D
+SPRM_P_DXA_LEFT = 0x845E
+SPRM_P_DXA_LEFT1 = 0x8460
+SPRM_P_DYA_BEFORE = 0xA413
+SPRM_P_DYA_AFTER = 0xA414
+SPRM_P_IN_TABLE = 0x2416
+SPRM_P_TTP = 0x2417
+SPRM_P_ITAP = 0x6649
+SPRM_P_CHG_TABS = 0xC615
+
+# 表格属性
+SPRM_T_DEF_TABLE10 = 0xD606
+SPRM_T_DEF_TABLE = 0xD608
+SPRM_T_TABLE_BORDERS80 = 0xD605
+
+# 分节属性
+SPRM_S_BKC = 0x3009
+SPRM_S_COLUMNS = 0x500B
+SPRM_S_ORIENTATION = 0x301D
+SPRM_S_XA_PAGE = 0xB01F
+SPRM_S_YA_PAGE = 0xB020
+SPRM_S_DXA_LEFT = 0xB021
+SPRM_S_DXA_RIGHT = 0xB022
+SPRM_S_DYA_TOP = 0x9023
+SPRM_S_DYA_BOTTOM = 0x9024
+
+# 样式类型
+STK_PARAGRAPH = 1
+STK_CHARACTER = 2
+ISTD_NIL = 0x0FFF
+
+TOGGLE_PROPERTIES = {
+    SPRM_C_BOLD: "bold",
+    SPRM_C_ITALIC: "italic",
+    SPRM_C_STRIKE: "strike",
+    SPRM_C_SMALL_CAPS: "small_caps",
+    SPRM_C_CAPS: "caps",
+    SPRM_C_VANISH: "vanish",
+}
+
+UNDERLINE_STYLES = {
+    1: "single", 2: "words", 3: "double", 4: "dotted", 6: "thick", 7: "dash",
+    9: "dotDash", 10: "dotDotDash", 11: "wave",
+}
+
+# ico 颜色索引
+ICO_COLORS = [
+    None, "000000", "0000FF", "00FFFF", "00FF00", "FF00FF", "FF0000", "FFFF00", "FFFFFF",
+    "000080", "008080", "008000", "800080", "800000", "808000", "808080", "C0C0C0",
+]
+HIGHLIGHT_COLORS = [
+    None, "black", "blue", "cyan", "green", "magenta", "red", "yellow", "white",
+    "darkBlue", "darkCyan", "darkGreen", "darkMagenta", "darkRed", "darkYellow", "darkGray", "lightGray",
+]
+
+ALIGNMENTS = {0: "left", 1: "center", 2: "right", 3: "both", 4: "distribute"}
+
+# Word 97 的默认页面设置（缇）
+DEFAULT_SECTION = {
+    "width": 12240, "height": 15840, "left": 1800, "right": 1800, "top": 1440, "bottom": 1440,
+    "landscape": False, "columns": 1, "break": 2,
+}
+
+Piece = namedtuple("Piece", ["cp_start", "cp_end", "fc", "compressed"])
+Style = namedtuple("Style", ["istd", "sti", "kind", "base", "name", "paragraph", "character"])
+# props 为排好序的 (属性, 值) 元组，便于写入端缓存
+Run = namedtuple("Run", ["text", "props"])
+Paragraph = namedtuple("Paragraph", ["runs", "props", "mark_props", "section"])
+Cell = namedtuple("Cell", ["paragraphs", "width", "span", "vertical_merge", "borders"])
+Row = namedtuple("Row", ["cells"])
+Table = namedtuple("Table", ["rows", "borders"])
+
+_PARAGRAPH_END = re.compile("[\r\x07\x0c]")
+_FIELD_CHARS = re.compile("[\x13\x14\x15]")
+
+
+class Document:
+    def __init__(self):
+        # 正文块：Paragraph 或 Table，最后一节的页面设置在 sections[-1]
+        self.blocks = []
+        self.styles = {}
+        self.fonts = []
+        self.sections = []
+        # 文档摘要信息（标题、作者等），来自 OLE2 的 SummaryInformation 流
+        self.properties = {}
+
+
+def read_document(path):
+    """解析 .doc 文件，返回 Document"""
+    with OleFile(path) as ole:
+        if ole.exists("Macros"):
+            raise UnsupportedFeature("包含宏")
+        if ole.exists("ObjectPool"):
+            raise UnsupportedFeature("包含嵌入对象")
+        if not ole.exists("WordDocument"):
+            raise DocFormatError("没有 WordDocument 流")
+        word = ole.read_stream("WordDocument")
+        flags = _check_fib(word)
+        if flags & FIB_COMPLEX:
+            # 快速保存的文档把格式修改记在片段表的 Prc / prm 中，快速引擎不解析这些修改
+            raise UnsupportedFeature("快速保存的文档")
+        table_name = "1Table" if flags & FIB_WHICH_TABLE else "0Table"
+        if not ole.exists(table_name):
+            raise DocFormatError(f"没有 {table_name} 流")
+        # 两个流都是映射内存的视图，必须在文件关闭前解析完
+        document = _DocumentParser(word, ole.read_stream(table_name), flags).parse()
+        document.properties = ole.summary_information()
+    return document
+
+
+def read_main_text(path):
+    """只读取正文文字（含段落标记等特殊字符，不解析格式和不支持的内容），用于校验转换结果"""
+    with OleFile(path) as ole:
+        word = ole.read_stream("WordDocument")
+        flags = _check_fib(word)
+        table_name = "1Table" if flags & FIB_WHICH_TABLE else "0Table"
+        if not ole.exists(table_name):
+            raise DocFormatError(f"没有 {table_name} 流")
+        return _DocumentParser(word, ole.read_stream(table_name), flags).main_text()
+
+
+def _check_fib(word):
+    if len(word) < 0x20:
+        raise DocFormatError("FIB 不完整")
+    ident, nfib = struct.unpack_from("<HH", word, 0)
+    if ident != FIB_IDENT:
+        raise DocFormatError("FIB 标识不正确")
+    if nfib < NFIB_WORD97:
+        raise UnsupportedFeature("Word 6.0/95 格式")
+    flags, = struct.unpack_from("<H", word, 0x0A)
+    if flags & FIB_ENCRYPTED:
+        raise UnsupportedFeature("文档已加密")
+    return flags
+
+
+def iter_sprms(grpprl):
+    """依次产出 (sprm, 操作数)"""
+    pos = 0
+    size_limit = len(grpprl)
+    while pos + 2 <= size_limit:
+        sprm, = struct.unpack_from("<H", grpprl, pos)
+        pos += 2
+        spra = sprm >> 13
+        if spra in (0, 1):
+            size = 1
+        elif spra in (2, 4, 5):
+            size = 2
+        elif spra == 3:
+            size = 4
+        elif spra == 7:
+            size = 3
+        elif sprm in (SPRM_T_DEF_TABLE, SPRM_T_DEF_TABLE10):
+            # 表格定义的长度为 2 字节，且比实际长度多 1
+            size = struct.unpack_from("<H", grpprl, pos)[0] - 1
+            pos += 2
+        elif sprm == SPRM_P_CHG_TABS and pos < size_limit and grpprl[pos] == 255:
+            deleted = grpprl[pos + 1]
+            added = grpprl[pos + 2 + deleted * 4]
+            size = 1 + 1 + deleted * 4 + 1 + added * 3
+        else:
+            if pos >= size_limit:
+                break
+            size = grpprl[pos]
+            pos += 1
+        yield sprm, grpprl[pos:pos + size]
+        pos += size
+
+
+def _int16(operand):
+    return struct.unpack_from("<h", operand, 0)[0]
+
+
+def _uint16(operand):
+    return struct.unpack_from("<H", operand, 0)[0]
+
+
+class _DocumentParser:
+    def __init__(self, word, table, flags):
+        self.word = word
+        self.table = table
+        self.flags = flags
+        self.document = Document()
+        self._read_fib_tables()
+        self._character_cache = {}
+        self._style_character_cache = {}
+
+    def _read_fib_tables(self):
+        word = self.word
+        pos = 0x20
+        csw, = struct.unpack_from("<H", word, pos)
+        pos += 2 + csw * 2
+        cslw, = struct.unpack_from("<H", word, pos)
+        self.lengths = struct.unpack_from(f"<{cslw}i", word, pos + 2)
+        pos += 2 + cslw * 4
+        count, = struct.unpack_from("<H", word, pos)
+        self.fc_lcb = struct.unpack_from(f"<{count * 2}I", word, pos + 2)
+
+    def _fc(self, index):
+        if index * 2 + 1 >= len(self.fc_lcb):
+            return 0, 0
+        fc, lcb = self.fc_lcb[index * 2], self.fc_lcb[index * 2 + 1]
+        if lcb and fc + lcb > len(self.table):
+            raise DocFormatError("表流中的结构超出流末尾")
+        return fc, lcb
+
+    def parse(self):
+        lengths = self.lengths
+        for index, feature in ((LW_CCP_FTN, "脚注"), (LW_CCP_ATN, "批注"), (LW_CCP_EDN, "尾注"),
+                               (LW_CCP_TXBX, "文本框"), (LW_CCP_HDR_TXBX, "页眉文本框")):
+            if lengths[index] > 0:
+                raise UnsupportedFeature(f"包含{feature}")
+        if self._fc(FC_PLC_SPA_MOM)[1]:
+            raise UnsupportedFeature("包含浮动图形")
+
+        self.pieces = self._read_pieces()
+        self._piece_starts = [piece.cp_start for piece in self.pieces]
+        self.chpx = self._read_formatted_pages(FC_PLCF_BTE_CHPX, paragraph=False)
+        self.papx = self._read_formatted_pages(FC_PLCF_BTE_PAPX, paragraph=True)
+        self._chpx_starts = [entry[0] for entry in self.chpx]
+        self._papx_starts = [entry[0] for entry in self.papx]
+        self.document.fonts = self._read_fonts()
+        self.document.styles = self._read_styles()
+        self._read_sections()
+
+        ccp_text = lengths[LW_CCP_TEXT]
+        if lengths[LW_CCP_HDD] > 0:
+            headers = self._text(ccp_text, ccp_text + lengths[LW_CCP_HDD])
+            if headers.strip("\r\x07\x0c \t\x13\x14\x15"):
+                raise UnsupportedFeature("包含页眉页脚")
+        self._build_blocks(ccp_text)
+        return self.document
+
+    def main_text(self):
+        self.pieces = self._read_pieces()
+        self._piece_starts = [piece.cp_start for piece in self.pieces]
+        self.chpx = []
+        self._chpx_starts = []
+        return self._text(0, self.lengths[LW_CCP_TEXT])
+
+    def _read_pieces(self):
+        fc, lcb = self._fc(FC_CLX)
+        table = self.table
+        pos, end = fc, fc + lcb
+        while pos < end:
+            clxt = table[pos]
+            if clxt == 1:
+                size, = struct.unpack_from("<H", table, pos + 1)
+                pos += 3 + size
+            elif clxt == 2:
+                size, = struct.unpack_from("<I", table, pos + 1)
+                count = (size - 4) // 12
+                cps = struct.unpack_from(f"<{count + 1}I", table, pos + 5)
+                pieces = []
+                for i in range(count):
+                    _, fc_value, _ = struct.unpack_from("<HIH", table, pos + 5 + (count + 1) * 4 + i * 8)
+                    compressed = bool(fc_value & 0x40000000)
+                    fc_value &= 0x3FFFFFFF
+                    if compressed:
+                        fc_value //= 2
+                    pieces.append(Piece(cps[i], cps[i + 1], fc_value, compressed))
+                return pieces
+            else:
+                raise DocFormatError("片段表结构损坏")
+        raise DocFormatError("没有片段表")
+
+    def _read_formatted_pages(self, index, paragraph):
+        """读取 CHPX / PAPX 格式页，返回按 FC 排序的 (起始FC, 结束FC, grpprl, 样式编号)"""
+        fc, lcb = self._fc(index)
+        if not lcb:
+            return []
+        count = (lcb - 4) // 8
+        page_numbers = struct.unpack_from(f"<{count}I", self.table, fc + (count + 1) * 4)
+        entries = []
+        for page_number in page_numbers:
+            offset = (page_number & 0x3FFFFF) * FKP_SIZE
+            page = self.word[offset:offset + FKP_SIZE]
+            if len(page) < FKP_SIZE:
+                raise DocFormatError("格式页超出流末尾")
+            run_count = page[FKP_SIZE - 1]
+            fcs = struct.unpack_from(f"<{run_count + 1}I", page, 0)
+            for i in range(run_count):
+                istd = 0
+                if paragraph:
+                    position = page[(run_count + 1) * 4 + i * 13] * 2
+                    grpprl = b""
+                    if position:
+                        size = page[position]
+                        start = position + 1
+                        if size == 0:
+                            size = page[position + 1] * 2
+                            start = position + 2
+                        else:
+                            size = size * 2 - 1
+                        istd, = struct.unpack_from("<H", page, start)
+                        grpprl = bytes(page[start + 2:start + size])
+                else:
+                    position = page[(run_count + 1) * 4 + i] * 2
+                    grpprl = bytes(page[position + 1:position + 1 + page[position]]) if position else b""
+                entries.append((fcs[i], fcs[i + 1], grpprl, istd))
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def _read_fonts(self):
+        fc, lcb = self._fc(FC_STTBF_FFN)
+        if not lcb:
+            return []
+        table = self.table
+        count, = struct.unpack_from("<H", table, fc)
+        pos = fc + 4
+        fonts = []
+        for _ in range(count):
+            size = table[pos] + 1
+            name = str(table[pos + 40:pos + size], "utf-16-le", "replace")
+            fonts.append(name.split("\x00", 1)[0])
+            pos += size
+        return fonts
+
+    def _read_styles(self):
+        fc, lcb = self._fc(FC_STSHF)
+        if not lcb:
+            return {}
+        table = self.table
+        header_size, = struct.unpack_from("<H", table, fc)
+        count, base_size = struct.unpack_from("<HH", table, fc + 2)
+        pos = fc + 2 + header_size
+        styles = {}
+        for istd in range(count):
+            size, = struct.unpack_from("<H", table, pos)
+            std = table[pos + 2:pos + 2 + size]
+            pos += 2 + size
+            if not size:
+                continue
+            word1, word2, word3 = struct.unpack_from("<HHH", std, 0)
+            kind = word2 & 0x0F
+            base = word2 >> 4
+            upx_count = word3 & 0x0F
+            offset = base_size
+            name_length, = struct.unpack_from("<H", std, offset)
+            name = str(std[offset + 2:offset + 2 + name_length * 2], "utf-16-le", "replace")
+            offset += 2 + name_length * 2 + 2
+            upxs = []
+            for _ in range(upx_count):
+                if offset + 2 > len(std):
+                    break
+                upx_size, = struct.unpack_from("<H", std, offset)
+                upxs.append(bytes(std[offset + 2:offset + 2 + upx_size]))
+                offset += 2 + upx_size + (upx_size & 1)
+            paragraph = character = b""
+            if kind == STK_PARAGRAPH:
+                # UpxPapx 以样式编号开头
+                paragraph = upxs[0][2:] if upxs else b""
+                character = upxs[1] if len(upxs) > 1 else b""
+            elif kind == STK_CHARACTER:
+                character = upxs[0] if upxs else b""
+            styles[istd] = Style(istd, word1 & 0x0FFF, kind, None if base == ISTD_NIL else base,
+                                 name, paragraph, character)
+        return styles
+
+    def _read_sections(self):
+        fc, lcb = self._fc(FC_PLCF_SED)
+        sections = []
+        if lcb:
+            count = (lcb - 4) // 16
+            cps = struct.unpack_from(f"<{count + 1}I", self.table, fc)
+            for i in range(count):
+                _, sepx_fc = struct.unpack_from("<HI", self.table, fc + (count + 1) * 4 + i * 12)
+                section = dict(DEFAULT_SECTION)
+                if sepx_fc != 0xFFFFFFFF and sepx_fc + 2 <= len(self.word):
+                    size, = struct.unpack_from("<H", self.word, sepx_fc)
+                    _apply_section_sprms(section, self.word[sepx_fc + 2:sepx_fc + 2 + size])
+                sections.append((cps[i + 1], section))
+        if not sections:
+            sections.append((self.lengths[LW_CCP_TEXT], dict(DEFAULT_SECTION)))
+        self.section_ends = {cp: section for cp, section in sections}
+        self.document.sections = [section for _, section in sections]
+
+    def _iter_runs(self, cp_start, cp_end):
+        """产出 (文本, 起始CP, 起始FC, 每字符字节数, CHPX grpprl)，每段不跨越片段和 CHPX 边界"""
+        index = max(0, bisect_right(self._piece_starts, cp_start) - 1)
+        for piece in self.pieces[index:]:
+            if piece.cp_start >= cp_end:
+                break
+            start = max(cp_start, piece.cp_start)
+            end = min(cp_end, piece.cp_end)
+            if start >= end:
+                continue
+            width = 1 if piece.compressed else 2
+            encoding = "cp1252" if piece.compressed else "utf-16-le"
+            fc = piece.fc + (start - piece.cp_start) * width
+            fc_end = fc + (end - start) * width
+            if fc_end > len(self.word):
+                raise DocFormatError("文本超出流末尾")
+            cp = start
+            while fc < fc_end:
+                run = bisect_right(self._chpx_starts, fc) - 1
+                if run >= 0 and fc < self.chpx[run][1]:
+                    grpprl = self.chpx[run][2]
+                    next_fc = min(fc_end, self.chpx[run][1])
+                else:
+                    grpprl = b""
+                    next_fc = fc_end
+                    if run + 1 < len(self.chpx):
+                        next_fc = min(fc_end, self.chpx[run + 1][0])
+                # CHPX 边界总落在字符边界上，防御性地按字符宽度对齐
+                next_fc = max(fc + width, next_fc - (next_fc - fc) % width)
+                text = str(self.word[fc:next_fc], encoding, "replace")
+                yield text, cp, fc, width, grpprl
+                cp += len(text)
+                fc = next_fc
+
+    def _text(self, cp_start, cp_end):
+        return "".join(run[0] for run in self._iter_runs(cp_start, cp_end))
+
+    def _paragraph_properties(self, fc):
+        entry = bisect_right(self._papx_starts, fc) - 1
+        if entry >= 0 and fc < self.papx[entry][1]:
+            return self.papx[entry][3], self.papx[entry][2]
+        return 0, b""
+
+    def _style_character(self, istd):
+        """样式（含基准样式链）最终的字符属性，用于解析 0x80 / 0x81 开关值"""
+        cached = self._style_character_cache.get(istd)
+        if cached is not None:
+            return cached
+        self._style_character_cache[istd] = {}
+        style = self.document.styles.get(istd)
+        props = {}
+        if style is not None:
+            if style.base is not None:
+                props.update(self._style_character(style.base))
+            apply_character_sprms(props, style.character, props, self.document.fonts)
+        self._style_character_cache[istd] = props
+        return props
+
+    def character_props(self, grpprl, paragraph_istd):
+        key = (grpprl, paragraph_istd)
+        cached = self._character_cache.get(key)
+        if cached is not None:
+            return cached
+        char_istd = None
+        for sprm, operand in iter_sprms(grpprl):
+            if sprm == SPRM_C_ISTD:
+                char_istd = _uint16(operand)
+        base = dict(self._style_character(paragraph_istd))
+        if char_istd is not None:
+            base.update(self._style_character(char_istd))
+        props = {}
+        apply_character_sprms(props, grpprl, base, self.document.fonts)
+        if props.pop("revision", False):
+            raise UnsupportedFeature("包含修订标记")
+        if char_istd is not None and char_istd in self.document.styles:
+            props["style"] = char_istd
+        result = tuple(sorted(props.items()))
+        self._character_cache[key] = result
+        return result
+
+    def _iter_paragraphs(self, ccp_text):
+        """产出 (Run 列表, 段落结束字符, 段落样式, PAPX grpprl, 段落标记的字符属性, 分节)"""
+        runs = []
+        field_stack = []
+        for text, cp, fc, width, grpprl in self._iter_runs(0, ccp_text):
+            if FIELD_BEGIN in text or FIELD_SEPARATOR in text or FIELD_END in text or field_stack:
+                text = _field_results(text, field_stack)
+            if CHAR_PICTURE in text or CHAR_DRAWN_OBJECT in text:
+                raise UnsupportedFeature("包含图片或图形")
+            start = 0
+            for match in _PARAGRAPH_END.finditer(text):
+                index = match.start()
+                mark = match.group()
+                mark_cp = cp + index
+                section = self.section_ends.get(mark_cp + 1)
+                if mark == CHAR_SECTION and section is None:
+                    # 不在分节处的 0x0C 是分页符
+                    continue
+                istd, papx = self._paragraph_properties(fc + index * width)
+                if index > start:
+                    runs.append((text[start:index], grpprl))
+                yield runs, mark, istd, papx, grpprl, section
+                runs = []
+                start = index + 1
+            if start < len(text):
+                runs.append((text[start:], grpprl))
+
+    def _build_blocks(self, ccp_text):
+        blocks = self.document.blocks
+        rows = []
+        cells = []
+        cell_paragraphs = []
+        last_section = self.document.sections[-1]
+        for runs, mark, istd, papx, mark_grpprl, section in self._iter_paragraphs(ccp_text):
+            props, table_info = paragraph_props(papx, istd)
+            if table_info.get("depth", 1) > 1:
+                raise UnsupportedFeature("包含嵌套表格")
+            if table_info.get("list"):
+                raise UnsupportedFeature("包含项目符号或编号列表")
+            paragraph = Paragraph(
+                [Run(text, self.character_props(grpprl, istd)) for text, grpprl in runs],
+                props, self.character_props(mark_grpprl, istd),
+                section if section is not last_section else None)
+
+            if not table_info.get("in_table"):
+                if rows:
+                    blocks.append(_make_table(rows))
+                    rows = []
+                if cells or cell_paragraphs:
+                    raise DocFormatError("表格行不完整")
+                blocks.append(paragraph)
+            elif table_info.get("row_end"):
+                rows.append((cells, table_info.get("definition")))
+                cells = []
+            elif mark == CHAR_CELL:
+                cell_paragraphs.append(paragraph)
+                cells.append(cell_paragraphs)
+                cell_paragraphs = []
+            else:
+                cell_paragraphs.append(paragraph)
+        if cells or cell_paragraphs:
+            raise DocFormatError("表格行不完整")
+        if rows:
+            blocks.append(_make_table(rows))
+
+
+def _field_results(text, field_stack):
+    """只保留域结果（0x14 与 0x15 之间的文字），丢弃域代码
+
+    field_stack 记录尚未结束的域，True 表示已进入结果部分，可跨多段文字保持状态。
+    """
+    parts = []
+    start = 0
+    for match in _FIELD_CHARS.finditer(text):
+        if all(field_stack) and match.start() > start:
+            parts.append(text[start:match.start()])
+        char = match.group()
+        if char == FIELD_BEGIN:
+            field_stack.append(False)
+        elif char == FIELD_SEPARATOR:
+            if field_stack:
+                field_stack[-1] = True
+        elif field_stack:
+            field_stack.pop()
+        start = match.end()
+    if all(field_stack) and start < len(text):
+        parts.append(text[start:])
+    return "".join(parts)
+
+
+def apply_character_sprms(props, grpprl, base, fonts):
+    """把字符 sprm 应用到属性字典；base 为样式的字符属性，用于开关值 0x80 / 0x81"""
+    for sprm, operand in iter_sprms(grpprl):
+        if not operand:
+            continue
+        if sprm in TOGGLE_PROPERTIES:
+            key = TOGGLE_PROPERTIES[sprm]
+            value = operand[0]
+            if value == 0x80:
+                props[key] = base.get(key, False)
+            elif value == 0x81:
+                props[key] = not base.get(key, False)
+            else:
+                props[key] = bool(value)
+        elif sprm in (SPRM_C_RMARK_DEL, SPRM_C_RMARK_INS):
+            if operand[0]:
+                props["revision"] = True
+        elif sprm == SPRM_C_DSTRIKE:
+            props["double_strike"] = bool(operand[0])
+        elif sprm == SPRM_C_UNDERLINE:
+            props["underline"] = UNDERLINE_STYLES.get(operand[0], "single") if operand[0] else None
+        elif sprm == SPRM_C_HPS:
+            props["size"] = _uint16(operand)
+        elif sprm == SPRM_C_ICO:
+            color = operand[0]
+            props["color"] = ICO_COLORS[color] if color < len(ICO_COLORS) else None
+        elif sprm == SPRM_C_CV and len(operand) >= 4:
+            red, green, blue, auto = operand[:4]
+            props["color"] = None if auto == 0xFF else f"{red:02X}{green:02X}{blue:02X}"
+        elif sprm == SPRM_C_HIGHLIGHT:
+            color = operand[0]
+            props["highlight"] = HIGHLIGHT_COLORS[color] if color < len(HIGHLIGHT_COLORS) else None
+        elif sprm == SPRM_C_ISS:
+            props["vertical_align"] = {1: "superscript", 2: "subscript"}.get(operand[0])
+        elif sprm in (SPRM_C_FONT_ASCII, SPRM_C_FONT_EAST_ASIA, SPRM_C_FONT_OTHER) and len(operand) >= 2:
+            index = _uint16(operand)
+            if index < len(fonts):
+                key = {SPRM_C_FONT_ASCII: "font_ascii", SPRM_C_FONT_EAST_ASIA: "font_east_asia",
+                       SPRM_C_FONT_OTHER: "font_other"}[sprm]
+                props[key] = fonts[index]
+
+
+def paragraph_props(grpprl, istd=None):
+    """把段落 sprm 转成 (段落属性元组, 表格信息字典)"""
+    props = {}
+    table_info = {}
+    if istd is not None:
+        props["style"] = istd
+    for sprm, operand in iter_sprms(grpprl):
+        if not operand:
+            continue
+        if sprm in (SPRM_P_JC80, SPRM_P_JC):
+            props["align"] = ALIGNMENTS.get(operand[0], "left")
+        elif sprm in (SPRM_P_DXA_LEFT80, SPRM_P_DXA_LEFT):
+            props["left"] = _int16(operand)
+        elif sprm in (SPRM_P_DXA_RIGHT80, SPRM_P_DXA_RIGHT):
+            props["right"] = _int16(operand)
+        elif sprm in (SPRM_P_DXA_LEFT1_80, SPRM_P_DXA_LEFT1):
+            props["first_line"] = _int16(operand)
+        elif sprm == SPRM_P_DYA_BEFORE:
+            props["before"] = _uint16(operand)
+        elif sprm == SPRM_P_DYA_AFTER:
+            props["after"] = _uint16(operand)
+        elif sprm == SPRM_P_DYA_LINE and len(operand) >= 4:
+            line, multiple = struct.unpack_from("<hh", operand, 0)
+            props["line"] = (line, bool(multiple))
+        elif sprm == SPRM_P_IN_TABLE:
+            table_info["in_table"] = bool(operand[0])
+        elif sprm == SPRM_P_TTP:
+            table_info["row_end"] = bool(operand[0])
+        elif sprm == SPRM_P_ITAP and len(operand) >= 4:
+            table_info["depth"] = struct.unpack_from("<i", operand, 0)[0]
+        elif sprm == SPRM_P_ILFO:
+            table_info["list"] = _uint16(operand) != 0
+        elif sprm in (SPRM_T_DEF_TABLE, SPRM_T_DEF_TABLE10):
+            table_info["definition"] = _table_definition(operand)
+        elif sprm == SPRM_T_TABLE_BORDERS80 and len(operand) >= 24:
+            table_info["borders"] = tuple(_has_border(operand, i * 4) for i in range(6))
+    if table_info.get("row_end") and "borders" in table_info and table_info.get("definition"):
+        table_info["definition"]["borders"] = table_info["borders"]
+    return tuple(sorted(props.items())), table_info
+
+
+def _has_border(operand, offset):
+    """Brc80 的线型不为 0（无）且不为 0xFF（未设置）"""
+    return operand[offset + 1] not in (0, 0xFF)
+
+
+def _table_definition(operand):
+    """sprmTDefTable：列边界和每个单元格的合并、边框信息"""
+    count = operand[0]
+    centers = struct.unpack_from(f"<{count + 1}h", operand, 1)
+    cells = []
+    offset = 1 + (count + 1) * 2
+    for i in range(count):
+        merge = 0
+        borders = (False, False, False, False)
+        if offset + 20 <= len(operand):
+            merge, = struct.unpack_from("<H", operand, offset)
+            # TC80 的边框顺序为上、左、下、右
+            borders = tuple(_has_border(operand, offset + 4 + side * 4) for side in range(4))
+        cells.append((centers[i + 1] - centers[i], merge, borders))
+        offset += 20
+    return {"cells": cells}
+
+
+def _make_table(rows):
+    table_rows = []
+    table_borders = None
+    for cells, definition in rows:
+        cell_defs = definition["cells"] if definition else []
+        if definition and definition.get("borders"):
+            table_borders = definition["borders"]
+        row_cells = []
+        skip = 0
+        for index, paragraphs in enumerate(cells):
+            if skip:
+                skip -= 1
+                continue
+            width, merge, borders = cell_defs[index] if index < len(cell_defs) else (0, 0, (False,) * 4)
+            span = 1
+            if merge & 0x0001:
+                # Word 97 的水平合并：首个单元格后紧跟的 fMerged 单元格并入
+                while index + span < len(cells) and index + span < len(cell_defs) \
+                        and cell_defs[index + span][1] & 0x0002:
+                    width += cell_defs[index + span][0]
+                    span += 1
+                skip = span - 1
+            vertical = None
+            if merge & 0x0020:
+                vertical = "restart" if merge & 0x0040 else "continue"
+            row_cells.append(Cell(paragraphs, width, span, vertical, borders))
+        table_rows.append(Row(row_cells))
+    return Table(table_rows, table_borders)
+
+
+def _apply_section_sprms(section, grpprl):
+    for sprm, operand in iter_sprms(grpprl):
+        if not operand:
+            continue
+        if sprm == SPRM_S_XA_PAGE:
+            section["width"] = _uint16(operand)
+        elif sprm == SPRM_S_YA_PAGE:
+            section["height"] = _uint16(operand)
+        elif sprm == SPRM_S_DXA_LEFT:
+            section["left"] = _uint16(operand)
+        elif sprm == SPRM_S_DXA_RIGHT:
+            section["right"] = _uint16(operand)
+        elif sprm == SPRM_S_DYA_TOP:
+            section["top"] = abs(_int16(operand))
+        elif sprm == SPRM_S_DYA_BOTTOM:
+            section["bottom"] = abs(_int16(operand))
+        elif sprm == SPRM_S_ORIENTATION:
+            section["landscape"] = operand[0] == 2
+        elif sprm == SPRM_S_COLUMNS:
+            section["columns"] = _uint16(operand) + 1
+        elif sprm == SPRM_S_BKC:
+            section["break"] = operand[0]
@@ -0,0 +1,287 @@
+import re
+import zipfile
+from functools import lru_cache
+
+from doc_reader import STK_CHARACTER, STK_PARAGRAPH, Paragraph, apply_character_sprms, paragraph_props
+from ooxml_package import CORE_PROPERTIES_REL, CORE_PROPERTIES_TYPE, core_properties_xml, xml_text
+
+# 把 doc_reader 读出的 Document 写成最简 DOCX 包：段落、字符格式、段落样式、表格和分节。
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+)
+
+ROOT_RELS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+)
+
+DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Type="{REL_NS}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+SECTION_BREAKS = {0: "continuous", 1: "nextColumn", 2: "nextPage", 3: "evenPage", 4: "oddPage"}
+
+# 内置标题样式（sti 1-9）对应的大纲级别
+HEADING_STI = range(1, 10)
+
+# 内置样式（sti）的标准英文名称：中文版 Word 保存的是本地化名称，
+# 写成标准名称后 Word 才能把它们识别为内置的“标题 1”“正文”等样式
+BUILTIN_STYLE_NAMES = {
+    0: "Normal", 62: "Title", 65: "Default Paragraph Font", 74: "Subtitle",
+    85: "Hyperlink", 86: "FollowedHyperlink", 87: "Strong", 88: "Emphasis",
+}
+BUILTIN_STYLE_NAMES.update({sti: f"heading {sti}" for sti in HEADING_STI})
+BUILTIN_STYLE_NAMES.update({19 + level: f"toc {level + 1}" for level in range(9)})
+
+# Word 97 未设置字号时的默认值（半磅）
+DEFAULT_FONT_SIZE = 20
+
+# 正文中的特殊字符 → 对应的 WordprocessingML 元素
+SPECIAL_CHARS = {
+    "\t": "<w:tab/>",
+    "\x0b": "<w:br/>",
+    "\x0c": '<w:br w:type="page"/>',
+    "\x0e": '<w:br w:type="column"/>',
+    "\x1e": "<w:noBreakHyphen/>",
+    "\x1f": "<w:softHyphen/>",
+}
+
+_SPECIAL_SPLIT = re.compile("([\t\x0b\x0c\x0e\x1e\x1f])")
+
+
+def _preserve(text):
+    return ' xml:space="preserve"' if text[:1].isspace() or text[-1:].isspace() else ""
+
+
+def write_document(document, target_path):
+    with zipfile.ZipFile(target_path, "w", zipfile.ZIP_DEFLATED) as package:
+        properties = document.properties
+        package.writestr("[Content_Types].xml", CONTENT_TYPES_HEAD
+                         + (CORE_PROPERTIES_TYPE if properties else "") + "</Types>")
+        package.writestr("_rels/.rels", ROOT_RELS_HEAD + (CORE_PROPERTIES_REL if properties else "") + "</Relationships>")
+        if properties:
+            package.writestr("docProps/core.xml", core_properties_xml(properties))
+        package.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        package.writestr("word/styles.xml", _styles_xml(document))
+        with package.open("word/document.xml", "w") as part:
+            part.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        f'<w:document xmlns:w="{W_NS}" xmlns:r="{REL_NS}"><w:body>').encode("utf-8"))
+            writer = _BodyWriter(document)
+            for block in document.blocks:
+                if isinstance(block, Paragraph):
+                    part.write(writer.paragraph(block).encode("utf-8"))
+                else:
+                    part.write(writer.table(block).encode("utf-8"))
+            part.write((_section_xml(document.sections[-1]) + "</w:body></w:document>").encode("utf-8"))
+
+
+@lru_cache(maxsize=4096)
+def _run_properties_xml(props, styles=None):
+    values = dict(props)
+    parts = []
+    if "style" in values and styles is not None and values["style"] in styles:
+        parts.append(f'<w:rStyle w:val="S{values["style"]}"/>')
+    fonts = []
+    if values.get("font_ascii"):
+        fonts.append(f'w:ascii="{xml_text(values["font_ascii"])}"')
+    if values.get("font_other"):
+        fonts.append(f'w:hAnsi="{xml_text(values["font_other"])}"')
+    elif values.get("font_ascii"):
+        fonts.append(f'w:hAnsi="{xml_text(values["font_ascii"])}"')
+    if values.get("font_east_asia"):
+        fonts.append(f'w:eastAsia="{xml_text(values["font_east_asia"])}"')
+    if fonts:
+        parts.append(f"<w:rFonts {' '.join(fonts)}/>")
+    for key, tag in (("bold", "b"), ("italic", "i"), ("caps", "caps"), ("small_caps", "smallCaps"),
+                     ("strike", "strike"), ("double_strike", "dstrike"), ("vanish", "vanish")):
+        if key in values:
+            parts.append(f"<w:{tag}/>" if values[key] else f'<w:{tag} w:val="0"/>')
+    if values.get("color"):
+        parts.append(f'<w:color w:val="{values["color"]}"/>')
+    if values.get("size"):
+        parts.append(f'<w:sz w:val="{values["size"]}"/><w:szCs w:val="{values["size"]}"/>')
+    if values.get("highlight"):
+        parts.append(f'<w:highlight w:val="{values["highlight"]}"/>')
+    if "underline" in values:
+        parts.append(f'<w:u w:val="{values["underline"] or "none"}"/>')
+    if values.get("vertical_align"):
+        parts.append(f'<w:vertAlign w:val="{values["vertical_align"]}"/>')
+    return f"<w:rPr>{''.join(parts)}</w:rPr>" if parts else ""
+
+
+def _paragraph_properties_xml(props, styles, outline_level=None):
+    values = dict(props)
+    parts = []
+    if "style" in values and values["style"] in styles and values["style"] != 0:
+        parts.append(f'<w:pStyle w:val="S{values["style"]}"/>')
+    spacing = []
+    if "before" in values:
+        spacing.append(f'w:before="{values["before"]}"')
+    if "after" in values:
+        spacing.append(f'w:after="{values["after"]}"')
+    if "line" in values:
+        line, multiple = values["line"]
+        if multiple:
+            spacing.append(f'w:line="{line}" w:lineRule="auto"')
+        elif line < 0:
+            spacing.append(f'w:line="{-line}" w:lineRule="exact"')
+        elif line:
+            spacing.append(f'w:line="{line}" w:lineRule="atLeast"')
+    if spacing:
+        parts.append(f"<w:spacing {' '.join(spacing)}/>")
+    indent = []
+    if "left" in values:
+        indent.append(f'w:left="{values["left"]}"')
+    if "right" in values:
+        indent.append(f'w:right="{values["right"]}"')
+    if "first_line" in values:
+        first_line = values["first_line"]
+        indent.append(f'w:hanging="{-first_line}"' if first_line < 0 else f'w:firstLine="{first_line}"')
+    if indent:
+        parts.append(f"<w:ind {' '.join(indent)}/>")
+    if "align" in values:
+        parts.append(f'<w:jc w:val="{values["align"]}"/>')
+    if outline_level is not None:
+        parts.append(f'<w:outlineLvl w:val="{outline_level}"/>')
+    return "".join(parts)
+
+
+def _section_xml(section):
+    break_type = SECTION_BREAKS.get(section["break"], "nextPage")
+    orient = ' w:orient="landscape"' if section["landscape"] else ""
+    columns = f'<w:cols w:num="{section["columns"]}"/>' if section["columns"] > 1 else ""
+    return (
+        f'<w:sectPr><w:type w:val="{break_type}"/>'
+        f'<w:pgSz w:w="{section["width"]}" w:h="{section["height"]}"{orient}/>'
+        f'<w:pgMar w:top="{section["top"]}" w:right="{section["right"]}" w:bottom="{section["bottom"]}" '
+        f'w:left="{section["left"]}" w:header="851" w:footer="992" w:gutter="0"/>{columns}</w:sectPr>'
+    )
+
+
+def _run_xml(text, rpr):
+    parts = []
+    for piece in _SPECIAL_SPLIT.split(text):
+        if not piece:
+            continue
+        special = SPECIAL_CHARS.get(piece)
+        if special is not None:
+            parts.append(special)
+        else:
+            piece = xml_text(piece)
+            if piece:
+                parts.append(f"<w:t{_preserve(piece)}>{piece}</w:t>")
+    if not parts:
+        return ""
+    return f"<w:r>{rpr}{''.join(parts)}</w:r>"
+
+
+class _BodyWriter:
+    def __init__(self, document):
+        self.document = document
+        self.styles = frozenset(istd for istd, style in document.styles.items() if style.kind == STK_CHARACTER)
+        self.paragraph_styles = frozenset(
+            istd for istd, style in document.styles.items() if style.kind == STK_PARAGRAPH)
+
+    def paragraph(self, paragraph):
+        ppr = _paragraph_properties_xml(paragraph.props, self.paragraph_styles)
+        mark = _run_properties_xml(paragraph.mark_props, self.styles)
+        if mark:
+            ppr += mark
+        if paragraph.section is not None:
+            ppr += _section_xml(paragraph.section)
+        runs = "".join(_run_xml(run.text, _run_properties_xml(run.props, self.styles)) for run in paragraph.runs)
+        return f"<w:p>{f'<w:pPr>{ppr}</w:pPr>' if ppr else ''}{runs}</w:p>"
+
+    def table(self, table):
+        grid = []
+        for row in table.rows:
+            widths = []
+            for cell in row.cells:
+                widths.extend([max(cell.width // cell.span, 1)] * cell.span)
+            if len(widths) > len(grid):
+                grid = widths
+        parts = ['<w:tbl><w:tblPr><w:tblW w:w="0" w:type="auto"/>']
+        if table.borders:
+            sides = []
+            for side, present in zip(("top", "left", "bottom", "right", "insideH", "insideV"), table.borders):
+                sides.append(f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+                             if present else f'<w:{side} w:val="nil"/>')
+            parts.append(f"<w:tblBorders>{''.join(sides)}</w:tblBorders>")
+        parts.append('<w:tblLayout w:type="fixed"/></w:tblPr><w:tblGrid>')
+        parts.extend(f'<w:gridCol w:w="{width}"/>' for width in grid)
+        parts.append("</w:tblGrid>")
+        for row in table.rows:
+            parts.append("<w:tr>")
+            for cell in row.cells:
+                tcpr = [f'<w:tcW w:w="{max(cell.width, 0)}" w:type="dxa"/>']
+                if cell.span > 1:
+                    tcpr.append(f'<w:gridSpan w:val="{cell.span}"/>')
+                if cell.vertical_merge == "restart":
+                    tcpr.append('<w:vMerge w:val="restart"/>')
+                elif cell.vertical_merge == "continue":
+                    tcpr.append("<w:vMerge/>")
+                if any(cell.borders):
+                    sides = "".join(
+                        f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+                        for side, present in zip(("top", "left", "bottom", "right"), cell.borders) if present
+                    )
+                    tcpr.append(f"<w:tcBorders>{sides}</w:tcBorders>")
+                paragraphs = "".join(self.paragraph(paragraph) for paragraph in cell.paragraphs) or "<w:p/>"
+                parts.append(f"<w:tc><w:tcPr>{''.join(tcpr)}</w:tcPr>{paragraphs}</w:tc>")
+            parts.append("</w:tr>")
+        parts.append("</w:tbl>")
+        return "".join(parts)
+
+
+def _styles_xml(document):
+    fonts = document.fonts
+    default_font = ""
+    if fonts:
+        name = xml_text(fonts[0])
+        default_font = f'<w:rFonts w:ascii="{name}" w:hAnsi="{name}" w:cs="{name}"/>'
+    styles = []
+    known = {istd for istd, style in document.styles.items() if style.kind in (STK_PARAGRAPH, STK_CHARACTER)}
+    for istd, style in sorted(document.styles.items()):
+        if style.kind not in (STK_PARAGRAPH, STK_CHARACTER):
+            continue
+        kind = "paragraph" if style.kind == STK_PARAGRAPH else "character"
+        name = BUILTIN_STYLE_NAMES.get(style.sti, style.name)
+        default = ' w:default="1"' if istd == 0 or (style.kind == STK_CHARACTER and style.sti == 65) else ""
+        parts = [f'<w:style w:type="{kind}"{default} w:styleId="S{istd}"><w:name w:val="{xml_text(name)}"/>']
+        if style.base is not None and style.base in known:
+            parts.append(f'<w:basedOn w:val="S{style.base}"/>')
+        if style.kind == STK_PARAGRAPH:
+            props, _ = paragraph_props(style.paragraph)
+            outline_level = style.sti - 1 if style.sti in HEADING_STI else None
+            ppr = _paragraph_properties_xml(props, known, outline_level)
+            if ppr:
+                parts.append(f"<w:pPr>{ppr}</w:pPr>")
+        character = {}
+        apply_character_sprms(character, style.character, {}, fonts)
+        character.pop("revision", None)
+        rpr = _run_properties_xml(tuple(sorted(character.items())))
+        if rpr:
+            parts.append(rpr)
+        parts.append("</w:style>")
+        styles.append("".join(parts))
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<w:styles xmlns:w="{W_NS}">'
+        f'<w:docDefaults><w:rPrDefault><w:rPr>{default_font}'
+        f'<w:sz w:val="{DEFAULT_FONT_SIZE}"/><w:szCs w:val="{DEFAULT_FONT_SIZE}"/></w:rPr></w:rPrDefault>'
+        '<w:pPrDefault/></w:docDefaults>'
+        + "".join(styles) + "</w:styles>"
+    )
@@ -0,0 +1,231 @@
+import fnmatch
+import hashlib
+import json
+import os
+import queue
+import stat
+from collections import namedtuple
+from threading import Event, Thread
+
+# 工作项类型
+KIND_DOC = "doc"
+KIND_XLS = "xls"
+
+WorkItem = namedtuple("WorkItem", ["kind", "path", "size", "mtime"])
+
+# 转换程序自己在源目录下创建的文件夹：默认归档文件夹、超时文件的隔离文件夹
+ARCHIVE_FOLDER_NAME = "旧格式文件"
+QUARANTINE_FOLDER_NAME = "隔离文件"
+
+# 默认排除的目录：默认归档文件夹、超时隔离文件夹和 Windows 系统目录
+DEFAULT_EXCLUDE_PATTERNS = (ARCHIVE_FOLDER_NAME, QUARANTINE_FOLDER_NAME, "$RECYCLE.BIN", "System Volume Information")
+
+_HIDDEN_OR_SYSTEM = getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0x2) | getattr(stat, "FILE_ATTRIBUTE_SYSTEM", 0x4)
+
+
+class DiscoveryStats:
+    """遍历统计：扫描/剪枝/未变化的目录数、被排除的锁定文件数、未变化的文件数和无法访问的条目数"""
+
+    def __init__(self):
+        self.dirs_scanned = 0
+        self.dirs_pruned = 0
+        self.lock_files_skipped = 0
+        self.errors = 0
+        self.dirs_unchanged = 0
+        self.files_unchanged = 0
+
+    def summary(self):
+        text = (f"扫描目录 {self.dirs_scanned} 个，排除目录 {self.dirs_pruned} 个，"
+                f"忽略锁定文件 {self.lock_files_skipped} 个，无法访问 {self.errors} 个")
+        if self.dirs_unchanged or self.files_unchanged:
+            text += f"，未变化目录 {self.dirs_unchanged} 个，未变化文件 {self.files_unchanged} 个"
+        return text
+
+
+def parse_exclude_patterns(text):
+    """把以分号或换行分隔的排除规则文本解析为列表"""
+    return [part.strip() for part in text.replace("\n", ";").split(";") if part.strip()]
+
+
+def _is_hidden_or_system(entry):
+    if entry.name.startswith("."):
+        return True
+    try:
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    except OSError:
+        return False
+    return bool(attributes & _HIDDEN_OR_SYSTEM)
+
+
+def _matches_any(entry, patterns):
+    name = entry.name.lower()
+    path = os.path.normpath(entry.path).lower()
+    for pattern in patterns:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern):
+            return True
+    return False
+
+
+def converter_folders(source_directory, archive_dir=None):
+    """转换程序自己使用的文件夹（归档文件夹和隔离文件夹），作为 exclude_dirs 始终排除
+
+    与用户的排除规则分开：用户用自己的规则替换默认规则时，这些文件夹仍不会被再次转换。
+    archive_dir 为 None 时使用源目录下的默认归档文件夹。
+    """
+    return [archive_dir or os.path.join(source_directory, ARCHIVE_FOLDER_NAME),
+            os.path.join(source_directory, QUARANTINE_FOLDER_NAME)]
+
+
+def build_extension_map(convert_doc=True, convert_xls=True):
+    """根据勾选的转换类型生成 扩展名 → 工作项类型 的映射"""
+    extensions = {}
+    if convert_doc:
+        extensions[".doc"] = KIND_DOC
+    if convert_xls:
+        extensions[".xls"] = KIND_XLS
+    return extensions
+
+
+def scan_config(extensions, exclude_dirs=(), exclude_patterns=DEFAULT_EXCLUDE_PATTERNS, skip_hidden=True):
+    """把影响枚举结果的配置（转换类型、排除目录和规则、是否跳过隐藏目录）归一化为一个摘要
+
+    转换清单按目录记录该摘要，配置变化后目录会被重新枚举。
+    """
+    config = {
+        "extensions": sorted(extensions.items()),
+        "exclude_dirs": sorted({os.path.normcase(os.path.normpath(path)) for path in exclude_dirs if path}),
+        "exclude_patterns": sorted({pattern.lower() for pattern in exclude_patterns}),
+        "skip_hidden": bool(skip_hidden),
+    }
+    return hashlib.sha1(json.dumps(config, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def iter_work_items(source_directory, extensions, exclude_dirs=(), should_stop=None,
+                    exclude_patterns=DEFAULT_EXCLUDE_PATTERNS, skip_hidden=True, stats=None,
+                    manifest=None):
+    """基于 os.scandir 的单次遍历，按发现顺序产出 WorkItem
+
+    排除的目录在进入之前即被剪枝，不会被枚举：
+    exclude_dirs 为需要排除的具体路径（如归档文件夹），
+    exclude_patterns 为按目录名或完整路径匹配的通配符规则，
+    skip_hidden 为 True 时同时跳过隐藏目录和系统目录。
+    以 "~" 开头的 Office 锁定文件（~$xxx.doc）会被忽略。
+    scandir 在 Windows 上直接返回文件大小和修改时间，不需要额外的 stat 调用。
+    传入 manifest（ConversionManifest）时，未变化（含扫描配置未变）的目录只按记录的子目录继续遍历，
+    未变化的文件不会产出。
+    """
+    if stats is None:
+        stats = DiscoveryStats()
+    config = scan_config(extensions, exclude_dirs, exclude_patterns, skip_hidden) if manifest is not None else None
+    excluded = {os.path.normcase(os.path.normpath(path)) for path in exclude_dirs if path}
+    patterns = [pattern.lower() for pattern in exclude_patterns]
+    stack = [source_directory]
+    while stack:
+        if should_stop is not None and should_stop():
+            return
+        directory = stack.pop()
+        if manifest is not None:
+            known_subdirs = manifest.unchanged_subdirs(directory, config)
+            if known_subdirs is not None:
+                stats.dirs_unchanged += 1
+                stack.extend(reversed(known_subdirs))
+                continue
+        subdirs = []
+        items = []
+        try:
+            with os.scandir(directory) as entries:
+                stats.dirs_scanned += 1
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if (os.path.normcase(os.path.normpath(entry.path)) in excluded
+                                    or (patterns and _matches_any(entry, patterns))
+                                    or (skip_hidden and _is_hidden_or_system(entry))):
+                                stats.dirs_pruned += 1
+                            else:
+                                subdirs.append(entry.path)
+                            continue
+                        name = entry.name
+                        kind = extensions.get(os.path.splitext(name)[1].lower())
+                        if kind is None:
+                            continue
+                        if name.startswith("~"):
+                            stats.lock_files_skipped += 1
+                            continue
+                        if not entry.is_file():
+                            continue
+                        stat_result = entry.stat()
+                        if manifest is not None and manifest.is_unchanged(entry.path, stat_result.st_size, stat_result.st_mtime):
+                            stats.files_unchanged += 1
+                            continue
+                        items.append(WorkItem(kind, os.path.normpath(entry.path), stat_result.st_size, stat_result.st_mtime))
+                    except OSError:
+                        stats.errors += 1
+        except OSError:
+            stats.errors += 1
+            continue
+
+        if manifest is not None:
+            manifest.remember_directory(directory, subdirs, config)
+        yield from items
+        # 逆序压栈，保持与 os.walk 相同的自上而下顺序
+        stack.extend(reversed(subdirs))
+
+
+class FileDiscovery(Thread):
+    """后台文件发现线程
+
+    单次遍历目录，把 WorkItem 放入有界队列供转换器消费，
+    discovered_count 随遍历实时增长，可直接作为进度条的分母。
+    """
+
+    def __init__(self, source_directory, extensions, exclude_dirs=(), max_queue_size=10000,
+                 exclude_patterns=DEFAULT_EXCLUDE_PATTERNS, skip_hidden=True, manifest=None):
+        super().__init__(daemon=True)
+        self.source_directory = source_directory
+        self.extensions = extensions
+        self.exclude_dirs = exclude_dirs
+        self.exclude_patterns = exclude_patterns
+        self.skip_hidden = skip_hidden
+        self.manifest = manifest
+        self.stats = DiscoveryStats()
+        self.items = queue.Queue(maxsize=max_queue_size)
+        self.discovered_count = 0
+        self.finished = Event()
+        self.error = None
+        self._stop_event = Event()
+
+    def run(self):
+        try:
+            for item in iter_work_items(self.source_directory, self.extensions,
+                                        self.exclude_dirs, self._stop_event.is_set,
+                                        self.exclude_patterns, self.skip_hidden, self.stats,
+                                        self.manifest):
+                self.discovered_count += 1
+                while not self._put(item):
+                    if self._stop_event.is_set():
+                        return
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def _put(self, item):
+        try:
+            self.items.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self):
+        self._stop_event.set()
+
+    def iter_items(self, poll_interval=0.1):
+        """产出发现的工作项；暂时没有新工作项时产出 None，便于调用方在等待期间处理其他事件"""
+        while True:
+            try:
+                yield self.items.get(timeout=poll_interval)
+            except queue.Empty:
+                if self.finished.is_set() and self.items.empty():
+                    return
+                yield None
@@ -0,0 +1,231 @@
+import hashlib
+import struct
+import zipfile
+from collections import namedtuple
+
+from file_discovery import KIND_DOC, KIND_XLS
+from ole_reader import OleFile, OleFormatError, is_ole_file
+
+# 预检结论
+SNIFF_OLE = "ole"              # 正常的 OLE2 文档，交给 Office 转换
+SNIFF_ENCRYPTED = "encrypted"  # 需要密码才能打开
+SNIFF_OOXML = "ooxml"          # 实际已是目标格式（被改名的 .docx / .xlsx），直接复制即可
+SNIFF_MISNAMED = "misnamed"    # 内容与扩展名不符（如 .doc 实际是 Excel 工作簿）
+SNIFF_TEXT = "text"            # RTF / HTML / CSV 等文本格式，Office 可以打开并另存
+SNIFF_EMPTY = "empty"          # 空文件
+SNIFF_UNKNOWN = "unknown"      # 无法识别，交给 Office 尝试
+
+SniffResult = namedtuple("SniffResult", ["verdict", "detail"])
+
+# 预检只读取文件开头和关键流的前部
+HEADER_SIZE = 4096
+FIB_SIZE = 0x20
+BIFF_SCAN_SIZE = 64 * 1024
+
+FIB_IDENT = 0xA5EC
+FIB_ENCRYPTED = 0x0100
+FIB_WHICH_TABLE = 0x0200
+FIB_OBFUSCATED = 0x8000
+
+BIFF_BOF = 0x0809
+BIFF_EOF = 0x000A
+BIFF_FILEPASS = 0x002F
+
+# Excel 在未设置打开密码时用于“只读加密”的默认密码，Office 可以直接打开
+EXCEL_DEFAULT_PASSWORD = "VelvetSweatshop"
+
+_MAIN_CONTENT_TYPES = {
+    KIND_DOC: "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+    KIND_XLS: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml",
+}
+
+_KIND_TEXT = {KIND_DOC: "Word文档", KIND_XLS: "Excel工作簿"}
+
+
+def sniff_file(path, kind):
+    """不启动 Office，根据文件头判断文件能否转换
+
+    kind 为 file_discovery 的工作项类型（KIND_DOC / KIND_XLS）。
+    读取 OLE2 文件头、Word FIB 的 fEncrypted 标志和 Excel BIFF 的 FILEPASS 记录，
+    并识别实际为 ZIP（OOXML）、RTF、HTML 或 CSV 的文件。
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header:
+        return SniffResult(SNIFF_EMPTY, "文件为空")
+    if is_ole_file(header):
+        return _sniff_ole(path, kind)
+    if header.startswith(b"PK\x03\x04"):
+        return _sniff_zip(path, kind)
+    text_format = _text_format(header)
+    if text_format:
+        return SniffResult(SNIFF_TEXT, text_format)
+    return SniffResult(SNIFF_UNKNOWN, "")
+
+
+def _sniff_ole(path, kind):
+    try:
+        with OleFile(path) as ole:
+            if ole.exists("EncryptionInfo") and ole.exists("EncryptedPackage"):
+                return SniffResult(SNIFF_ENCRYPTED, "加密的 Office 2007+ 文档")
+            if ole.exists("WordDocument"):
+                if kind != KIND_DOC:
+                    return SniffResult(SNIFF_MISNAMED, f"实际为{_KIND_TEXT[KIND_DOC]}")
+                return _sniff_word(ole)
+            for name in ("Workbook", "Book"):
+                if ole.exists(name):
+                    if kind != KIND_XLS:
+                        return SniffResult(SNIFF_MISNAMED, f"实际为{_KIND_TEXT[KIND_XLS]}")
+                    return _sniff_workbook(ole.read_stream(name, BIFF_SCAN_SIZE))
+    except OleFormatError as e:
+        # 结构损坏的文件仍交给 Office 尝试修复
+        return SniffResult(SNIFF_UNKNOWN, str(e))
+    return SniffResult(SNIFF_MISNAMED, "OLE2 文档中没有Word或Excel内容")
+
+
+def _sniff_word(ole):
+    fib = ole.read_stream("WordDocument", FIB_SIZE)
+    if len(fib) < FIB_SIZE:
+        return SniffResult(SNIFF_UNKNOWN, "FIB 不完整")
+    ident, = struct.unpack_from("<H", fib, 0)
+    if ident != FIB_IDENT:
+        return SniffResult(SNIFF_UNKNOWN, "FIB 标识不正确")
+    flags, = struct.unpack_from("<H", fib, 0x0A)
+    if flags & FIB_ENCRYPTED:
+        if flags & FIB_OBFUSCATED:
+            return SniffResult(SNIFF_ENCRYPTED, "文档已加密（XOR 混淆）")
+        return SniffResult(SNIFF_ENCRYPTED, "文档已加密")
+    return SniffResult(SNIFF_OLE, "")
+
+
+def _sniff_workbook(stream):
+    offset = 0
+    first = True
+    while offset + 4 <= len(stream):
+        record_type, length = struct.unpack_from("<HH", stream, offset)
+        body = stream[offset + 4:offset + 4 + length]
+        if first and record_type != BIFF_BOF:
+            return SniffResult(SNIFF_UNKNOWN, "工作簿流不以 BOF 开头")
+        first = False
+        if record_type == BIFF_FILEPASS:
+            if _opens_with_default_password(bytes(body)):
+                return SniffResult(SNIFF_OLE, "使用默认密码加密")
+            return SniffResult(SNIFF_ENCRYPTED, "工作簿已加密")
+        if record_type == BIFF_EOF:
+            break
+        offset += 4 + length
+    return SniffResult(SNIFF_OLE, "")
+
+
+def _opens_with_default_password(filepass):
+    """FILEPASS 记录使用的是否为 Excel 默认密码（VelvetSweatshop）"""
+    if len(filepass) < 6:
+        return False
+    encryption_type, = struct.unpack_from("<H", filepass, 0)
+    if encryption_type == 0:
+        _, verifier = struct.unpack_from("<HH", filepass, 2)
+        return _xor_password_verifier(EXCEL_DEFAULT_PASSWORD) == verifier
+    major, minor = struct.unpack_from("<HH", filepass, 2)
+    try:
+        if (major, minor) == (1, 1):
+            return _verify_rc4(filepass[6:], EXCEL_DEFAULT_PASSWORD)
+        if minor == 2 and major in (2, 3, 4):
+            return _verify_rc4_cryptoapi(filepass[6:], EXCEL_DEFAULT_PASSWORD)
+    except struct.error:
+        return False
+    return False
+
+
+def _xor_password_verifier(password):
+    """XOR 混淆的密码校验值（MS-OFFCRYPTO 2.3.7.1）"""
+    verifier = 0
+    data = password.encode("latin-1")
+    for byte in reversed(bytes([len(data)]) + data):
+        verifier = (((verifier >> 14) & 1) | ((verifier << 1) & 0x7FFF)) ^ byte
+    return verifier ^ 0xCE4B
+
+
+def _rc4(key, data):
+    state = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + state[i] + key[i % len(key)]) & 0xFF
+        state[i], state[j] = state[j], state[i]
+    out = bytearray()
+    i = j = 0
+    for byte in data:
+        i = (i + 1) & 0xFF
+        j = (j + state[i]) & 0xFF
+        state[i], state[j] = state[j], state[i]
+        out.append(byte ^ state[(state[i] + state[j]) & 0xFF])
+    return bytes(out)
+
+
+def _verify_rc4(data, password):
+    """RC4 加密的密码校验（MS-OFFCRYPTO 2.3.6）"""
+    salt, verifier, verifier_hash = data[:16], data[16:32], data[32:48]
+    if len(verifier_hash) < 16:
+        return False
+    truncated = hashlib.md5(password.encode("utf-16-le")).digest()[:5]
+    intermediate = hashlib.md5((truncated + salt) * 16).digest()[:5]
+    key = hashlib.md5(intermediate + struct.pack("<I", 0)).digest()
+    decrypted = _rc4(key, verifier + verifier_hash)
+    return hashlib.md5(decrypted[:16]).digest() == decrypted[16:32]
+
+
+def _verify_rc4_cryptoapi(data, password):
+    """RC4 CryptoAPI 加密的密码校验（MS-OFFCRYPTO 2.3.5）"""
+    header_size, = struct.unpack_from("<I", data, 4)
+    key_size, = struct.unpack_from("<I", data, 8 + 16)
+    offset = 8 + header_size
+    salt_size, = struct.unpack_from("<I", data, offset)
+    salt = data[offset + 4:offset + 4 + salt_size]
+    verifier = data[offset + 4 + salt_size:offset + 20 + salt_size]
+    hash_size, = struct.unpack_from("<I", data, offset + 20 + salt_size)
+    verifier_hash = data[offset + 24 + salt_size:offset + 24 + salt_size + hash_size]
+    h0 = hashlib.sha1(salt + password.encode("utf-16-le")).digest()
+    key = hashlib.sha1(h0 + struct.pack("<I", 0)).digest()[:(key_size or 40) // 8]
+    if len(key) == 5:
+        # 40 位密钥补齐为 128 位
+        key += b"\x00" * 11
+    decrypted = _rc4(key, verifier + verifier_hash)
+    return hashlib.sha1(decrypted[:16]).digest() == decrypted[16:16 + hash_size]
+
+
+def _sniff_zip(path, kind):
+    try:
+        with zipfile.ZipFile(path) as package:
+            content_types = package.read("[Content_Types].xml").decode("utf-8", "replace")
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return SniffResult(SNIFF_UNKNOWN, "ZIP 文件不是 Office 文档")
+    if _MAIN_CONTENT_TYPES[kind] in content_types:
+        return SniffResult(SNIFF_OOXML, "文件已是新格式")
+    for other_kind, content_type in _MAIN_CONTENT_TYPES.items():
+        if other_kind != kind and content_type in content_types:
+            return SniffResult(SNIFF_MISNAMED, f"实际为新格式{_KIND_TEXT[other_kind]}")
+    # 启用宏的文档、模板等交给 Office 另存
+    return SniffResult(SNIFF_UNKNOWN, "")
+
+
+def _text_format(header):
+    text = header.lstrip(b"\xef\xbb\xbf").lstrip()
+    lowered = text[:256].lower()
+    if lowered.startswith(b"{\\rtf"):
+        return "RTF"
+    if lowered.startswith((b"<html", b"<!doctype html", b"<?xml", b"<meta", b"<table")) or b"<html" in lowered:
+        return "HTML/XML"
+    if header.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "Unicode 文本"
+    if b"\x00" not in header:
+        try:
+            first_line = header.decode("utf-8").splitlines()[0]
+        except UnicodeDecodeError:
+            try:
+                first_line = header.decode("gbk").splitlines()[0]
+            except (UnicodeDecodeError, IndexError):
+                return None
+        except IndexError:
+            return None
+        if "," in first_line or "\t" in first_line or ";" in first_line:
+            return "CSV/文本"
+    return None
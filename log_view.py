@@ -0,0 +1,104 @@
+import os
+import queue
+import shutil
+import tempfile
+
+# 每次刷新最多取出的日志条数：积压很多时分几次刷新，单次插入不会长时间占用界面线程
+LOG_BATCH_MAX = 5000
+
+# 刷新间隔（毫秒）：队列有积压时加快，有新日志时正常，空闲时放慢
+LOG_TICK_BUSY_MS = 40
+LOG_TICK_MS = 100
+LOG_TICK_IDLE_MS = 250
+
+# 文本控件最多保留的行数，超过后一次删除最旧的 LOG_TRIM_LINES 行以上；完整日志写在磁盘文件中
+LOG_MAX_LINES = 10000
+LOG_TRIM_LINES = 2000
+
+
+def drain(message_queue, limit=None):
+    """取出队列中现有的消息（最多 limit 条）"""
+    messages = []
+    try:
+        while limit is None or len(messages) < limit:
+            messages.append(message_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return messages
+
+
+def next_tick_ms(backlog, rendered):
+    """按剩余积压和本次写入的条数决定下次刷新的间隔"""
+    if backlog:
+        return LOG_TICK_BUSY_MS
+    if rendered:
+        return LOG_TICK_MS
+    return LOG_TICK_IDLE_MS
+
+
+class BatchedLogView:
+    """把日志队列合并写入文本控件，控件只保留最近的日志，完整日志流式写入磁盘文件
+
+    每次刷新把取出的消息拼成一段文本，只调用一次 insert 和一次 see，
+    避免每条消息都让 Tk 重新排版、滚动文本控件。控件中的行数超过 max_lines 时
+    成批删除最旧的行，运行多久界面进程占用的内存都基本不变；保存日志时复制磁盘文件。
+    界面语言切换时文本控件会重建，因此控件在每次刷新时传入。
+    """
+
+    def __init__(self, log_queue, batch_max=LOG_BATCH_MAX, max_lines=LOG_MAX_LINES, trim_lines=LOG_TRIM_LINES,
+                 spill_path=None):
+        self.log_queue = log_queue
+        self.batch_max = batch_max
+        self.max_lines = max_lines
+        self.trim_lines = min(trim_lines, max_lines)
+        self.rendered_count = 0
+        if spill_path is None:
+            fd, spill_path = tempfile.mkstemp(prefix="office_converter_log_", suffix=".txt")
+            os.close(fd)
+            self._owns_spill = True
+        else:
+            self._owns_spill = False
+        self.spill_path = spill_path
+        self._spill = open(spill_path, "a", encoding="utf-8")
+
+    def flush(self, text_widget):
+        """写入一批日志，返回下次刷新的间隔（毫秒）"""
+        messages = drain(self.log_queue, self.batch_max)
+        if messages:
+            text = "\n".join(messages) + "\n"
+            self._spill.write(text)
+            self._spill.flush()
+            if len(messages) > self.max_lines:
+                # 一批就超过上限时只显示最后的部分
+                text = "\n".join(messages[-self.max_lines:]) + "\n"
+            text_widget.insert("end", text)
+            self._trim(text_widget)
+            text_widget.see("end")
+            self.rendered_count += len(messages)
+        return next_tick_ms(self.log_queue.qsize(), len(messages))
+
+    def _trim(self, text_widget):
+        # 末尾换行之后还有一个空行，行数为 end-1c 所在行号减一
+        lines = int(text_widget.index("end-1c").split(".")[0]) - 1
+        if lines > self.max_lines:
+            excess = lines - self.max_lines + self.trim_lines
+            text_widget.delete("1.0", f"{excess + 1}.0")
+
+    def clear(self, text_widget):
+        """清空显示的日志和磁盘上的日志文件"""
+        text_widget.delete("1.0", "end")
+        self._spill.seek(0)
+        self._spill.truncate()
+
+    def save(self, path):
+        """把完整日志复制到 path"""
+        self._spill.flush()
+        shutil.copyfile(self.spill_path, path)
+
+    def close(self):
+        self._spill.close()
+        if self._owns_spill:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
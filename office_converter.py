@@ -1,13 +1,52 @@
 import os
 import shutil
-import win32com.client
-import pythoncom
-import win32file
-import win32con
-import pywintypes # For pywintypes.Time()
 import time       # 引入 time 模块用于延迟
+import multiprocessing
+
+from conversion_archive import ArchiveTree
+from conversion_cache import ConversionCache, DEFAULT_CACHE_MAX_MB
+import atomic_output
+from conversion_journal import ConversionJournal, default_journal_path
+from conversion_manifest import ConversionManifest, FINAL_OUTCOMES, OUTCOME_EXISTS, default_manifest_path
+from conversion_pool import ConversionResult, STATUS_CONVERTED, STATUS_SKIPPED, STATUS_ERROR, STATUS_CANCELLED, STATUS_TIMEOUT
+from conversion_scheduler import ConversionScheduler
+from conversion_staging import (DEFAULT_PREFETCH_DEPTH, DEFAULT_SCRATCH_MAX_MB, STAGING_AUTO, StagingArea,
+                                should_stage)
+from file_discovery import (ARCHIVE_FOLDER_NAME, DEFAULT_EXCLUDE_PATTERNS, QUARANTINE_FOLDER_NAME, DiscoveryStats,
+                            build_extension_map, converter_folders, iter_work_items)
+from office_engines import (DOC_ENGINES, DOC_ENGINE_OFFICE, XLS_ENGINES, XLS_ENGINE_OFFICE, SKIP_PASSWORD,
+                            SKIP_MISNAMED)
+
+# 单文件转换超时：基础秒数 + 每 MB 追加的秒数
+DEFAULT_FILE_TIMEOUT = 300
+TIMEOUT_PER_MB = 10
+
+# Office 实例回收阈值：转换文件数、进程内存（MB）
+DEFAULT_RECYCLE_AFTER = 500
+DEFAULT_RECYCLE_MEMORY_MB = 1024
+
+# 转换完成（或目标已存在）后原文件的处理方式
+ORIGINALS_ARCHIVE = "archive"
+ORIGINALS_OVERWRITE = "overwrite"
+ORIGINALS_KEEP = "keep"
+
+# 没有 pywin32 时只提示一次，之后的文件不再设置时间戳
+_timestamps_unavailable = False
 
 def set_file_times(target_path, source_path):
+    global _timestamps_unavailable
+    if _timestamps_unavailable:
+        return
+    # pywin32 只在设置时间戳时导入，扫描、试运行不加载
+    try:
+        import pywintypes # For pywintypes.Time()
+        import win32con
+        import win32file
+    except ImportError:
+        _timestamps_unavailable = True
+        print("警告: 未安装 pywin32，转换结果不会保留原文件的时间戳（pip install pywin32）")
+        return
+
     max_retries = 5
     retry_delay = 0.5 # 秒
 
@@ -50,8 +89,7 @@ def set_file_times(target_path, source_path):
 
 
 def create_old_files_folder(source_directory):
-    old_files_folder_name = "旧格式文件"
-    old_files_path = os.path.join(source_directory, old_files_folder_name)
+    old_files_path = os.path.join(source_directory, ARCHIVE_FOLDER_NAME)
     if not os.path.exists(old_files_path):
         try:
             os.makedirs(old_files_path)
@@ -63,202 +101,244 @@ def create_old_files_folder(source_directory):
         print(f"文件夹 '{old_files_path}' 已存在.")
     return old_files_path
 
-def convert_doc_to_docx(source_directory, old_files_path):
-    if old_files_path is None:
-        return
+def move_to_archive(source_path, archive):
+    # Ensure the original file still exists before attempting to move
+    if os.path.exists(source_path):
+        try:
+            archived_path = archive.move(source_path)
+            print(f"移动成功: {source_path} -> {archived_path}")
+        except Exception as e_move:
+            print(f"移动文件 {source_path} 失败: {e_move}")
+    else:
+        print(f"警告: 原始文件 {source_path} 在尝试移动前已不存在。")
+
+def dispose_original(source_path, archive, originals=ORIGINALS_ARCHIVE):
+    if originals == ORIGINALS_ARCHIVE:
+        move_to_archive(source_path, archive)
+    elif originals == ORIGINALS_OVERWRITE and os.path.exists(source_path):
+        try:
+            os.remove(source_path)
+            print(f"已删除原文件: {source_path}")
+        except OSError as e_remove:
+            print(f"删除原文件 {source_path} 失败: {e_remove}")
+
+def move_to_quarantine(source_path, target_path, source_directory, log=print):
+    """把导致Office卡死的文件移到源目录下的隔离文件夹，并删除可能残留的不完整目标文件
 
-    print("开始处理 DOC 文件...")
-    word_app = None
-    # Initialize COM for this thread, ensure it's done once per thread using it
+    超时文件可能每次都会让Office卡死，移出源目录避免下次运行再次卡住；
+    log 用于输出处理结果（命令行为 print，图形界面传入自己的日志函数）。
+    """
+    if os.path.exists(target_path):
+        try:
+            os.remove(target_path)
+        except OSError:
+            pass
+    quarantine_dir = os.path.join(source_directory, QUARANTINE_FOLDER_NAME)
     try:
-        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-        word_app = win32com.client.Dispatch("Word.Application")
-        word_app.Visible = False
-        word_app.DisplayAlerts = 0 # wdAlertsNone = 0
-
-        for root, _, files in os.walk(source_directory):
-            normalized_root = os.path.normpath(root)
-            normalized_old_files_path = os.path.normpath(old_files_path)
-            if normalized_root == normalized_old_files_path or normalized_root.startswith(normalized_old_files_path + os.sep):
-                # print(f"跳过已归档目录 (DOC): {root}") # Can be verbose, uncomment if needed
-                continue
-            
-            for file in files:
-                if file.lower().endswith(".doc") and not file.lower().startswith("~"):
-                    doc_file_path = os.path.join(root, file)
-                    docx_file_path = os.path.join(root, os.path.splitext(file)[0] + ".docx")
-                    
-                    print(f"尝试处理 {doc_file_path} ...")
-                    doc = None 
-                    should_move_original = False
-
-                    try:
-                        if os.path.exists(docx_file_path):
-                            print(f"警告: 目标文件 {docx_file_path} 已存在。跳过转换。")
-                            should_move_original = True 
-                        else:
-                            print(f"正在转换 {doc_file_path} 为 {docx_file_path} ...")
-                            doc = word_app.Documents.Open(doc_file_path, ReadOnly=True, PasswordDocument="")
-                            doc.SaveAs2(docx_file_path, FileFormat=12) # wdFormatXMLDocument = 12
-                            doc.Close(SaveChanges=0) # Close document immediately after saving
-                            doc = None # Ensure doc object is cleared
-                            print(f"转换成功: {docx_file_path}")
-                            set_file_times(docx_file_path, doc_file_path)
-                            should_move_original = True
-                        
-                    except pythoncom.com_error as ce:
-                        error_message = str(ce).lower()
-                        hresult = getattr(ce, 'hresult', 0)
-                        password_keywords = ["password", "密码", "protected", "-2146824422", "-2146822422", "incorrect password", "incorrect document password"]
-                        office_problem_keywords = ["office检测到此文件存在一个问题", "office has detected a problem with this file"]
-                        
-                        is_password_error_by_msg = any(keyword in error_message for keyword in password_keywords)
-                        is_office_problem = any(keyword in error_message for keyword in office_problem_keywords)
-                        is_password_error_by_code = hresult == -2146824422 or hresult == -2146822422
-                        
-                        if is_password_error_by_msg or is_password_error_by_code:
-                            print(f"文件 {doc_file_path} 受密码保护或打开时需要密码，跳过转换。错误: {ce}。原始文件将保留在原位。")
-                        elif is_office_problem or hresult == -2147352567: # General COM error often related to file issues
-                             print(f"文件 {doc_file_path} Office检测到问题或无法打开，跳过转换。错误: {ce}。原始文件将保留在原位。")
-                        else:
-                            print(f"处理文件 {doc_file_path} 时发生COM错误: {ce}。原始文件将保留在原位。")
-                    except Exception as e:
-                        print(f"处理文件 {doc_file_path} 失败: {e}。原始文件将保留在原位。")
-                    finally:
-                        if doc: # If an error occurred after Open but before Close
-                            try:
-                                doc.Close(SaveChanges=0)
-                            except Exception as e_close:
-                                print(f"关闭文档 {os.path.basename(doc_file_path)} 时额外出错: {e_close}")
-                        
-                        if should_move_original:
-                            # Ensure the original file still exists before attempting to move
-                            if os.path.exists(doc_file_path):
-                                try:
-                                    print(f"正在移动 {doc_file_path} 到 {old_files_path}...")
-                                    shutil.move(doc_file_path, os.path.join(old_files_path, file))
-                                    print(f"移动成功: {doc_file_path} -> {old_files_path}")
-                                except Exception as e_move:
-                                    print(f"移动文件 {doc_file_path} 失败: {e_move}")
-                            else:
-                                print(f"警告: 原始文件 {doc_file_path} 在尝试移动前已不存在。")
-    except pythoncom.com_error as e_dispatch:
-        print(f"初始化Word Dispatch或Word全局操作时出错: {e_dispatch}")
-    except Exception as e:
-        print(f"初始化Word或处理DOC文件时发生未知错误: {e}")
-    finally:
-        if word_app:
-            try:
-                word_app.Quit(SaveChanges=0)
-            except Exception as e_quit:
-                print(f"尝试退出Word时发生错误: {e_quit}")
-        pythoncom.CoUninitialize()
-
-def convert_xls_to_xlsx(source_directory, old_files_path):
-    if old_files_path is None:
+        os.makedirs(quarantine_dir, exist_ok=True)
+        name, ext = os.path.splitext(os.path.basename(source_path))
+        quarantine_path = os.path.join(quarantine_dir, name + ext)
+        counter = 1
+        while os.path.exists(quarantine_path):
+            quarantine_path = os.path.join(quarantine_dir, f"{name} ({counter}){ext}")
+            counter += 1
+        shutil.move(source_path, quarantine_path)
+        log(f"已隔离: {source_path} -> {quarantine_path}")
+    except Exception as e_move:
+        log(f"隔离文件 {source_path} 失败: {e_move}")
+
+def report_result(result, archive, manifest=None, journal=None, source_directory=None,
+                  originals=ORIGINALS_ARCHIVE, on_result=None):
+    if result.status == STATUS_CANCELLED:
         return
+    if on_result is not None:
+        on_result(result)
+    if manifest is not None:
+        # 在原文件被移动之前记录到转换清单
+        manifest.record(result.source_path, result.target_path, result.status, result.content_hash)
+    if result.status == STATUS_CONVERTED:
+        notes = [result.message] if result.message else []
+        if result.peak_memory:
+            notes.append(f"峰值内存 {result.peak_memory / (1024 * 1024):.0f} MB")
+        print(f"转换成功: {result.target_path}" + (f"（{'，'.join(notes)}）" if notes else ""))
+        set_file_times(result.target_path, result.source_path)
+        dispose_original(result.source_path, archive, originals)
+    elif result.status == STATUS_SKIPPED:
+        if result.reason == SKIP_PASSWORD:
+            print(f"文件 {result.source_path} 受密码保护或打开时需要密码，跳过转换。错误: {result.message}。原始文件将保留在原位。")
+        elif result.reason == SKIP_MISNAMED:
+            print(f"文件 {result.source_path} 的扩展名与内容不符（{result.message}），跳过转换。原始文件将保留在原位。")
+        else:
+            print(f"文件 {result.source_path} Office检测到问题或无法打开，跳过转换。错误: {result.message}。原始文件将保留在原位。")
+    elif result.status == STATUS_TIMEOUT:
+        print(f"处理文件 {result.source_path} 超时: {result.message}。")
+        if source_directory is not None:
+            move_to_quarantine(result.source_path, result.target_path, source_directory)
+    elif result.status == STATUS_ERROR:
+        print(f"处理文件 {result.source_path} 失败: {result.message}。原始文件将保留在原位。")
+    if journal is not None:
+        journal.record_done(result.source_path, result.target_path, result.status)
 
-    print("开始处理 XLS 文件...")
-    excel_app = None
-    try:
-        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-        excel_app = win32com.client.Dispatch("Excel.Application")
+def convert_office_files(source_directory, old_files_path, convert_doc=True, convert_xls=True,
+                         word_workers=None, excel_workers=None, exclude_patterns=DEFAULT_EXCLUDE_PATTERNS,
+                         incremental=True, file_timeout=DEFAULT_FILE_TIMEOUT, timeout_per_mb=TIMEOUT_PER_MB,
+                         recycle_after=DEFAULT_RECYCLE_AFTER, recycle_memory_mb=DEFAULT_RECYCLE_MEMORY_MB,
+                         xls_engine=XLS_ENGINE_OFFICE, doc_engine=DOC_ENGINE_OFFICE, dedupe=True,
+                         cache_dir=None, cache_max_mb=DEFAULT_CACHE_MAX_MB, staging=STAGING_AUTO,
+                         prefetch_depth=DEFAULT_PREFETCH_DEPTH, scratch_max_mb=DEFAULT_SCRATCH_MAX_MB,
+                         verify=True, originals=ORIGINALS_ARCHIVE, on_result=None):
+    """转换 source_directory 下的 DOC / XLS 文件
+
+    originals 为原文件的处理方式：归档到 old_files_path、删除或保留在原位；
+    on_result 在每个文件处理完成后以 ConversionResult 调用（目标已存在的文件状态为 OUTCOME_EXISTS）。
+    单个文件的失败随结果报告；遍历或调度中途出错时输出错误信息后重新抛出异常，
+    调用方据此知道本次转换没有完成（断点续传日志保留，下次运行继续）。
+    """
+    if originals == ORIGINALS_ARCHIVE and old_files_path is None:
+        return
+
+    manifest = None
+    if incremental:
+        manifest = ConversionManifest(default_manifest_path(source_directory))
+
+    # 断点续传：跳过上次中断前已处理的文件
+    journal = ConversionJournal(default_journal_path(source_directory))
+    # 原文件按源目录结构归档，并记录原路径到归档路径的索引
+    archive = ArchiveTree(old_files_path, source_directory) if originals == ORIGINALS_ARCHIVE else None
+    journal.load()
+    if journal.resumed:
+        print(f"继续上次未完成的转换：已处理 {len(journal.completed)} 个文件，{len(journal.in_flight)} 个文件需要重新检查")
+
+    # 跨运行的转换缓存：cache_dir 可以是多台机器共享的文件夹
+    cache = None
+    if cache_dir:
         try:
-            excel_app.DisplayAlerts = False
-        except pythoncom.com_error as e_alerts:
-            print(f"警告: 无法设置Excel的DisplayAlerts属性: {e_alerts}. 尝试继续...")
-        # excel_app.Visible = True # 调试时可以设为True
-
-        for root, _, files in os.walk(source_directory):
-            normalized_root = os.path.normpath(root)
-            normalized_old_files_path = os.path.normpath(old_files_path)
-            if normalized_root == normalized_old_files_path or normalized_root.startswith(normalized_old_files_path + os.sep):
-                # print(f"跳过已归档目录 (XLS): {root}") # Can be verbose
+            cache = ConversionCache(cache_dir, cache_max_mb * 1024 * 1024)
+            print(f"转换缓存: {cache_dir}（已有 {cache.total_bytes / (1024 * 1024):.0f} MB）")
+        except OSError as e:
+            print(f"警告: 无法使用转换缓存文件夹，本次不使用缓存: {e}")
+
+    # 网络共享上的文件先预取到本地转换，再写回原位置
+    staging_area = None
+    if should_stage(staging, source_directory):
+        staging_area = StagingArea(prefetch_depth=prefetch_depth, max_bytes=scratch_max_mb * 1024 * 1024)
+        print(f"源目录位于网络路径，文件将预取到本地 {staging_area.scratch_dir} 转换"
+              f"（预取 {prefetch_depth} 个文件，最多占用 {scratch_max_mb} MB）")
+
+    # 内容相同的源文件只转换一次，其余复制转换结果；
+    # verify 时转换结果先在校验线程中检查，通过后才移动或删除原文件
+    scheduler = ConversionScheduler(dedupe=dedupe, cache=cache, staging=staging_area, verify=verify)
+    if convert_doc:
+        word_pool = scheduler.add_route(".doc", ".docx", DOC_ENGINES[doc_engine], word_workers,
+                                        timeout=file_timeout, timeout_per_mb=timeout_per_mb,
+                                        recycle_after=recycle_after, recycle_memory_mb=recycle_memory_mb)
+        if doc_engine == DOC_ENGINE_OFFICE:
+            print(f"DOC 文件将由 {word_pool.worker_count} 个Word进程处理")
+        else:
+            print(f"DOC 文件将由 {word_pool.worker_count} 个快速引擎进程处理，不支持的文件交给Word")
+    if convert_xls:
+        excel_pool = scheduler.add_route(".xls", ".xlsx", XLS_ENGINES[xls_engine], excel_workers,
+                                         timeout=file_timeout, timeout_per_mb=timeout_per_mb,
+                                         recycle_after=recycle_after, recycle_memory_mb=recycle_memory_mb)
+        if xls_engine == XLS_ENGINE_OFFICE:
+            print(f"XLS 文件将由 {excel_pool.worker_count} 个Excel进程处理")
+        else:
+            print(f"XLS 文件将由 {excel_pool.worker_count} 个内置引擎进程处理，不支持的文件交给Excel")
+
+    print(f"Office实例回收阈值: 每 {recycle_after or '∞'} 个文件，或内存超过 {recycle_memory_mb or '∞'} MB")
+    print("开始处理文件...")
+    try:
+        journal.start_run()
+        scheduler.start()
+        max_pending = scheduler.worker_count * 4
+        # 单次遍历目录，发现第一个文件即开始转换；归档文件夹在进入前即被跳过
+        extensions = build_extension_map(convert_doc, convert_xls)
+        discovery_stats = DiscoveryStats()
+        for item in iter_work_items(source_directory, extensions,
+                                    exclude_dirs=converter_folders(source_directory, old_files_path),
+                                    exclude_patterns=exclude_patterns, stats=discovery_stats,
+                                    manifest=manifest):
+            if journal.is_completed(item.path):
+                # 上次失败或超时的文件本次不再重试，但所在目录不能记录为已完成，下次运行仍需枚举
+                if manifest is not None and journal.completed[item.path] not in FINAL_OUTCOMES:
+                    manifest.mark_dirty(os.path.dirname(item.path))
                 continue
+            target_file_path = scheduler.target_path_for(item.path)
+
+            # 转换结果校验后才改名为目标文件，已存在的目标文件一定完整；
+            # 上次中断时正在转换的文件只会留下临时文件
+            if journal.was_interrupted(item.path):
+                atomic_output.discard(atomic_output.temporary_path(target_file_path))
+
+            if os.path.exists(target_file_path):
+                print(f"警告: 目标文件 {target_file_path} 已存在。跳过转换。")
+                if manifest is not None:
+                    manifest.record(item.path, target_file_path, OUTCOME_EXISTS)
+                if on_result is not None:
+                    on_result(ConversionResult(-1, item.path, target_file_path, OUTCOME_EXISTS, "", "", 0.0, -1))
+                dispose_original(item.path, archive, originals)
+                journal.record_done(item.path, target_file_path, OUTCOME_EXISTS)
+            else:
+                print(f"正在转换 {item.path} 为 {target_file_path} ...")
+                journal.record_submitted(item.path, target_file_path)
+                scheduler.submit(item.path, target_file_path, item.size)
 
-            for file in files:
-                if file.lower().endswith(".xls") and not file.lower().startswith("~"):
-                    xls_file_path = os.path.join(root, file)
-                    xlsx_file_path = os.path.join(root, os.path.splitext(file)[0] + ".xlsx")
-
-                    print(f"尝试处理 {xls_file_path} ...")
-                    workbook = None
-                    should_move_original = False
-                    try:
-                        if os.path.exists(xlsx_file_path):
-                            print(f"警告: 目标文件 {xlsx_file_path} 已存在。跳过转换。")
-                            should_move_original = True
-                        else:
-                            print(f"正在转换 {xls_file_path} 为 {xlsx_file_path} ...")
-                            workbook = excel_app.Workbooks.Open(
-                                xls_file_path,
-                                UpdateLinks=0,
-                                ReadOnly=True,
-                                Format=None,
-                                Password="",
-                                IgnoreReadOnlyRecommended=True,
-                                CorruptLoad=1 # xlRepairFile
-                            )
-                            
-                            if hasattr(workbook, 'HasPassword') and workbook.HasPassword:
-                                print(f"文件 {xls_file_path} 打开后仍指示受密码保护，跳过转换。原始文件将保留在原位。")
-                                # Ensure workbook is closed if opened but password protected
-                                if workbook: workbook.Close(SaveChanges=False)
-                                workbook = None
-                            else:
-                                workbook.SaveAs(xlsx_file_path, FileFormat=51) # xlOpenXMLWorkbook = 51
-                                workbook.Close(SaveChanges=False) # Close workbook immediately
-                                workbook = None # Ensure workbook object is cleared
-                                print(f"转换成功: {xlsx_file_path}")
-                                set_file_times(xlsx_file_path, xls_file_path)
-                                should_move_original = True
-                        
-                    except pythoncom.com_error as ce:
-                        error_message = str(ce).lower()
-                        hresult = getattr(ce, 'hresult', 0)
-                        password_keywords = ["password", "密码", "protected", "cannot open the specified file"]
-                        is_password_error_by_msg = any(keyword in error_message for keyword in password_keywords)
-                        is_password_error_by_code = hresult == -2146827284 # Excel password error
-                        
-                        if is_password_error_by_msg or is_password_error_by_code:
-                            print(f"文件 {xls_file_path} 打开/保存时遇到问题（可能被识别为密码保护或格式不受支持），跳过转换。错误: {ce}。原始文件将保留在原位。")
-                        elif hresult == -2147352567: # General COM error often related to file issues
-                             print(f"文件 {xls_file_path} Office检测到问题或无法打开，跳过转换。错误: {ce}。原始文件将保留在原位。")
-                        else:
-                            print(f"处理文件 {xls_file_path} 时发生COM错误: {ce}。原始文件将保留在原位。")
-                    except Exception as e:
-                        print(f"处理文件 {xls_file_path} 失败: {e}。原始文件将保留在原位。")
-                    finally:
-                        if workbook: # If an error occurred after Open but before Close
-                            try:
-                                workbook.Close(SaveChanges=False)
-                            except Exception as e_close:
-                                print(f"关闭工作簿 {os.path.basename(xls_file_path)} 时额外出错: {e_close}")
-                        
-                        if should_move_original:
-                            if os.path.exists(xls_file_path):
-                                try:
-                                    print(f"正在移动 {xls_file_path} 到 {old_files_path}...")
-                                    shutil.move(xls_file_path, os.path.join(old_files_path, file))
-                                    print(f"移动成功: {xls_file_path} -> {old_files_path}")
-                                except Exception as e_move:
-                                    print(f"移动文件 {xls_file_path} 失败: {e_move}")
-                            else:
-                                print(f"警告: 原始文件 {xls_file_path} 在尝试移动前已不存在。")
-
-    except pythoncom.com_error as e_dispatch:
-        print(f"初始化Excel Dispatch或Excel全局操作时出错: {e_dispatch}")
+            for result in scheduler.results(wait=False):
+                report_result(result, archive, manifest, journal, source_directory, originals, on_result)
+            for result in scheduler.wait_for_capacity(max_pending):
+                report_result(result, archive, manifest, journal, source_directory, originals, on_result)
+
+        print(f"目录遍历完成: {discovery_stats.summary()}")
+        scheduler.close()
+        for result in scheduler.results():
+            report_result(result, archive, manifest, journal, source_directory, originals, on_result)
+        # 等待工作进程退出，收齐回收记录后再输出统计
+        scheduler.shutdown()
+        for line in scheduler.recycle_summary():
+            print(line)
+        for line in scheduler.memory_summary():
+            print(line)
+        if archive is not None and archive.moved_count:
+            print(archive.summary())
+        if scheduler.verify_summary():
+            print(scheduler.verify_summary())
+        if scheduler.dedupe_summary():
+            print(scheduler.dedupe_summary())
+        if scheduler.cache_summary():
+            print(scheduler.cache_summary())
+        if scheduler.staging_summary():
+            print(scheduler.staging_summary())
+        for engine_name, worker_id, error in scheduler.worker_errors:
+            print(f"初始化 {engine_name} 或全局操作时出错 (进程 {worker_id}): {error}")
+        if scheduler.timeouts:
+            print(f"{scheduler.timeouts} 个文件转换超时，已重启Office进程并移入 {QUARANTINE_FOLDER_NAME} 文件夹")
+        if manifest is not None:
+            manifest.finalize_directories()
+        stats = journal.stats
+        print(f"累计统计: 转换成功 {stats[STATUS_CONVERTED]} 个，目标已存在 {stats[OUTCOME_EXISTS]} 个，"
+              f"跳过 {stats[STATUS_SKIPPED]} 个，失败 {stats[STATUS_ERROR]} 个，超时 {stats[STATUS_TIMEOUT]} 个")
+        journal.finish()
     except Exception as e:
-        print(f"初始化Excel或处理XLS文件时发生未知错误: {e}")
+        print(f"初始化Office或处理文件时发生未知错误: {e}")
+        raise
     finally:
-        if excel_app:
-            try:
-                excel_app.Quit()
-            except Exception as e_quit:
-                print(f"尝试退出Excel时发生错误: {e_quit}")
-        pythoncom.CoUninitialize()
+        scheduler.shutdown()
+        journal.close()
+        if archive is not None:
+            archive.close()
+        if manifest is not None:
+            manifest.close()
+
+def convert_doc_to_docx(source_directory, old_files_path, workers=None, engine=DOC_ENGINE_OFFICE):
+    convert_office_files(source_directory, old_files_path, convert_xls=False, word_workers=workers,
+                         doc_engine=engine)
+
+def convert_xls_to_xlsx(source_directory, old_files_path, workers=None, engine=XLS_ENGINE_OFFICE):
+    convert_office_files(source_directory, old_files_path, convert_doc=False, excel_workers=workers,
+                         xls_engine=engine)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     source_dir = os.path.dirname(os.path.abspath(__file__))
     # 或者，如果您想让用户输入目录：
     # source_dir = input("请输入要处理的文件夹路径: ")
@@ -271,8 +351,12 @@ if __name__ == "__main__":
     old_files_destination = create_old_files_folder(source_dir)
     
     if old_files_destination:
-        convert_doc_to_docx(source_dir, old_files_destination)
-        convert_xls_to_xlsx(source_dir, old_files_destination)
+        # DOC 与 XLS 同时转换
+        try:
+            convert_office_files(source_dir, old_files_destination)
+        except Exception:
+            print("转换中途出错，已停止。再次运行会从中断处继续。")
+            raise SystemExit(1)
 
     print("文件转换和移动操作完成。")
     print("请注意：此脚本依赖 pywin32 库。如果尚未安装，请运行 'pip install pywin32' 进行安装。")
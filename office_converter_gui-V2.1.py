@@ -1,16 +1,57 @@
 import os
-import shutil
-import win32com.client
-import pythoncom
-import win32file
-import win32con
-import pywintypes
 import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from threading import Thread
 import queue
-from datetime import datetime
+import multiprocessing
+
+from conversion_pool import (
+    default_worker_count,
+    STATUS_CONVERTED,
+    STATUS_SKIPPED,
+    STATUS_ERROR,
+    STATUS_CANCELLED,
+    STATUS_TIMEOUT,
+)
+from conversion_archive import ArchiveTree
+from conversion_cache import ConversionCache, DEFAULT_CACHE_MAX_MB, default_cache_dir
+from conversion_scheduler import ConversionScheduler
+from conversion_staging import (DEFAULT_PREFETCH_DEPTH, DEFAULT_SCRATCH_MAX_MB, STAGING_AUTO, STAGING_NEVER,
+                                StagingArea, should_stage)
+import atomic_output
+from conversion_journal import ConversionJournal, default_journal_path
+from conversion_manifest import ConversionManifest, FINAL_OUTCOMES, OUTCOME_EXISTS, default_manifest_path
+from file_discovery import (
+    ARCHIVE_FOLDER_NAME,
+    DEFAULT_EXCLUDE_PATTERNS,
+    FileDiscovery,
+    build_extension_map,
+    converter_folders,
+    parse_exclude_patterns,
+)
+from log_view import BatchedLogView, LOG_TICK_MS
+from ui_commands import UiCommandQueue
+from progress_events import (
+    EVENT_ALREADY_DONE,
+    EVENT_BASELINE,
+    EVENT_CONVERTED,
+    EVENT_DISCOVERED,
+    EVENT_ERROR,
+    EVENT_RUN_FINISHED,
+    EVENT_SKIPPED,
+    EVENT_STARTED,
+    ProgressEventBus,
+    ProgressTracker,
+)
+from office_converter import (
+    DEFAULT_FILE_TIMEOUT,
+    DEFAULT_RECYCLE_AFTER,
+    DEFAULT_RECYCLE_MEMORY_MB,
+    TIMEOUT_PER_MB,
+    move_to_quarantine,
+)
+from office_engines import WordComEngine, ExcelComEngine, NativeXlsEngine, FastDocEngine, SKIP_PASSWORD, SKIP_UNREADABLE, SKIP_REASON_TEXT
 
 # 现代化主题配色
 COLORS = {
@@ -53,26 +94,48 @@ class OfficeConverterGUI:
         self.custom_archive_dir = tk.StringVar()
         self.use_custom_archive = tk.BooleanVar(value=False)
         self.overwrite_original = tk.BooleanVar(value=False)
+        self.word_workers = tk.IntVar(value=default_worker_count())
+        self.excel_workers = tk.IntVar(value=default_worker_count())
+        self.incremental = tk.BooleanVar(value=True)
+        self.native_xls = tk.BooleanVar(value=False)
+        self.fast_doc = tk.BooleanVar(value=False)
+        self.dedupe = tk.BooleanVar(value=True)
+        self.verify_outputs = tk.BooleanVar(value=True)
+        self.use_cache = tk.BooleanVar(value=False)
+        self.cache_dir = tk.StringVar(value=default_cache_dir())
+        self.cache_max_mb = tk.IntVar(value=DEFAULT_CACHE_MAX_MB)
+        self.stage_network = tk.BooleanVar(value=True)
+        self.prefetch_depth = tk.IntVar(value=DEFAULT_PREFETCH_DEPTH)
+        self.scratch_max_mb = tk.IntVar(value=DEFAULT_SCRATCH_MAX_MB)
+        self.file_timeout = tk.IntVar(value=DEFAULT_FILE_TIMEOUT)
+        self.recycle_after = tk.IntVar(value=DEFAULT_RECYCLE_AFTER)
+        self.recycle_memory_mb = tk.IntVar(value=DEFAULT_RECYCLE_MEMORY_MB)
+        self.exclude_patterns = tk.StringVar(value="; ".join(DEFAULT_EXCLUDE_PATTERNS))
         self.language = tk.StringVar(value="中文")
         
         # 初始化队列
         self.log_queue = queue.Queue()
-        self.progress_queue = queue.Queue()
-        self.stats_queue = queue.Queue()
+        self.log_view = BatchedLogView(self.log_queue)
+        # 转换线程发送进度事件，计数在界面线程中汇总
+        self.progress_events = ProgressEventBus()
+        self.progress = ProgressTracker()
+        # 转换线程对控件的修改交给界面线程执行
+        self.ui_commands = UiCommandQueue()
         
         # 转换状态
         self.is_converting = False
-        self.total_files = 0
-        self.converted_files = 0
-        self.skipped_files = 0
-        self.error_files = 0
+        self.manifest = None
+        self.journal = None
+        self.archive = None
+        # 没有 pywin32 时只提示一次，之后的文件不再设置时间戳
+        self.timestamps_unavailable = False
         
         self.create_menu()
         self.create_widgets()
         self.setup_layout()
         
         # 启动日志更新定时器
-        self.root.after(100, self.update_log)
+        self.root.after(LOG_TICK_MS, self.update_log)
         
         # 初始化底部统计显示（在create_widgets之后）
         self.root.after(200, self.init_stats_display)
@@ -450,6 +513,15 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
             self.archive_originals.set(False)
             self.use_custom_archive.set(False)
             
+    def select_cache_dir(self):
+        """选择转换缓存文件夹（可以是多台机器共享的网络文件夹）"""
+        directory = filedialog.askdirectory(
+            title="选择缓存文件夹",
+            initialdir=self.cache_dir.get() if os.path.isdir(self.cache_dir.get()) else os.getcwd()
+        )
+        if directory:
+            self.cache_dir.set(directory)
+            
     def select_custom_archive_dir(self):
         """选择自定义备份文件夹"""
         directory = filedialog.askdirectory(
@@ -461,8 +533,7 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         
     def init_stats_display(self):
         """初始化统计显示"""
-        initial_stats = "📈 可转换文件: 0 | ✅ 已转换: 0 | ⏭️ 跳过: 0 | ❌ 错误: 0"
-        self.stats_queue.put(initial_stats)
+        self.stats_label.config(text=self.progress.stats_text())
         
     def setup_styles(self):
         """设置现代化样式主题"""
@@ -591,6 +662,8 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         )
         browse_btn.pack(side="right", padx=(10, 0))
         
+        self.create_exclude_entry(content_frame, "排除目录（通配符，; 分隔）")
+        
         # 转换选项区域
         options_label = tk.Label(
             content_frame,
@@ -616,14 +689,83 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         doc_cb.pack(side="left", padx=(0, 20))
         
         xls_cb = self.create_modern_checkbox(convert_row1, "转换 XLS → XLSX", self.convert_xls)
-        xls_cb.pack(side="left")
+        xls_cb.pack(side="left", padx=(0, 20))
+        
+        incremental_cb = self.create_modern_checkbox(convert_row1, "增量转换", self.incremental)
+        incremental_cb.pack(side="left", padx=(0, 20))
+        
+        native_xls_cb = self.create_modern_checkbox(convert_row1, "内置XLS引擎（不支持时用Excel）", self.native_xls)
+        native_xls_cb.pack(side="left", padx=(0, 20))
+        
+        fast_doc_cb = self.create_modern_checkbox(convert_row1, "快速DOC引擎（仅文字和表格，不支持时用Word）", self.fast_doc)
+        fast_doc_cb.pack(side="left")
         
         # 第二行：时间戳选项（与第一行对齐）
         convert_row2 = tk.Frame(convert_frame, bg=COLORS['surface'])
         convert_row2.pack(fill="x", pady=2)
         
         timestamp_cb = self.create_modern_checkbox(convert_row2, "保留原始时间戳", self.preserve_timestamps)
-        timestamp_cb.pack(side="left", padx=(0, 0))
+        timestamp_cb.pack(side="left", padx=(0, 20))
+        
+        dedupe_cb = self.create_modern_checkbox(convert_row2, "相同文件只转换一次", self.dedupe)
+        dedupe_cb.pack(side="left", padx=(0, 20))
+        
+        verify_cb = self.create_modern_checkbox(convert_row2, "校验转换结果", self.verify_outputs)
+        verify_cb.pack(side="left", padx=(0, 20))
+        
+        self.create_worker_spinbox(convert_row2, "Word进程数", self.word_workers)
+        self.create_worker_spinbox(convert_row2, "Excel进程数", self.excel_workers)
+        
+        # 第三行：单文件超时
+        convert_row3 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row3.pack(fill="x", pady=2)
+        
+        self.create_worker_spinbox(convert_row3, "单文件超时（秒，0为不限制）", self.file_timeout, from_=0, to=3600)
+        self.create_worker_spinbox(convert_row3, "每实例文件数", self.recycle_after, from_=0, to=100000)
+        self.create_worker_spinbox(convert_row3, "内存上限（MB）", self.recycle_memory_mb, from_=0, to=65536)
+        
+        # 第四行：转换缓存
+        convert_row4 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row4.pack(fill="x", pady=2)
+        
+        cache_cb = self.create_modern_checkbox(convert_row4, "转换缓存（跨运行复用）", self.use_cache)
+        cache_cb.pack(side="left", padx=(0, 10))
+        
+        cache_dir_entry = tk.Entry(
+            convert_row4,
+            textvariable=self.cache_dir,
+            font=("Microsoft YaHei", 9),
+            bg=COLORS['background'],
+            fg=COLORS['text'],
+            relief='solid',
+            bd=1
+        )
+        cache_dir_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        
+        cache_dir_button = tk.Button(
+            convert_row4,
+            text="📁 选择",
+            command=self.select_cache_dir,
+            font=("Microsoft YaHei", 9),
+            bg=COLORS['border'],
+            fg=COLORS['text'],
+            relief='solid',
+            bd=1,
+            cursor='hand2'
+        )
+        cache_dir_button.pack(side="left", padx=(0, 15))
+        
+        self.create_worker_spinbox(convert_row4, "缓存上限（MB）", self.cache_max_mb, from_=0, to=1048576)
+        
+        # 第五行：网络文件夹本地暂存
+        convert_row5 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row5.pack(fill="x", pady=2)
+        
+        stage_cb = self.create_modern_checkbox(convert_row5, "网络文件夹先复制到本地转换", self.stage_network)
+        stage_cb.pack(side="left", padx=(0, 20))
+        
+        self.create_worker_spinbox(convert_row5, "预取文件数", self.prefetch_depth, from_=1, to=256)
+        self.create_worker_spinbox(convert_row5, "本地暂存上限（MB）", self.scratch_max_mb, from_=16, to=1048576)
         
         # 分隔线
         separator = tk.Frame(options_frame, height=1, bg=COLORS['border'])
@@ -778,6 +920,8 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         )
         browse_btn.pack(side="right", padx=(10, 0))
         
+        self.create_exclude_entry(content_frame, "Exclude (wildcards, ; separated)")
+        
         # Conversion options area
         options_label = tk.Label(
             content_frame,
@@ -803,14 +947,83 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         doc_cb.pack(side="left", padx=(0, 20))
         
         xls_cb = self.create_modern_checkbox(convert_row1, "Convert XLS → XLSX", self.convert_xls)
-        xls_cb.pack(side="left")
+        xls_cb.pack(side="left", padx=(0, 20))
+        
+        incremental_cb = self.create_modern_checkbox(convert_row1, "Incremental", self.incremental)
+        incremental_cb.pack(side="left", padx=(0, 20))
+        
+        native_xls_cb = self.create_modern_checkbox(convert_row1, "Built-in XLS Engine (Excel fallback)", self.native_xls)
+        native_xls_cb.pack(side="left", padx=(0, 20))
+        
+        fast_doc_cb = self.create_modern_checkbox(convert_row1, "Fast DOC Engine (text & tables, Word fallback)", self.fast_doc)
+        fast_doc_cb.pack(side="left")
         
         # Second row: timestamp option (aligned with first row)
         convert_row2 = tk.Frame(convert_frame, bg=COLORS['surface'])
         convert_row2.pack(fill="x", pady=2)
         
         timestamp_cb = self.create_modern_checkbox(convert_row2, "Preserve Original Timestamps", self.preserve_timestamps)
-        timestamp_cb.pack(side="left", padx=(0, 0))
+        timestamp_cb.pack(side="left", padx=(0, 20))
+        
+        dedupe_cb = self.create_modern_checkbox(convert_row2, "Convert Identical Files Once", self.dedupe)
+        dedupe_cb.pack(side="left", padx=(0, 20))
+        
+        verify_cb = self.create_modern_checkbox(convert_row2, "Verify Outputs", self.verify_outputs)
+        verify_cb.pack(side="left", padx=(0, 20))
+        
+        self.create_worker_spinbox(convert_row2, "Word Workers", self.word_workers)
+        self.create_worker_spinbox(convert_row2, "Excel Workers", self.excel_workers)
+        
+        # Third row: per-file timeout
+        convert_row3 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row3.pack(fill="x", pady=2)
+        
+        self.create_worker_spinbox(convert_row3, "Per-file Timeout (s, 0 = none)", self.file_timeout, from_=0, to=3600)
+        self.create_worker_spinbox(convert_row3, "Files per Instance", self.recycle_after, from_=0, to=100000)
+        self.create_worker_spinbox(convert_row3, "Memory Limit (MB)", self.recycle_memory_mb, from_=0, to=65536)
+        
+        # Fourth row: conversion cache
+        convert_row4 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row4.pack(fill="x", pady=2)
+        
+        cache_cb = self.create_modern_checkbox(convert_row4, "Conversion Cache (across runs)", self.use_cache)
+        cache_cb.pack(side="left", padx=(0, 10))
+        
+        cache_dir_entry = tk.Entry(
+            convert_row4,
+            textvariable=self.cache_dir,
+            font=("Microsoft YaHei", 9),
+            bg=COLORS['background'],
+            fg=COLORS['text'],
+            relief='solid',
+            bd=1
+        )
+        cache_dir_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        
+        cache_dir_button = tk.Button(
+            convert_row4,
+            text="📁 Browse",
+            command=self.select_cache_dir,
+            font=("Microsoft YaHei", 9),
+            bg=COLORS['border'],
+            fg=COLORS['text'],
+            relief='solid',
+            bd=1,
+            cursor='hand2'
+        )
+        cache_dir_button.pack(side="left", padx=(0, 15))
+        
+        self.create_worker_spinbox(convert_row4, "Cache Limit (MB)", self.cache_max_mb, from_=0, to=1048576)
+        
+        # Fifth row: local staging for network folders
+        convert_row5 = tk.Frame(convert_frame, bg=COLORS['surface'])
+        convert_row5.pack(fill="x", pady=2)
+        
+        stage_cb = self.create_modern_checkbox(convert_row5, "Stage Network Files Locally", self.stage_network)
+        stage_cb.pack(side="left", padx=(0, 20))
+        
+        self.create_worker_spinbox(convert_row5, "Prefetch Files", self.prefetch_depth, from_=1, to=256)
+        self.create_worker_spinbox(convert_row5, "Scratch Limit (MB)", self.scratch_max_mb, from_=16, to=1048576)
         
         # Separator
         separator = tk.Frame(options_frame, height=1, bg=COLORS['border'])
@@ -1204,6 +1417,31 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         cb.pack(anchor="w")
         return cb_frame
         
+    def create_exclude_entry(self, parent, text):
+        """创建排除目录规则输入框"""
+        exclude_frame = tk.Frame(parent, bg=COLORS['surface'])
+        exclude_frame.pack(fill="x", pady=(0, 5))
+        
+        label = tk.Label(exclude_frame, text=text, font=('Segoe UI', 9),
+                         fg=COLORS['text_light'], bg=COLORS['surface'])
+        label.pack(side="left")
+        
+        entry = tk.Entry(exclude_frame, textvariable=self.exclude_patterns, font=("Microsoft YaHei", 9),
+                         bg=COLORS['background'], fg=COLORS['text'], relief='solid', bd=1)
+        entry.pack(side="left", fill="x", expand=True, padx=(10, 0))
+        return entry
+        
+    def create_worker_spinbox(self, parent, text, variable, from_=1, to=64):
+        """创建数值选择框（并行进程数、超时等）"""
+        label = tk.Label(parent, text=text, font=('Segoe UI', 10),
+                         fg=COLORS['text'], bg=COLORS['surface'])
+        label.pack(side="left", pady=8)
+        
+        spinbox = tk.Spinbox(parent, from_=from_, to=to, textvariable=variable, width=4,
+                             font=('Segoe UI', 10), relief='solid', bd=1)
+        spinbox.pack(side="left", padx=(5, 15), pady=8)
+        return spinbox
+        
 
         
     def setup_layout(self):
@@ -1219,45 +1457,29 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         """线程安全的日志记录"""
         self.log_queue.put(message)
         
-    def update_progress(self, current, total):
-        """更新进度条和统计信息"""
-        if total > 0:
-            progress = (current / total) * 100
-            self.progress_queue.put(progress)
-            # 更新统计信息
-            stats_text = f"📈 可转换文件: {total} | 🔄 进度: {current}/{total} | ✅ 已转换: {self.converted_files} | ⏭️ 跳过: {self.skipped_files} | ❌ 错误: {self.error_files}"
-            self.stats_queue.put(stats_text)
-            self.root.update_idletasks()
-            
     def update_log(self):
-        """更新日志显示"""
-        try:
-            while True:
-                message = self.log_queue.get_nowait()
-                self.log_text.insert(tk.END, message + "\n")
-                self.log_text.see(tk.END)
-        except queue.Empty:
-            pass
-            
-        try:
-            while True:
-                progress = self.progress_queue.get_nowait()
-                self.progress_var.set(progress)
-        except queue.Empty:
-            pass
-            
-        try:
-            while True:
-                stats_text = self.stats_queue.get_nowait()
-                self.stats_label.config(text=stats_text)
-        except queue.Empty:
-            pass
+        """更新日志显示：日志合并为一次插入，进度事件汇总后刷新一次进度条和统计"""
+        interval = self.log_view.flush(self.log_text)
+        self.ui_commands.run_pending()
+        
+        events = self.progress_events.drain()
+        finished = None
+        for event in events:
+            if event[0] == EVENT_RUN_FINISHED:
+                finished = event
+            else:
+                self.progress.apply(event)
+        if events:
+            self.progress_var.set(self.progress.percent)
+            self.stats_label.config(text=self.progress.stats_text())
+        if finished is not None and finished[1]:
+            self.show_completion(finished[2])
             
-        # 继续定时更新
-        self.root.after(100, self.update_log)
+        # 继续定时更新，间隔随日志积压调整
+        self.root.after(interval, self.update_log)
         
     def clear_log(self):
-        self.log_text.delete(1.0, tk.END)
+        self.log_view.clear(self.log_text)
         
     def save_log(self):
         filename = filedialog.asksaveasfilename(
@@ -1267,8 +1489,8 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         )
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.log_text.get(1.0, tk.END))
+                # 界面只保留最近的日志，完整日志在磁盘文件中
+                self.log_view.save(filename)
                 messagebox.showinfo("成功", "日志已保存")
             except Exception as e:
                 messagebox.showerror("错误", f"保存日志失败: {e}")
@@ -1293,15 +1515,10 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         self.status_label.config(text="🔄 正在转换...", fg=COLORS['warning'])
         self.progress_var.set(0)
         
-        # 清空统计
-        self.total_files = 0
-        self.converted_files = 0
-        self.skipped_files = 0
-        self.error_files = 0
-        
-        # 初始化统计显示
-        initial_stats = "📈 可转换文件: 0 | 🔄 进度: 0/0 | ✅ 已转换: 0 | ⏭️ 跳过: 0 | ❌ 错误: 0"
-        self.stats_queue.put(initial_stats)
+        # 清空统计（上一次运行的事件已在界面线程中处理完）
+        self.progress_events.drain()
+        self.progress.reset()
+        self.stats_label.config(text=self.progress.stats_text())
         
         # 在新线程中执行转换
         self.conversion_thread = Thread(target=self.run_conversion, daemon=True)
@@ -1331,62 +1548,46 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
             elif self.overwrite_original.get():
                 self.log_message("⚠️ 注意：将直接覆盖原文件，不进行备份")
                 
-            # 统计文件数量
-            self.count_files()
-            self.log_message(f"📊 统计完成，共找到 {self.total_files} 个文件需要转换")
-            
-            # 初始化统计显示
-            self.update_stats()
-            
-            current_file = 0
-            
-            # 转换DOC文件
-            if self.convert_doc.get():
-                current_file = self.convert_doc_files(self.source_dir.get(), old_files_path, current_file)
-                
-            # 转换XLS文件
-            if self.convert_xls.get():
-                current_file = self.convert_xls_files(self.source_dir.get(), old_files_path, current_file)
+            # DOC 与 XLS 同时转换
+            run_stats = self.convert_files(self.source_dir.get(), old_files_path)
                 
             if self.is_converting:
                 self.log_message("🎉 转换完成！")
-                self.status_label.config(text="✅ 转换完成", fg=COLORS['secondary'])
-                # 显示完成提示弹窗
-                completion_message = f"转换任务已完成！\n\n📊 转换统计：\n• 可转换文件数：{self.total_files}\n• 成功转换：{self.converted_files}\n• 跳过文件：{self.skipped_files}\n• 错误文件：{self.error_files}"
-                messagebox.showinfo("转换完成", completion_message)
+                self.ui_commands.post(self.status_label.config, text="✅ 转换完成", fg=COLORS['secondary'])
+                # 完成提示弹窗在界面线程中处理完所有进度事件后显示
+                self.progress_events.emit(EVENT_RUN_FINISHED, True, run_stats)
             else:
                 self.log_message("⏹️ 转换已停止")
-                self.status_label.config(text="⏹️ 已停止", fg=COLORS['text_light'])
+                self.ui_commands.post(self.status_label.config, text="⏹️ 已停止", fg=COLORS['text_light'])
                 
         except Exception as e:
             self.log_message(f"❌ 转换过程中发生错误: {e}")
-            self.status_label.config(text="❌ 转换失败", fg=COLORS['danger'])
+            self.ui_commands.post(self.status_label.config, text="❌ 转换失败", fg=COLORS['danger'])
         finally:
-            # 重置转换状态
-            self.is_converting = False
-            # 恢复UI状态
-            self.start_button.config(state=tk.NORMAL, bg=COLORS['secondary'])
-            self.stop_button.config(state=tk.DISABLED, bg=COLORS['border'])
-            self.update_stats()
+            # 重置转换状态、恢复UI状态（界面线程中执行）
+            self.ui_commands.post(self.conversion_ended)
             
-    def count_files(self):
-        """统计需要转换的文件数量"""
-        self.total_files = 0
-        for root, _, files in os.walk(self.source_dir.get()):
-            for file in files:
-                if file.lower().endswith('.doc') and self.convert_doc.get():
-                    self.total_files += 1
-                elif file.lower().endswith('.xls') and self.convert_xls.get():
-                    self.total_files += 1
-                    
-    def update_stats(self):
-        """更新统计信息"""
-        stats_text = f"📈 可转换文件: {self.total_files} | ✅ 已转换: {self.converted_files} | ⏭️ 跳过: {self.skipped_files} | ❌ 错误: {self.error_files}"
-        self.stats_queue.put(stats_text)
+    def conversion_ended(self):
+        """转换线程结束后恢复按钮状态（界面线程）"""
+        self.is_converting = False
+        self.start_button.config(state=tk.NORMAL, bg=COLORS['secondary'])
+        self.stop_button.config(state=tk.DISABLED, bg=COLORS['border'])
+            
+    def show_completion(self, run_stats):
+        """显示完成提示弹窗（界面线程）"""
+        stats = self.progress.snapshot()
+        completion_message = f"转换任务已完成！\n\n📊 转换统计：\n• 可转换文件数：{stats.total}\n• 成功转换：{stats.converted}\n• 跳过文件：{stats.skipped}\n• 错误文件：{stats.errors}"
+        opens_saved = run_stats.get("opens_saved")
+        if opens_saved:
+            completion_message += f"\n• 相同文件复用转换结果：{opens_saved}（节省 {opens_saved} 次Office打开）"
+        cache_stats = run_stats.get("cache_stats")
+        if cache_stats is not None:
+            hits, misses, evictions = cache_stats
+            completion_message += f"\n• 转换缓存：命中 {hits}，未命中 {misses}，淘汰 {evictions}"
+        messagebox.showinfo("转换完成", completion_message)
         
     def create_old_files_folder(self, source_directory):
-        old_files_folder_name = "旧格式文件"
-        old_files_path = os.path.join(source_directory, old_files_folder_name)
+        old_files_path = os.path.join(source_directory, ARCHIVE_FOLDER_NAME)
         if not os.path.exists(old_files_path):
             try:
                 os.makedirs(old_files_path)
@@ -1397,7 +1598,16 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
         return old_files_path
         
     def set_file_times(self, target_path, source_path):
-        if not self.preserve_timestamps.get():
+        if not self.preserve_timestamps.get() or self.timestamps_unavailable:
+            return
+        # pywin32 在第一次设置时间戳时才导入，不拖慢窗口启动
+        try:
+            import pywintypes
+            import win32con
+            import win32file
+        except ImportError:
+            self.timestamps_unavailable = True
+            self.log_message("警告: 未安装 pywin32，转换结果不会保留原文件的时间戳（pip install pywin32）")
             return
             
         max_retries = 5
@@ -1432,249 +1642,254 @@ https://github.com/EatWorld/BatchOfficeFormatConverter
                 self.log_message(f"警告: 设置时间戳时发生错误: {e}")
                 return
                 
-    def convert_doc_files(self, source_directory, old_files_path, current_file):
-        if not self.is_converting:
-            return current_file
+    def dispose_original(self, source_path, old_files_path):
+        """转换完成（或目标已存在）后按设置覆盖或备份原文件"""
+        file = os.path.basename(source_path)
+        if self.overwrite_original.get():
+            # 直接覆盖原文件
+            if os.path.exists(source_path):
+                try:
+                    os.remove(source_path)
+                    self.log_message(f"已覆盖: {file}")
+                except Exception as e_remove:
+                    self.log_message(f"删除原文件失败: {source_path} - {e_remove}")
+        elif (self.archive_originals.get() or self.use_custom_archive.get()) and self.archive is not None:
+            # 备份原文件（按源目录结构存放）
+            if os.path.exists(source_path):
+                try:
+                    archived_path = self.archive.move(source_path)
+                    self.log_message(f"已备份: {file} -> {os.path.relpath(archived_path, self.archive.archive_root)}")
+                except Exception as e_move:
+                    self.log_message(f"备份失败: {source_path} - {e_move}")
+
+    def finish_conversion_result(self, result, old_files_path):
+        """处理转换池返回的单个结果：记录日志、发送进度事件并处理原文件"""
+        if result.status == STATUS_CANCELLED:
+            if self.manifest is not None:
+                self.manifest.mark_dirty(os.path.dirname(result.source_path))
+            return
             
-        self.log_message("开始处理 DOC 文件...")
-        word_app = None
-        
-        try:
-            pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-            word_app = win32com.client.Dispatch("Word.Application")
-            word_app.Visible = False
-            word_app.DisplayAlerts = 0
+        # 在原文件被移动或删除之前记录到转换清单
+        if self.manifest is not None:
+            self.manifest.record(result.source_path, result.target_path, result.status, result.content_hash)
+
+        if result.status == STATUS_CONVERTED:
+            notes = [result.message] if result.message else []
+            if result.peak_memory:
+                notes.append(f"峰值内存 {result.peak_memory / (1024 * 1024):.0f} MB")
+            if notes:
+                self.log_message(f"转换成功: {result.target_path}（{'，'.join(notes)}）")
+            else:
+                self.log_message(f"转换成功: {result.target_path}")
+            self.set_file_times(result.target_path, result.source_path)
+            self.progress_events.emit(EVENT_CONVERTED, result.source_path, result.elapsed)
+            self.dispose_original(result.source_path, old_files_path)
+        elif result.status == STATUS_TIMEOUT:
+            self.log_message(f"超时: {result.source_path} - {result.message}")
+            move_to_quarantine(result.source_path, result.target_path, self.source_dir.get(), self.log_message)
+            self.progress_events.emit(EVENT_ERROR, result.source_path, result.elapsed)
+        elif result.status == STATUS_SKIPPED:
+            if result.reason == SKIP_PASSWORD:
+                self.log_message(f"跳过（密码保护）: {result.source_path}")
+            else:
+                reason_text = SKIP_REASON_TEXT.get(result.reason, SKIP_REASON_TEXT[SKIP_UNREADABLE])
+                self.log_message(f"跳过（{reason_text}）: {result.source_path} - {result.message}")
+            self.progress_events.emit(EVENT_SKIPPED, result.source_path, result.elapsed)
+        else:
+            self.log_message(f"错误: {result.source_path} - {result.message}")
+            self.progress_events.emit(EVENT_ERROR, result.source_path, result.elapsed)
             
-            for root, _, files in os.walk(source_directory):
-                if not self.is_converting:
-                    break
-                    
-                normalized_root = os.path.normpath(root)
-                if old_files_path:
-                    normalized_old_files_path = os.path.normpath(old_files_path)
-                    if normalized_root == normalized_old_files_path or normalized_root.startswith(normalized_old_files_path + os.sep):
-                        continue
-                        
-                for file in files:
-                    if not self.is_converting:
-                        break
-                        
-                    if file.lower().endswith(".doc") and not file.lower().startswith("~"):
-                        current_file += 1
-                        self.update_progress(current_file, self.total_files)
-                        
-                        doc_file_path = os.path.join(root, file)
-                        docx_file_path = os.path.join(root, os.path.splitext(file)[0] + ".docx")
-                        
-                        # 规范化文件路径，处理特殊字符
-                        doc_file_path = os.path.normpath(doc_file_path)
-                        docx_file_path = os.path.normpath(docx_file_path)
-                        
-                        self.log_message(f"处理: {doc_file_path}")
-                        
-                        doc = None
-                        should_move_original = False
-                        
-                        try:
-                            # 检查文件是否真实存在
-                            if not os.path.exists(doc_file_path):
-                                self.log_message(f"跳过（文件不存在）: {doc_file_path}")
-                                continue
-                                
-                            if os.path.exists(docx_file_path):
-                                self.log_message(f"跳过（目标文件已存在）: {docx_file_path}")
-                                should_move_original = True
-                                self.skipped_files += 1
-                                self.update_stats()
-                            else:
-                                # 使用原始路径，但确保路径格式正确
-                                normalized_doc_path = doc_file_path.replace('/', '\\')
-                                doc = word_app.Documents.Open(normalized_doc_path, ReadOnly=True, PasswordDocument="")
-                                doc.SaveAs2(docx_file_path, FileFormat=12)
-                                doc.Close(SaveChanges=0)
-                                doc = None
-                                self.log_message(f"转换成功: {docx_file_path}")
-                                self.set_file_times(docx_file_path, doc_file_path)
-                                should_move_original = True
-                                self.converted_files += 1
-                                self.update_stats()
-                                
-                        except pythoncom.com_error as ce:
-                            error_message = str(ce).lower()
-                            if "password" in error_message or "密码" in error_message:
-                                self.log_message(f"跳过（密码保护）: {doc_file_path}")
-                            else:
-                                self.log_message(f"跳过（无法打开）: {doc_file_path} - {ce}")
-                            self.skipped_files += 1
-                            self.update_stats()
-                        except Exception as e:
-                            self.log_message(f"错误: {doc_file_path} - {e}")
-                            self.error_files += 1
-                            self.update_stats()
-                        finally:
-                            if doc:
-                                try:
-                                    doc.Close(SaveChanges=0)
-                                except:
-                                    pass
-                                    
-                            if should_move_original:
-                                if self.overwrite_original.get():
-                                    # 直接覆盖原文件
-                                    if os.path.exists(doc_file_path):
-                                        try:
-                                            os.remove(doc_file_path)
-                                            self.log_message(f"已覆盖: {file}")
-                                        except Exception as e_remove:
-                                            self.log_message(f"删除原文件失败: {doc_file_path} - {e_remove}")
-                                elif (self.archive_originals.get() or self.use_custom_archive.get()) and old_files_path:
-                                    # 备份原文件
-                                    if os.path.exists(doc_file_path):
-                                        try:
-                                            shutil.move(doc_file_path, os.path.join(old_files_path, file))
-                                            self.log_message(f"已备份: {file}")
-                                        except Exception as e_move:
-                                            self.log_message(f"备份失败: {doc_file_path} - {e_move}")
-                                        
-        except Exception as e:
-            self.log_message(f"DOC转换过程中发生错误: {e}")
-        finally:
-            if word_app:
-                try:
-                    word_app.Quit(SaveChanges=0)
-                except:
-                    pass
+        if self.journal is not None:
+            self.journal.record_done(result.source_path, result.target_path, result.status)
+
+    def create_scheduler(self):
+        """按勾选的转换类型创建 Word / Excel 转换池"""
+        cache = None
+        if self.use_cache.get() and self.cache_dir.get():
             try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
-                
-        return current_file
-        
-    def convert_xls_files(self, source_directory, old_files_path, current_file):
+                cache = ConversionCache(self.cache_dir.get(), max(0, self.cache_max_mb.get()) * 1024 * 1024)
+                self.log_message(f"🗄️ 转换缓存: {self.cache_dir.get()}（已有 {cache.total_bytes / (1024 * 1024):.0f} MB）")
+            except OSError as e:
+                self.log_message(f"警告: 无法使用转换缓存文件夹，本次不使用缓存: {e}")
+        staging = None
+        if should_stage(STAGING_AUTO if self.stage_network.get() else STAGING_NEVER, self.source_dir.get()):
+            try:
+                staging = StagingArea(prefetch_depth=max(1, self.prefetch_depth.get()),
+                                      max_bytes=max(16, self.scratch_max_mb.get()) * 1024 * 1024)
+                self.log_message(f"🌐 源文件夹位于网络路径，文件将预取到本地 {staging.scratch_dir} 转换")
+            except OSError as e:
+                self.log_message(f"警告: 无法创建本地暂存文件夹，将直接转换网络文件: {e}")
+        scheduler = ConversionScheduler(dedupe=self.dedupe.get(), cache=cache, staging=staging,
+                                        verify=self.verify_outputs.get())
+        timeout = max(0, self.file_timeout.get()) or None
+        recycle_after = max(0, self.recycle_after.get()) or None
+        recycle_memory_mb = max(0, self.recycle_memory_mb.get()) or None
+        if self.convert_doc.get():
+            doc_engine = FastDocEngine if self.fast_doc.get() else WordComEngine
+            scheduler.add_route(".doc", ".docx", doc_engine, max(1, self.word_workers.get()),
+                                timeout=timeout, timeout_per_mb=TIMEOUT_PER_MB,
+                                recycle_after=recycle_after, recycle_memory_mb=recycle_memory_mb)
+        if self.convert_xls.get():
+            xls_engine = NativeXlsEngine if self.native_xls.get() else ExcelComEngine
+            scheduler.add_route(".xls", ".xlsx", xls_engine, max(1, self.excel_workers.get()),
+                                timeout=timeout, timeout_per_mb=TIMEOUT_PER_MB,
+                                recycle_after=recycle_after, recycle_memory_mb=recycle_memory_mb)
+        self.log_message(f"♻️ Office实例回收阈值：每 {recycle_after or '∞'} 个文件，"
+                         f"或内存超过 {recycle_memory_mb or '∞'} MB")
+        return scheduler
+        
+    def convert_files(self, source_directory, old_files_path):
+        """一次遍历目录，DOC 与 XLS 同时交给各自的转换池并行转换，返回完成提示中的附加统计"""
+        run_stats = {}
         if not self.is_converting:
-            return current_file
+            return run_stats
             
-        self.log_message("开始处理 XLS 文件...")
-        excel_app = None
+        scheduler = self.create_scheduler()
+        self.log_message(f"开始转换（Word进程: {self.word_workers.get() if self.convert_doc.get() else 0}，"
+                         f"Excel进程: {self.excel_workers.get() if self.convert_xls.get() else 0}）...")
         
+        # 增量转换：跳过转换清单中未变化的文件和目录
+        self.manifest = None
+        if self.incremental.get():
+            try:
+                self.manifest = ConversionManifest(default_manifest_path(source_directory))
+            except Exception as e:
+                self.log_message(f"警告: 无法打开转换清单，将进行完整转换: {e}")
+        
+        # 原文件按源目录结构归档，并记录原路径到归档路径的索引
+        self.archive = ArchiveTree(old_files_path, source_directory) if old_files_path else None
+        
+        # 断点续传：读取上次中断时留下的日志，累计之前的统计
+        self.journal = ConversionJournal(default_journal_path(source_directory))
         try:
-            pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-            excel_app = win32com.client.Dispatch("Excel.Application")
-            excel_app.DisplayAlerts = False
+            self.journal.load()
+        except Exception as e:
+            self.log_message(f"警告: 无法读取断点续传日志: {e}")
+        if self.journal.resumed:
+            previous = self.journal.previous_stats
+            self.progress_events.emit(EVENT_BASELINE, previous[STATUS_CONVERTED],
+                                      previous[STATUS_SKIPPED] + previous[OUTCOME_EXISTS],
+                                      previous[STATUS_ERROR] + previous[STATUS_TIMEOUT])
+            self.log_message(f"♻️ 继续上次未完成的转换：已处理 {sum(previous.values())} 个文件，"
+                             f"{len(self.journal.in_flight)} 个文件需要重新检查")
+        
+        # 后台单次遍历目录，发现第一个文件即开始转换
+        discovery = FileDiscovery(
+            source_directory,
+            build_extension_map(self.convert_doc.get(), self.convert_xls.get()),
+            exclude_dirs=converter_folders(source_directory, old_files_path),
+            exclude_patterns=parse_exclude_patterns(self.exclude_patterns.get()),
+            manifest=self.manifest
+        )
+        # 转换池中最多积压的任务数，避免一次性把整个目录塞进队列
+        max_pending = scheduler.worker_count * 4
+        
+        try:
+            self.journal.start_run()
+            scheduler.start()
+            discovery.start()
+            discovered = 0
             
-            for root, _, files in os.walk(source_directory):
+            for item in discovery.iter_items():
                 if not self.is_converting:
                     break
                     
-                normalized_root = os.path.normpath(root)
-                if old_files_path:
-                    normalized_old_files_path = os.path.normpath(old_files_path)
-                    if normalized_root == normalized_old_files_path or normalized_root.startswith(normalized_old_files_path + os.sep):
-                        continue
-                        
-                for file in files:
-                    if not self.is_converting:
-                        break
-                        
-                    if file.lower().endswith(".xls") and not file.lower().startswith("~"):
-                        current_file += 1
-                        self.update_progress(current_file, self.total_files)
-                        
-                        xls_file_path = os.path.join(root, file)
-                        xlsx_file_path = os.path.join(root, os.path.splitext(file)[0] + ".xlsx")
-                        
-                        # 规范化文件路径，处理特殊字符
-                        xls_file_path = os.path.normpath(xls_file_path)
-                        xlsx_file_path = os.path.normpath(xlsx_file_path)
-                        
-                        self.log_message(f"处理: {xls_file_path}")
-                        
-                        workbook = None
-                        should_move_original = False
+                if discovery.discovered_count != discovered:
+                    discovered = discovery.discovered_count
+                    self.progress_events.emit(EVENT_DISCOVERED, discovered)
+                
+                if item is not None and self.journal.is_completed(item.path):
+                    # 上次运行中已处理完毕，统计已计入；
+                    # 失败或超时的文件不再重试，但所在目录不能记录为已完成，下次运行仍需枚举
+                    if self.manifest is not None and self.journal.completed[item.path] not in FINAL_OUTCOMES:
+                        self.manifest.mark_dirty(os.path.dirname(item.path))
+                    self.progress_events.emit(EVENT_ALREADY_DONE, item.path)
+                elif item is not None:
+                    source_file_path = item.path
+                    target_file_path = scheduler.target_path_for(source_file_path)
+                    
+                    # 转换结果校验后才改名为目标文件，已存在的目标文件一定完整；
+                    # 上次中断时正在转换的文件只会留下临时文件
+                    if self.journal.was_interrupted(source_file_path):
+                        atomic_output.discard(atomic_output.temporary_path(target_file_path))
+                    
+                    if os.path.exists(target_file_path):
+                        self.log_message(f"跳过（目标文件已存在）: {target_file_path}")
+                        if self.manifest is not None:
+                            self.manifest.record(source_file_path, target_file_path, OUTCOME_EXISTS)
+                        self.progress_events.emit(EVENT_SKIPPED, source_file_path, 0.0)
+                        self.dispose_original(source_file_path, old_files_path)
+                        self.journal.record_done(source_file_path, target_file_path, OUTCOME_EXISTS)
+                    else:
+                        self.log_message(f"处理: {source_file_path}")
+                        self.journal.record_submitted(source_file_path, target_file_path)
+                        scheduler.submit(source_file_path, target_file_path, item.size)
+                        self.progress_events.emit(EVENT_STARTED, source_file_path)
                         
-                        try:
-                            # 检查文件是否真实存在
-                            if not os.path.exists(xls_file_path):
-                                self.log_message(f"跳过（文件不存在）: {xls_file_path}")
-                                continue
-                                
-                            if os.path.exists(xlsx_file_path):
-                                self.log_message(f"跳过（目标文件已存在）: {xlsx_file_path}")
-                                should_move_original = True
-                                self.skipped_files += 1
-                                self.update_stats()
-                            else:
-                                # 使用原始路径，但确保路径格式正确
-                                normalized_xls_path = xls_file_path.replace('/', '\\')
-                                workbook = excel_app.Workbooks.Open(
-                                    normalized_xls_path,
-                                    UpdateLinks=0,
-                                    ReadOnly=True,
-                                    Format=None,
-                                    Password="",
-                                    IgnoreReadOnlyRecommended=True
-                                )
-                                workbook.SaveAs(xlsx_file_path, FileFormat=51)
-                                workbook.Close(SaveChanges=False)
-                                workbook = None
-                                self.log_message(f"转换成功: {xlsx_file_path}")
-                                self.set_file_times(xlsx_file_path, xls_file_path)
-                                should_move_original = True
-                                self.converted_files += 1
-                                self.update_stats()
-                                
-                        except pythoncom.com_error as ce:
-                            error_message = str(ce).lower()
-                            if "password" in error_message or "密码" in error_message:
-                                self.log_message(f"跳过（密码保护）: {xls_file_path}")
-                            else:
-                                self.log_message(f"跳过（无法打开）: {xls_file_path} - {ce}")
-                            self.skipped_files += 1
-                            self.update_stats()
-                        except Exception as e:
-                            self.log_message(f"错误: {xls_file_path} - {e}")
-                            self.error_files += 1
-                            self.update_stats()
-                        finally:
-                            if workbook:
-                                try:
-                                    workbook.Close(SaveChanges=False)
-                                except:
-                                    pass
-                                    
-                            if should_move_original:
-                                if self.overwrite_original.get():
-                                    # 直接覆盖原文件
-                                    if os.path.exists(xls_file_path):
-                                        try:
-                                            os.remove(xls_file_path)
-                                            self.log_message(f"已覆盖: {file}")
-                                        except Exception as e_remove:
-                                            self.log_message(f"删除原文件失败: {xls_file_path} - {e_remove}")
-                                elif (self.archive_originals.get() or self.use_custom_archive.get()) and old_files_path:
-                                    # 备份原文件
-                                    if os.path.exists(xls_file_path):
-                                        try:
-                                            shutil.move(xls_file_path, os.path.join(old_files_path, file))
-                                            self.log_message(f"已备份: {file}")
-                                        except Exception as e_move:
-                                            self.log_message(f"备份失败: {xls_file_path} - {e_move}")
-                                        
+                # 边遍历边收取已完成的结果
+                for result in scheduler.results(wait=False):
+                    self.finish_conversion_result(result, old_files_path)
+                for result in scheduler.wait_for_capacity(max_pending):
+                    self.finish_conversion_result(result, old_files_path)
+                    
+            self.progress_events.emit(EVENT_DISCOVERED, discovery.discovered_count)
+            if discovery.error is not None:
+                self.log_message(f"遍历目录时发生错误: {discovery.error}")
+                
+            if self.is_converting:
+                self.log_message(f"📊 遍历完成，共找到 {discovery.discovered_count} 个文件需要转换（{discovery.stats.summary()}）")
+                scheduler.close()
+            else:
+                discovery.stop()
+                scheduler.cancel()
+                
+            for result in scheduler.results():
+                self.finish_conversion_result(result, old_files_path)
+            # 等待工作进程退出，收齐回收记录后再输出统计
+            scheduler.shutdown()
+                
+            for line in scheduler.recycle_summary():
+                self.log_message(f"♻️ {line}")
+            for line in scheduler.memory_summary():
+                self.log_message(f"📊 {line}")
+            if self.archive is not None and self.archive.moved_count:
+                self.log_message(f"🗂️ {self.archive.summary()}")
+            if scheduler.verify_summary():
+                self.log_message(f"⚠️ {scheduler.verify_summary()}")
+            if scheduler.dedupe_summary():
+                self.log_message(f"📊 {scheduler.dedupe_summary()}")
+            run_stats["opens_saved"] = scheduler.opens_saved
+            if scheduler.staging is not None:
+                self.log_message(f"🌐 {scheduler.staging_summary()}")
+            if scheduler.cache is not None:
+                self.log_message(f"🗄️ {scheduler.cache_summary()}")
+                run_stats["cache_stats"] = (scheduler.cache.hits, scheduler.cache.misses, scheduler.cache.evictions)
+            for engine_name, worker_id, error in scheduler.worker_errors:
+                self.log_message(f"{engine_name} 进程 {worker_id} 启动失败: {error}")
+            if scheduler.timeouts:
+                self.log_message(f"⚠️ {scheduler.timeouts} 个文件转换超时，已重启Office进程并隔离这些文件")
+                
+            # 只有完整结束的运行才把目录记录为已完成、删除断点续传日志
+            if self.is_converting:
+                if self.manifest is not None:
+                    self.manifest.finalize_directories()
+                self.journal.finish()
+                
         except Exception as e:
-            self.log_message(f"XLS转换过程中发生错误: {e}")
+            self.log_message(f"转换过程中发生错误: {e}")
         finally:
-            if excel_app:
-                try:
-                    excel_app.Quit()
-                except:
-                    pass
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
+            discovery.stop()
+            scheduler.shutdown()
+            if self.manifest is not None:
+                self.manifest.close()
+                self.manifest = None
+            self.journal.close()
+            self.journal = None
+            if self.archive is not None:
+                self.archive.close()
+                self.archive = None
                 
-        return current_file
+        return run_stats
 
 def main():
     root = tk.Tk()
@@ -1685,9 +1900,11 @@ def main():
         if app.is_converting:
             if messagebox.askokcancel("退出确认", "转换正在进行中，确定要退出程序吗？"):
                 app.is_converting = False
+                app.log_view.close()
                 root.destroy()
         else:
             # 没有转换时直接关闭程序
+            app.log_view.close()
             root.destroy()
             
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -1703,4 +1920,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # 打包为exe时多进程转换池需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,472 @@
+import csv
+import os
+import shutil
+import subprocess
+
+from file_discovery import KIND_DOC, KIND_XLS
+from file_sniffer import (
+    SNIFF_EMPTY,
+    SNIFF_ENCRYPTED,
+    SNIFF_MISNAMED,
+    SNIFF_OOXML,
+    sniff_file,
+)
+
+# Office 常量
+WD_ALERTS_NONE = 0
+WD_FORMAT_XML_DOCUMENT = 12
+XL_OPEN_XML_WORKBOOK = 51
+XL_REPAIR_FILE = 1
+
+# 跳过原因
+SKIP_PASSWORD = "password"
+SKIP_UNREADABLE = "unreadable"
+SKIP_MISNAMED = "misnamed"
+
+SKIP_REASON_TEXT = {
+    SKIP_PASSWORD: "密码保护",
+    SKIP_UNREADABLE: "无法打开",
+    SKIP_MISNAMED: "扩展名与内容不符",
+}
+
+
+class ConversionSkipped(Exception):
+    """文件无法转换但不属于程序错误（密码保护、Office无法打开等），原文件保留在原位"""
+
+    def __init__(self, reason, detail=""):
+        super().__init__(detail or reason)
+        self.reason = reason
+        self.detail = detail
+
+
+class ConversionEngine:
+    """转换引擎接口
+
+    每个工作进程持有一个独立的引擎实例：start() 在进程内初始化一次，
+    convert() 对每个文件调用（可返回一段说明文字，随结果一起报告），stop() 在进程退出前调用。
+    测试时可替换为不依赖 Office 的假引擎。
+    """
+
+    name = "base"
+    # 引擎输出格式变化时递增，使转换缓存中旧版本的结果失效
+    version = "1"
+
+    @classmethod
+    def engine_version(cls):
+        """参与转换缓存键的引擎版本"""
+        return cls.version
+
+    def start(self):
+        pass
+
+    def convert(self, source_path, target_path):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+    def process_ids(self):
+        """引擎占用的外部进程（如 WINWORD.EXE），超时时由看门狗强制结束"""
+        return []
+
+    def memory_usage(self):
+        """引擎占用的外部进程当前的内存（工作集，字节），用于判断是否需要回收实例；无法测量时为 None"""
+        return process_memory_usage(self.process_ids())
+
+
+def list_process_ids(image_name):
+    """列出指定映像名的进程 ID（Windows tasklist）"""
+    try:
+        output = subprocess.run(
+            ["tasklist", "/FI", f"IMAGENAME eq {image_name}", "/FO", "CSV", "/NH"],
+            capture_output=True, text=True, timeout=10,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    pids = set()
+    for row in csv.reader(output.splitlines()):
+        if len(row) >= 2 and row[0].lower() == image_name.lower():
+            try:
+                pids.add(int(row[1]))
+            except ValueError:
+                pass
+    return pids
+
+
+def process_memory_usage(pids):
+    """指定进程的内存之和（字节）：Windows 为工作集，其他系统为常驻内存（RSS）
+
+    没有进程时返回 0，无法测量（没有 pywin32 / psutil，也没有 /proc）时返回 None；
+    单个进程已退出或无法读取时按 0 计。
+    """
+    if not pids:
+        return 0
+    try:
+        import win32api
+        import win32con
+        import win32process
+    except ImportError:
+        return _process_rss(pids)
+    total = 0
+    for pid in pids:
+        try:
+            handle = win32api.OpenProcess(
+                win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
+        except Exception:
+            continue
+        try:
+            total += win32process.GetProcessMemoryInfo(handle)["WorkingSetSize"]
+        except Exception:
+            pass
+        finally:
+            win32api.CloseHandle(handle)
+    return total
+
+
+def _process_rss(pids):
+    """没有 pywin32 时的内存测量：优先使用 psutil，其次读取 /proc/<pid>/status 的 VmRSS"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        total = 0
+        for pid in pids:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    if not os.path.isdir("/proc/self"):
+        return None
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status", "rb") as f:
+                for line in f:
+                    if line.startswith(b"VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
+
+
+def office_version(prog_id):
+    """从注册表读取已安装 Office 组件的版本（如 Word.Application.16），读取失败时返回空字符串"""
+    try:
+        import winreg
+        return winreg.QueryValue(winreg.HKEY_CLASSES_ROOT, f"{prog_id}\\CurVer")
+    except (ImportError, OSError):
+        return ""
+
+
+def preflight(source_path, target_path, kind):
+    """打开 Office 之前检查文件头
+
+    无法转换的文件（加密、空文件、扩展名与内容不符）直接抛出 ConversionSkipped；
+    实际已是目标格式的文件直接复制为目标文件并返回 True，不再需要 Office。
+    """
+    try:
+        verdict, detail = sniff_file(source_path, kind)
+    except OSError:
+        # 读取失败时交给 Office 报告具体错误
+        return False
+    if verdict == SNIFF_ENCRYPTED:
+        raise ConversionSkipped(SKIP_PASSWORD, detail)
+    if verdict == SNIFF_EMPTY:
+        raise ConversionSkipped(SKIP_UNREADABLE, detail)
+    if verdict == SNIFF_MISNAMED:
+        raise ConversionSkipped(SKIP_MISNAMED, detail)
+    if verdict == SNIFF_OOXML:
+        shutil.copyfile(source_path, target_path)
+        return True
+    return False
+
+
+def classify_word_com_error(com_error):
+    """根据错误信息和 HRESULT 判断 Word 打开失败的原因"""
+    error_message = str(com_error).lower()
+    hresult = getattr(com_error, 'hresult', 0)
+    password_keywords = ["password", "密码", "protected", "-2146824422", "-2146822422", "incorrect password", "incorrect document password"]
+    if any(keyword in error_message for keyword in password_keywords) or hresult in (-2146824422, -2146822422):
+        return SKIP_PASSWORD
+    return SKIP_UNREADABLE
+
+
+def classify_excel_com_error(com_error):
+    """根据错误信息和 HRESULT 判断 Excel 打开失败的原因"""
+    error_message = str(com_error).lower()
+    hresult = getattr(com_error, 'hresult', 0)
+    password_keywords = ["password", "密码", "protected", "cannot open the specified file"]
+    if any(keyword in error_message for keyword in password_keywords) or hresult == -2146827284:
+        return SKIP_PASSWORD
+    return SKIP_UNREADABLE
+
+
+class WordComEngine(ConversionEngine):
+    """通过 COM 驱动独立的 Word 实例进行 DOC → DOCX 转换"""
+
+    name = "word"
+
+    @classmethod
+    def engine_version(cls):
+        return f"{cls.version}/{office_version('Word.Application')}"
+
+    def __init__(self):
+        self.word_app = None
+        self.word_pids = []
+
+    def start(self):
+        import pythoncom
+        import win32com.client
+
+        # 每个工作进程拥有自己的 COM 单线程套间
+        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
+        # DispatchEx 总是启动新的 Word 进程，避免多个工作进程共享同一实例
+        existing_pids = list_process_ids("WINWORD.EXE")
+        self.word_app = win32com.client.DispatchEx("Word.Application")
+        self.word_pids = self._find_word_pids(existing_pids)
+        self.word_app.Visible = False
+        self.word_app.DisplayAlerts = WD_ALERTS_NONE
+
+    def _find_word_pids(self, existing_pids):
+        """找到本实例的 Word 进程 ID
+
+        Word 没有 Hwnd 属性：先给实例设置唯一的标题，按标题找到它的主窗口（OpusApp），
+        再像 Excel 一样由窗口句柄取得进程 ID。
+        找不到窗口时退回启动前后的进程列表差异，但只在恰好新增一个进程时采用；
+        同时有其他 Word 启动时无法确定哪个属于本实例，返回空列表，超时时也不会强制结束进程。
+        """
+        try:
+            import win32gui
+            import win32process
+
+            caption = f"OfficeConverter-{os.getpid()}-{id(self)}"
+            self.word_app.Caption = caption
+            hwnd = win32gui.FindWindow("OpusApp", caption)
+            if hwnd:
+                return [win32process.GetWindowThreadProcessId(hwnd)[1]]
+        except Exception:
+            pass
+        new_pids = list_process_ids("WINWORD.EXE") - existing_pids
+        return sorted(new_pids) if len(new_pids) == 1 else []
+
+    def process_ids(self):
+        return self.word_pids
+
+    def convert(self, source_path, target_path):
+        import pythoncom
+
+        if preflight(source_path, target_path, KIND_DOC):
+            return
+        doc = None
+        try:
+            normalized_doc_path = os.path.normpath(source_path).replace('/', '\\')
+            doc = self.word_app.Documents.Open(normalized_doc_path, ReadOnly=True, PasswordDocument="")
+            doc.SaveAs2(target_path, FileFormat=WD_FORMAT_XML_DOCUMENT)
+        except pythoncom.com_error as ce:
+            raise ConversionSkipped(classify_word_com_error(ce), str(ce))
+        finally:
+            if doc is not None:
+                try:
+                    doc.Close(SaveChanges=0)
+                except Exception:
+                    pass
+
+    def stop(self):
+        import pythoncom
+
+        if self.word_app is not None:
+            try:
+                self.word_app.Quit(SaveChanges=0)
+            except Exception:
+                pass
+            self.word_app = None
+        try:
+            pythoncom.CoUninitialize()
+        except Exception:
+            pass
+
+
+class ExcelComEngine(ConversionEngine):
+    """通过 COM 驱动独立的 Excel 实例进行 XLS → XLSX 转换"""
+
+    name = "excel"
+
+    @classmethod
+    def engine_version(cls):
+        return f"{cls.version}/{office_version('Excel.Application')}"
+
+    def __init__(self):
+        self.excel_app = None
+        self.excel_pids = []
+
+    def start(self):
+        import pythoncom
+        import win32com.client
+        import win32process
+
+        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
+        self.excel_app = win32com.client.DispatchEx("Excel.Application")
+        try:
+            self.excel_pids = [win32process.GetWindowThreadProcessId(self.excel_app.Hwnd)[1]]
+        except Exception:
+            self.excel_pids = []
+        try:
+            self.excel_app.DisplayAlerts = False
+        except pythoncom.com_error:
+            pass
+
+    def process_ids(self):
+        return self.excel_pids
+
+    def convert(self, source_path, target_path):
+        import pythoncom
+
+        if preflight(source_path, target_path, KIND_XLS):
+            return
+        workbook = None
+        try:
+            normalized_xls_path = os.path.normpath(source_path).replace('/', '\\')
+            workbook = self.excel_app.Workbooks.Open(
+                normalized_xls_path,
+                UpdateLinks=0,
+                ReadOnly=True,
+                Format=None,
+                Password="",
+                IgnoreReadOnlyRecommended=True,
+                CorruptLoad=XL_REPAIR_FILE
+            )
+            if getattr(workbook, 'HasPassword', False):
+                raise ConversionSkipped(SKIP_PASSWORD, "打开后仍指示受密码保护")
+            workbook.SaveAs(target_path, FileFormat=XL_OPEN_XML_WORKBOOK)
+        except pythoncom.com_error as ce:
+            raise ConversionSkipped(classify_excel_com_error(ce), str(ce))
+        finally:
+            if workbook is not None:
+                try:
+                    workbook.Close(SaveChanges=False)
+                except Exception:
+                    pass
+
+    def stop(self):
+        import pythoncom
+
+        if self.excel_app is not None:
+            try:
+                self.excel_app.Quit()
+            except Exception:
+                pass
+            self.excel_app = None
+        try:
+            pythoncom.CoUninitialize()
+        except Exception:
+            pass
+
+
+class NativeEngine(ConversionEngine):
+    """不依赖 Office 的内置引擎基类
+
+    子类在 convert_native() 中直接解析原文件并写出目标文件，可在任意核心数和 Linux 上并行运行；
+    遇到不支持的内容或解析失败时，由按需启动的 fallback_factory 引擎（Office）转换该文件。
+    """
+
+    name = "native"
+    kind = None
+    fallback_factory = None
+
+    @classmethod
+    def engine_version(cls):
+        # 不支持的文件由 Office 转换，缓存键同时包含 Office 的版本
+        return f"{cls.version}+{cls.fallback_factory.engine_version()}"
+
+    def __init__(self):
+        self.fallback = None
+
+    def convert_native(self, source_path, target_path):
+        raise NotImplementedError
+
+    def convert(self, source_path, target_path):
+        if preflight(source_path, target_path, self.kind):
+            return None
+        try:
+            self.convert_native(source_path, target_path)
+            return None
+        except Exception as e:
+            reason = str(e) or type(e).__name__
+            if os.path.exists(target_path):
+                os.remove(target_path)
+        if self.fallback is None:
+            fallback = self.fallback_factory()
+            try:
+                fallback.start()
+            except Exception as e:
+                raise RuntimeError(f"内置引擎无法转换（{reason}），且无法启动 {fallback.name}: {e}")
+            self.fallback = fallback
+        self.fallback.convert(source_path, target_path)
+        return f"由 {self.fallback.name} 转换（{reason}）"
+
+    def process_ids(self):
+        return self.fallback.process_ids() if self.fallback is not None else []
+
+    def stop(self):
+        if self.fallback is not None:
+            self.fallback.stop()
+            self.fallback = None
+
+
+class NativeXlsEngine(NativeEngine):
+    """内置 XLS → XLSX 引擎：解析 BIFF8 工作簿并写出 XLSX
+
+    遇到不支持的内容（图形、批注、宏等）时由 Excel 转换。
+    """
+
+    name = "xls-native"
+    kind = KIND_XLS
+    fallback_factory = ExcelComEngine
+
+    def convert_native(self, source_path, target_path):
+        from xls_reader import open_workbook
+        from xlsx_writer import write_workbook
+
+        with open_workbook(source_path) as book:
+            write_workbook(book, target_path)
+
+
+class FastDocEngine(NativeEngine):
+    """内置 DOC → DOCX 快速引擎：只保留段落、基本字符格式、段落样式、表格和分节
+
+    适合对版式保真度要求不高、追求吞吐量的归档转换；
+    遇到图片、列表、页眉页脚、脚注、批注、修订、嵌套表格等内容时由 Word 转换。
+    """
+
+    name = "doc-fast"
+    kind = KIND_DOC
+    fallback_factory = WordComEngine
+
+    def convert_native(self, source_path, target_path):
+        from doc_reader import read_document
+        from docx_writer import write_document
+
+        write_document(read_document(source_path), target_path)
+
+
+# XLS 转换引擎：Office（COM）或内置引擎（不支持的文件由 Office 转换）
+XLS_ENGINE_OFFICE = "office"
+XLS_ENGINE_NATIVE = "native"
+
+XLS_ENGINES = {
+    XLS_ENGINE_OFFICE: ExcelComEngine,
+    XLS_ENGINE_NATIVE: NativeXlsEngine,
+}
+
+# DOC 转换引擎：Office（完整保真）或快速引擎（只保留文字和基本结构，不支持的文件由 Word 转换）
+DOC_ENGINE_OFFICE = "office"
+DOC_ENGINE_FAST = "fast"
+
+DOC_ENGINES = {
+    DOC_ENGINE_OFFICE: WordComEngine,
+    DOC_ENGINE_FAST: FastDocEngine,
+}
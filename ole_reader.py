@@ -0,0 +1,306 @@
+import mmap
+import struct
+from datetime import datetime, timedelta
+
+# OLE2 复合文档（Compound File Binary）格式常量
+OLE_SIGNATURE = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
+
+FREE_SECTOR = 0xFFFFFFFF
+END_OF_CHAIN = 0xFFFFFFFE
+MAX_REGULAR_SECTOR = 0xFFFFFFFA
+
+DIR_ENTRY_SIZE = 128
+ENTRY_STORAGE = 1
+ENTRY_STREAM = 2
+ENTRY_ROOT = 5
+
+HEADER_DIFAT_COUNT = 109
+
+SUMMARY_INFORMATION = "\x05SummaryInformation"
+
+# SummaryInformation 属性编号
+PID_CODEPAGE = 1
+SUMMARY_PROPERTIES = {
+    2: "title",
+    3: "subject",
+    4: "author",
+    5: "keywords",
+    6: "comments",
+    8: "last_author",
+    12: "created",
+    13: "modified",
+}
+
+VT_I2 = 2
+VT_LPSTR = 30
+VT_LPWSTR = 31
+VT_FILETIME = 64
+
+_FILETIME_EPOCH = datetime(1601, 1, 1)
+
+
+class OleFormatError(Exception):
+    """文件不是有效的 OLE2 复合文档，或结构已损坏"""
+
+
+def is_ole_file(header):
+    return header[:8] == OLE_SIGNATURE
+
+
+class OleFile:
+    """只读的 OLE2 复合文档读取器
+
+    .doc / .xls 都是 OLE2 容器，Word 文档流为 WordDocument / 1Table / 0Table，
+    Excel 工作簿流为 Workbook（BIFF8）或 Book（BIFF5）。
+    文件通过 mmap 映射而不是读入内存，FAT / MiniFAT 只在沿扇区链查找时按需读取；
+    read_stream 返回 memoryview，扇区连续存放的流直接引用映射内存，不复制数据。
+    返回的 memoryview 只在 OleFile 关闭前有效，使用方应在 with 块内完成解析：
+    关闭时这些视图被逐一释放，映射随即关闭（Windows 上残留的视图会让文件一直被锁定）；
+    使用方自己从中切出并保留的视图需在关闭前释放。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise OleFormatError("不是 OLE2 复合文档")
+        self._view = memoryview(self._map)
+        self._mini_stream = None
+        # read_stream 交给使用方的视图，关闭时统一释放
+        self._exports = []
+        try:
+            self._read_header()
+            self._load_fat_sectors()
+            self._load_directory()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._view is None:
+            return
+        for view in self._exports:
+            view.release()
+        self._exports = []
+        if self._mini_stream is not None:
+            self._mini_stream.release()
+            self._mini_stream = None
+        self._view.release()
+        self._view = None
+        try:
+            self._map.close()
+        except BufferError:
+            # 调用方仍持有自己切出的视图，映射在这些视图释放后由垃圾回收关闭
+            pass
+        self._file.close()
+
+    def _read_header(self):
+        header = self._view[:512]
+        if len(header) < 512 or not is_ole_file(header):
+            raise OleFormatError("不是 OLE2 复合文档")
+        sector_shift, mini_sector_shift = struct.unpack_from("<HH", header, 0x1E)
+        if sector_shift not in (9, 12) or mini_sector_shift != 6:
+            raise OleFormatError(f"不支持的扇区大小: {sector_shift}")
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_sector_shift
+        (self._fat_sector_count, self._first_dir_sector, _, self.mini_stream_cutoff,
+         self._first_minifat_sector, self._minifat_sector_count,
+         self._first_difat_sector, self._difat_sector_count) = struct.unpack_from("<IIIIIIII", header, 0x2C)
+        self._header_difat = struct.unpack_from(f"<{HEADER_DIFAT_COUNT}I", header, 0x4C)
+        self._entries_per_sector = self.sector_size // 4
+
+    def _sector_offset(self, sector):
+        if sector > MAX_REGULAR_SECTOR:
+            raise OleFormatError(f"无效的扇区号: {sector:#x}")
+        offset = (sector + 1) * self.sector_size
+        if offset + self.sector_size > len(self._map):
+            raise OleFormatError("扇区超出文件末尾")
+        return offset
+
+    def _load_fat_sectors(self):
+        """只收集 FAT 所在的扇区号（DIFAT），FAT 表项在查找扇区链时才读取"""
+        fat_sectors = [s for s in self._header_difat if s <= MAX_REGULAR_SECTOR]
+        difat_sector = self._first_difat_sector
+        for _ in range(self._difat_sector_count):
+            if difat_sector > MAX_REGULAR_SECTOR:
+                break
+            values = struct.unpack_from(f"<{self._entries_per_sector}I", self._view,
+                                        self._sector_offset(difat_sector))
+            fat_sectors.extend(s for s in values[:-1] if s <= MAX_REGULAR_SECTOR)
+            difat_sector = values[-1]
+        self._fat_sectors = fat_sectors[:self._fat_sector_count]
+        self._minifat_sectors = None
+
+    def _fat_entry(self, sector):
+        index, slot = divmod(sector, self._entries_per_sector)
+        if index >= len(self._fat_sectors):
+            raise OleFormatError("扇区链损坏")
+        return struct.unpack_from("<I", self._view, self._sector_offset(self._fat_sectors[index]) + slot * 4)[0]
+
+    def _minifat_entry(self, sector):
+        if self._minifat_sectors is None:
+            self._minifat_sectors = self._chain(self._first_minifat_sector, self._fat_entry) \
+                if self._minifat_sector_count else []
+        index, slot = divmod(sector, self._entries_per_sector)
+        if index >= len(self._minifat_sectors):
+            raise OleFormatError("扇区链损坏")
+        return struct.unpack_from("<I", self._view, self._sector_offset(self._minifat_sectors[index]) + slot * 4)[0]
+
+    def _chain(self, start, next_sector, limit=None):
+        """沿分配表返回扇区链，检测循环引用；limit 为最多需要的扇区数"""
+        chain = []
+        seen = set()
+        sector = start
+        while sector != END_OF_CHAIN and sector != FREE_SECTOR:
+            if limit is not None and len(chain) >= limit:
+                break
+            if sector in seen or sector > MAX_REGULAR_SECTOR:
+                raise OleFormatError("扇区链损坏")
+            seen.add(sector)
+            chain.append(sector)
+            sector = next_sector(sector)
+        return chain
+
+    def _gather(self, source, chain, unit, offset_of, size):
+        """把扇区链拼成 memoryview：扇区连续时直接切片，否则复制到新的缓冲区"""
+        if not chain:
+            return memoryview(b"")
+        contiguous = all(b == a + 1 for a, b in zip(chain, chain[1:]))
+        if contiguous:
+            start = offset_of(chain[0])
+            end = min(start + len(chain) * unit, len(source))
+            return source[start:end][:size]
+        buffer = bytearray()
+        for sector in chain:
+            start = offset_of(sector)
+            buffer += source[start:start + unit]
+        return memoryview(buffer)[:size]
+
+    def _read_chain(self, start, size=None):
+        limit = None if size is None else -(-size // self.sector_size)
+        chain = self._chain(start, self._fat_entry, limit)
+        if size is None:
+            size = len(chain) * self.sector_size
+        elif len(chain) < limit:
+            raise OleFormatError("扇区链比流的大小短")
+        return self._gather(self._view, chain, self.sector_size, self._sector_offset, size)
+
+    def _load_directory(self):
+        data = self._read_chain(self._first_dir_sector)
+        self._entries = []
+        for offset in range(0, len(data) - DIR_ENTRY_SIZE + 1, DIR_ENTRY_SIZE):
+            name_length, entry_type = struct.unpack_from("<HB", data, offset + 64)
+            start_sector, size = struct.unpack_from("<IQ", data, offset + 116)
+            name = str(data[offset:offset + max(0, min(name_length, 64) - 2)], "utf-16-le", "replace")
+            if self.sector_size == 512:
+                # 版本 3 的文件只使用大小字段的低 32 位
+                size &= 0xFFFFFFFF
+            self._entries.append((name, entry_type, start_sector, size))
+        data.release()
+        if not self._entries or self._entries[0][1] != ENTRY_ROOT:
+            raise OleFormatError("缺少根目录项")
+
+    def listdir(self):
+        """所有流的名称（不含存储层级，旧格式文档的关键流都在根存储下）"""
+        return [name for name, entry_type, _, _ in self._entries if entry_type == ENTRY_STREAM]
+
+    def exists(self, name):
+        """是否存在指定名称的流或存储"""
+        lowered = name.lower()
+        return any(entry[0].lower() == lowered for entry in self._entries[1:]
+                   if entry[1] in (ENTRY_STREAM, ENTRY_STORAGE))
+
+    def _find(self, name):
+        lowered = name.lower()
+        for entry in self._entries:
+            if entry[1] == ENTRY_STREAM and entry[0].lower() == lowered:
+                return entry
+        return None
+
+    def stream_size(self, name):
+        entry = self._find(name)
+        if entry is None:
+            raise OleFormatError(f"流不存在: {name}")
+        return entry[3]
+
+    def read_stream(self, name, max_size=None):
+        """返回指定流内容的 memoryview，max_size 限制读取的字节数"""
+        entry = self._find(name)
+        if entry is None:
+            raise OleFormatError(f"流不存在: {name}")
+        _, _, start_sector, size = entry
+        if max_size is not None:
+            size = min(size, max_size)
+        if entry[3] < self.mini_stream_cutoff:
+            view = self._read_mini_stream(start_sector, size)
+        else:
+            view = self._read_chain(start_sector, size)
+        self._exports.append(view)
+        return view
+
+    def _read_mini_stream(self, start, size):
+        if self._mini_stream is None:
+            root = self._entries[0]
+            self._mini_stream = self._read_chain(root[2], root[3])
+        limit = -(-size // self.mini_sector_size)
+        chain = self._chain(start, self._minifat_entry, limit)
+        if len(chain) < limit:
+            raise OleFormatError("扇区链比流的大小短")
+        return self._gather(self._mini_stream, chain, self.mini_sector_size,
+                            lambda sector: sector * self.mini_sector_size, size)
+
+    def summary_information(self):
+        """读取文档摘要信息（标题、作者、创建时间等），没有时返回空字典"""
+        if not self.exists(SUMMARY_INFORMATION):
+            return {}
+        try:
+            return _parse_property_set(self.read_stream(SUMMARY_INFORMATION))
+        except (struct.error, OleFormatError, LookupError, ValueError):
+            return {}
+
+
+def _parse_property_set(data):
+    section_offset, = struct.unpack_from("<I", data, 28 + 16)
+    _, count = struct.unpack_from("<II", data, section_offset)
+    properties = {}
+    for i in range(count):
+        property_id, offset = struct.unpack_from("<II", data, section_offset + 8 + i * 8)
+        properties[property_id] = section_offset + offset
+
+    codepage = 1252
+    if PID_CODEPAGE in properties and struct.unpack_from("<I", data, properties[PID_CODEPAGE])[0] == VT_I2:
+        codepage = struct.unpack_from("<H", data, properties[PID_CODEPAGE] + 4)[0]
+    encoding = "utf-16-le" if codepage == 1200 else f"cp{codepage}"
+
+    result = {}
+    for property_id, key in SUMMARY_PROPERTIES.items():
+        if property_id not in properties:
+            continue
+        offset = properties[property_id]
+        value_type, = struct.unpack_from("<I", data, offset)
+        if value_type == VT_LPSTR:
+            length, = struct.unpack_from("<I", data, offset + 4)
+            value = str(data[offset + 8:offset + 8 + length], encoding, "replace").rstrip("\x00")
+        elif value_type == VT_LPWSTR:
+            length, = struct.unpack_from("<I", data, offset + 4)
+            value = str(data[offset + 8:offset + 8 + length * 2], "utf-16-le", "replace").rstrip("\x00")
+        elif value_type == VT_FILETIME:
+            ticks, = struct.unpack_from("<Q", data, offset + 4)
+            if not ticks:
+                continue
+            value = _FILETIME_EPOCH + timedelta(microseconds=ticks // 10)
+        else:
+            continue
+        if value:
+            result[key] = value
+    return result
@@ -0,0 +1,49 @@
+import re
+from xml.sax.saxutils import escape
+
+# XLSX / DOCX 包共用的部件：原文件的文档属性写入 docProps/core.xml
+
+CORE_PROPERTIES_REL = (
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+)
+CORE_PROPERTIES_TYPE = (
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+)
+
+# SummaryInformation 属性 → docProps/core.xml 元素
+CORE_PROPERTY_ELEMENTS = [
+    ("title", "dc:title"),
+    ("subject", "dc:subject"),
+    ("author", "dc:creator"),
+    ("keywords", "cp:keywords"),
+    ("comments", "dc:description"),
+    ("last_author", "cp:lastModifiedBy"),
+]
+
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def xml_text(text):
+    """转义 XML 特殊字符并去掉 XML 不允许的控制字符"""
+    return _INVALID_XML_CHARS.sub("", escape(text))
+
+
+def core_properties_xml(properties):
+    """原文件的标题、作者、创建/修改时间等写入 docProps/core.xml"""
+    elements = [
+        f"<{tag}>{xml_text(properties[key])}</{tag}>"
+        for key, tag in CORE_PROPERTY_ELEMENTS if key in properties
+    ]
+    for key, tag in (("created", "dcterms:created"), ("modified", "dcterms:modified")):
+        if key in properties:
+            stamp = properties[key].strftime("%Y-%m-%dT%H:%M:%SZ")
+            elements.append(f'<{tag} xsi:type="dcterms:W3CDTF">{stamp}</{tag}>')
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        + "".join(elements) + "</cp:coreProperties>"
+    )
@@ -0,0 +1,142 @@
+import os
+import re
+import struct
+import zipfile
+
+from doc_reader import DocFormatError, UnsupportedFeature, read_main_text
+from ole_reader import OleFile, OleFormatError, is_ole_file
+
+# 转换后、处理原文件之前校验目标文件：能读出 ZIP 中央目录，包含 [Content_Types].xml 和主文档部件，
+# 并与源文件比较基本数量（工作表数；Word 文档正文有文字时 DOCX 中也要有文字）
+
+# 同时运行的校验线程数（只读文件，不占用 Office 进程）
+DEFAULT_VERIFY_WORKERS = 2
+
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+MAIN_CONTENT_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml",
+}
+
+BIFF_BOUNDSHEET = 0x0085
+BIFF_EOF = 0x000A
+# BoundSheet8.dt：工作表和图表工作表会出现在 XLSX 中，宏表和 VB 模块不一定
+SHEET_TYPES_KEPT = (0x00, 0x02)
+# 只扫描工作簿全局子流开头，BoundSheet 记录都在这里
+BIFF_GLOBALS_SCAN_SIZE = 1024 * 1024
+
+SCAN_CHUNK_SIZE = 64 * 1024
+
+_RELATIONSHIP = re.compile(rb"<Relationship\b[^>]*>")
+_ATTRIBUTE = re.compile(rb'(\w+)="([^"]*)"')
+_SHEET = re.compile(rb"<(?:\w+:)?sheet\b")
+# 段落、单元格、分节标记，图片、图形和域标记之外的字符
+_VISIBLE_TEXT = re.compile("[^\\s\x01\x07\x08\x13\x14\x15]")
+
+
+def verify_output(source_path, target_path):
+    """校验转换结果，返回问题描述；校验通过时返回 None"""
+    try:
+        with zipfile.ZipFile(target_path) as package:
+            return _verify_package(package, source_path, target_path)
+    except zipfile.BadZipFile as e:
+        return f"不是有效的 ZIP 包（{e}）"
+    except OSError as e:
+        return f"无法读取转换结果（{e}）"
+
+
+def _verify_package(package, source_path, target_path):
+    file_size = os.path.getsize(target_path)
+    names = set()
+    for info in package.infolist():
+        # 中央目录中的每个条目都必须落在文件范围内
+        if info.header_offset + info.compress_size > file_size:
+            return f"部件 {info.filename} 超出文件末尾"
+        names.add(info.filename)
+    if "[Content_Types].xml" not in names:
+        return "缺少 [Content_Types].xml"
+    main_part = _main_part(package, names)
+    if main_part is None:
+        return "缺少主文档部件"
+    expected_type = MAIN_CONTENT_TYPES.get(os.path.splitext(target_path)[1].lower())
+    if expected_type and expected_type.encode("ascii") not in package.read("[Content_Types].xml"):
+        return "主文档部件的类型与扩展名不符"
+    if main_part.endswith("workbook.xml"):
+        return _compare_sheets(package, main_part, source_path)
+    if main_part.endswith("document.xml"):
+        return _compare_text(package, main_part, source_path)
+    return None
+
+
+def _main_part(package, names):
+    """按 _rels/.rels 中 officeDocument 关系找到主文档部件"""
+    if "_rels/.rels" not in names:
+        return None
+    for match in _RELATIONSHIP.finditer(package.read("_rels/.rels")):
+        attributes = dict(_ATTRIBUTE.findall(match.group()))
+        if attributes.get(b"Type", b"").decode("utf-8", "replace") == OFFICE_DOCUMENT_REL:
+            part = attributes.get(b"Target", b"").decode("utf-8", "replace").lstrip("/")
+            return part if part in names else None
+    return None
+
+
+def _is_ole_source(source_path):
+    """只比较 OLE2 格式的源文件，其余格式（RTF、HTML、被改名的 OOXML）不比较数量"""
+    with open(source_path, "rb") as f:
+        return is_ole_file(f.read(8))
+
+
+def _compare_sheets(package, main_part, source_path):
+    try:
+        if not _is_ole_source(source_path):
+            return None
+        with OleFile(source_path) as ole:
+            stream_name = "Workbook" if ole.exists("Workbook") else "Book" if ole.exists("Book") else None
+            if stream_name is None:
+                return None
+            expected = _count_bound_sheets(ole.read_stream(stream_name, BIFF_GLOBALS_SCAN_SIZE))
+    except (OSError, OleFormatError, struct.error):
+        return None
+    actual = len(_SHEET.findall(package.read(main_part)))
+    if actual < expected:
+        return f"工作表数量不符（原文件 {expected} 个，转换结果 {actual} 个）"
+    return None
+
+
+def _count_bound_sheets(stream):
+    count = 0
+    offset = 0
+    while offset + 4 <= len(stream):
+        record_type, length = struct.unpack_from("<HH", stream, offset)
+        if record_type == BIFF_EOF:
+            break
+        if record_type == BIFF_BOUNDSHEET and length >= 6 and stream[offset + 4 + 5] in SHEET_TYPES_KEPT:
+            count += 1
+        offset += 4 + length
+    return count
+
+
+def _compare_text(package, main_part, source_path):
+    try:
+        if not _is_ole_source(source_path):
+            return None
+        text = read_main_text(source_path)
+    except (OSError, OleFormatError, DocFormatError, UnsupportedFeature, struct.error, IndexError):
+        return None
+    # 只有空段落、表格标记、图片等时正文可以没有文字
+    if not _VISIBLE_TEXT.search(text) or _contains(package, main_part, (b"<w:t>", b"<w:t ", b"<w:instrText")):
+        return None
+    return "原文件有正文文字，转换结果中没有文字"
+
+
+def _contains(package, part, needles):
+    """分块扫描部件，找到任意一个标记即停止"""
+    overlap = max(len(needle) for needle in needles) - 1
+    tail = b""
+    with package.open(part) as f:
+        for chunk in iter(lambda: f.read(SCAN_CHUNK_SIZE), b""):
+            data = tail + chunk
+            if any(needle in data for needle in needles):
+                return True
+            tail = data[-overlap:]
+    return False
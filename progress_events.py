@@ -0,0 +1,111 @@
+import queue
+from collections import namedtuple
+from threading import Lock
+
+# 进度事件：转换线程只发送简短的元组，计数和显示文本在界面线程中汇总生成
+EVENT_DISCOVERED = "discovered"      # (类型, 已发现的文件数)
+EVENT_BASELINE = "baseline"          # (类型, 已转换, 已跳过, 错误)：上次中断前的累计统计
+EVENT_STARTED = "started"            # (类型, 源文件)：已提交转换
+EVENT_CONVERTED = "converted"        # (类型, 源文件, 耗时秒数)
+EVENT_SKIPPED = "skipped"            # (类型, 源文件, 耗时秒数)
+EVENT_ERROR = "error"                # (类型, 源文件, 耗时秒数)
+EVENT_ALREADY_DONE = "already_done"  # (类型, 源文件)：上次运行中已处理，统计已计入 EVENT_BASELINE
+EVENT_RUN_FINISHED = "run_finished"  # (类型, 是否完整结束, 附加统计 dict)
+
+FILE_FINISHED_EVENTS = (EVENT_CONVERTED, EVENT_SKIPPED, EVENT_ERROR)
+
+ProgressSnapshot = namedtuple(
+    "ProgressSnapshot",
+    ["total", "processed", "converted", "skipped", "errors", "in_progress", "converted_this_run", "convert_seconds"],
+)
+
+
+class ProgressEventBus:
+    """转换线程到界面线程的单一事件流，取代分别轮询的日志、进度和统计文本队列"""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def emit(self, *event):
+        self._queue.put(event)
+
+    def drain(self):
+        events = []
+        try:
+            while True:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+
+class ProgressTracker:
+    """按事件累计的转换统计
+
+    计数的修改和读取都在锁内进行，多个线程同时调用 apply() 时计数仍然准确；
+    snapshot() 返回同一时刻的一组计数，不会读到更新了一半的统计。
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.processed = 0
+        self.converted = 0
+        self.skipped = 0
+        self.errors = 0
+        self.converted_this_run = 0
+        self.convert_seconds = 0.0
+        self._started = set()
+
+    @property
+    def percent(self):
+        snapshot = self.snapshot()
+        return snapshot.processed / snapshot.total * 100 if snapshot.total else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return ProgressSnapshot(self.total, self.processed, self.converted, self.skipped, self.errors,
+                                    len(self._started), self.converted_this_run, self.convert_seconds)
+
+    def apply(self, event):
+        with self._lock:
+            self._apply(event)
+
+    def _apply(self, event):
+        kind = event[0]
+        if kind in FILE_FINISHED_EVENTS:
+            self.processed += 1
+            self._started.discard(event[1])
+            if kind == EVENT_CONVERTED:
+                self.converted += 1
+                self.converted_this_run += 1
+                self.convert_seconds += event[2]
+            elif kind == EVENT_SKIPPED:
+                self.skipped += 1
+            else:
+                self.errors += 1
+        elif kind == EVENT_STARTED:
+            self._started.add(event[1])
+        elif kind == EVENT_DISCOVERED:
+            self.total = event[1]
+        elif kind == EVENT_ALREADY_DONE:
+            self.processed += 1
+        elif kind == EVENT_BASELINE:
+            self.converted += event[1]
+            self.skipped += event[2]
+            self.errors += event[3]
+
+    def stats_text(self):
+        stats = self.snapshot()
+        text = (f"📈 可转换文件: {stats.total} | 🔄 进度: {stats.processed}/{stats.total} | "
+                f"✅ 已转换: {stats.converted} | ⏭️ 跳过: {stats.skipped} | ❌ 错误: {stats.errors}")
+        if stats.converted_this_run:
+            text += f" | ⏱️ 平均 {stats.convert_seconds / stats.converted_this_run:.1f} 秒/文件"
+        return text
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def local_app_data(tmp_path, monkeypatch):
+    """转换清单、断点续传日志和缓存的默认目录放在临时目录中"""
+    path = tmp_path / "LocalAppData"
+    path.mkdir()
+    monkeypatch.setenv("LOCALAPPDATA", str(path))
+    return path
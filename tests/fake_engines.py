@@ -0,0 +1,48 @@
+import time
+import zipfile
+
+from office_engines import ConversionEngine
+
+# 源文件内容决定假引擎的行为
+CONTENT_HANG = b"hang"
+CONTENT_FAIL = b"fail"
+CONTENT_SLOW = b"slow"
+
+SLOW_SECONDS = 0.3
+
+
+def write_package(path):
+    """写入只有 [Content_Types].xml 的最小 ZIP 包，能通过 atomic_output.commit 的检查"""
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("[Content_Types].xml", "<Types/>")
+
+
+class FakeEngine(ConversionEngine):
+    """不依赖 Office 的假引擎
+
+    内容为 CONTENT_HANG 的文件一直不返回，为 CONTENT_SLOW 的文件转换 SLOW_SECONDS 秒，
+    为 CONTENT_FAIL 的文件抛出异常，其余文件立即写出转换结果。
+    """
+
+    name = "fake"
+
+    def convert(self, source_path, target_path):
+        with open(source_path, "rb") as f:
+            content = f.read()
+        if content == CONTENT_HANG:
+            time.sleep(3600)
+        if content == CONTENT_SLOW:
+            time.sleep(SLOW_SECONDS)
+        if content == CONTENT_FAIL:
+            raise RuntimeError("转换失败")
+        write_package(target_path)
+
+
+class BrokenVersionEngine(FakeEngine):
+    """查询引擎版本时出错：调度器在主进程中计算缓存键时抛出异常，不属于单个文件的转换失败"""
+
+    name = "broken"
+
+    @classmethod
+    def engine_version(cls):
+        raise RuntimeError("无法读取引擎版本")
@@ -0,0 +1,157 @@
+import struct
+
+from ole_reader import END_OF_CHAIN, ENTRY_ROOT, ENTRY_STREAM, FREE_SECTOR, HEADER_DIFAT_COUNT, OLE_SIGNATURE
+
+SECTOR_SIZE = 512
+MINI_SECTOR_SIZE = 64
+MINI_STREAM_CUTOFF = 4096
+ENTRIES_PER_SECTOR = SECTOR_SIZE // 4
+
+FAT_SECTOR = 0xFFFFFFFD
+DIFAT_SECTOR = 0xFFFFFFFC
+NO_STREAM = 0xFFFFFFFF
+
+
+class OleLayout:
+    """build_ole 写出的文件结构：各流占用的扇区链和 FAT 所在扇区，供测试改写分配表"""
+
+    def __init__(self, path, chains, mini_chains, fat_sectors, minifat_sectors):
+        self.path = path
+        self.chains = chains
+        self.mini_chains = mini_chains
+        self.fat_sectors = fat_sectors
+        self.minifat_sectors = minifat_sectors
+
+    def set_fat_entry(self, sector, value):
+        index, slot = divmod(sector, ENTRIES_PER_SECTOR)
+        self._patch((self.fat_sectors[index] + 1) * SECTOR_SIZE + slot * 4, value)
+
+    def set_minifat_entry(self, sector, value):
+        index, slot = divmod(sector, ENTRIES_PER_SECTOR)
+        self._patch((self.minifat_sectors[index] + 1) * SECTOR_SIZE + slot * 4, value)
+
+    def _patch(self, offset, value):
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            f.write(struct.pack("<I", value))
+
+
+def _sectors(data, size):
+    return [data[i:i + size].ljust(size, b"\x00") for i in range(0, len(data), size)]
+
+
+def _reversed(sectors):
+    return sectors[::-1]
+
+
+def _directory_entry(name, entry_type, start, size, right=NO_STREAM, child=NO_STREAM):
+    encoded = (name + "\x00").encode("utf-16-le")
+    entry = bytearray(128)
+    entry[:len(encoded)] = encoded
+    struct.pack_into("<HBB", entry, 64, len(encoded), entry_type, 1)
+    struct.pack_into("<III", entry, 68, NO_STREAM, right, child)
+    struct.pack_into("<IQ", entry, 116, start, size)
+    return bytes(entry)
+
+
+def build_ole(path, streams, scatter=False, data_start=0):
+    """写出版本 3（512 字节扇区）的 OLE2 复合文档
+
+    streams 为 [(流名称, 内容)]，小于 4096 字节的流放在 MiniStream 中。
+    scatter 为 True 时普通流的扇区倒序存放（扇区不连续）；
+    data_start 让普通流从指定扇区号开始存放，用来生成 FAT 超过 109 个扇区、需要 DIFAT 扇区的文件。
+    """
+    mini_data = bytearray()
+    mini_chains = {}
+    minifat = []
+    for name, data in streams:
+        if len(data) < MINI_STREAM_CUTOFF:
+            first = len(mini_data) // MINI_SECTOR_SIZE
+            count = len(_sectors(data, MINI_SECTOR_SIZE))
+            mini_chains[name] = list(range(first, first + count))
+            if count:
+                minifat.extend(list(range(first + 1, first + count)) + [END_OF_CHAIN])
+            mini_data += b"".join(_sectors(data, MINI_SECTOR_SIZE))
+
+    entries = [_directory_entry("Root Entry", ENTRY_ROOT, END_OF_CHAIN, len(mini_data),
+                                child=1 if streams else NO_STREAM)]
+    for index, (name, data) in enumerate(streams, start=1):
+        entries.append(_directory_entry(name, ENTRY_STREAM, 0, len(data),
+                                        right=index + 1 if index < len(streams) else NO_STREAM))
+
+    contents = {}
+    fat = {}
+    next_free = 0
+
+    def allocate(blocks, order=None):
+        nonlocal next_free
+        sectors = list(range(next_free, next_free + len(blocks)))
+        next_free += len(blocks)
+        if order is not None:
+            sectors = order(sectors)
+        for sector, block in zip(sectors, blocks):
+            contents[sector] = block
+        for sector, following in zip(sectors, sectors[1:] + [END_OF_CHAIN]):
+            fat[sector] = following
+        return sectors
+
+    directory_blocks = _sectors(b"".join(entries), SECTOR_SIZE)
+    directory_chain = allocate(directory_blocks)
+    minifat_chain = allocate(_sectors(b"".join(struct.pack("<I", value) for value in minifat), SECTOR_SIZE))
+    mini_stream_chain = allocate(_sectors(bytes(mini_data), SECTOR_SIZE))
+    next_free = max(next_free, data_start)
+    chains = {}
+    for name, data in streams:
+        if len(data) >= MINI_STREAM_CUTOFF:
+            chains[name] = allocate(_sectors(data, SECTOR_SIZE), _reversed if scatter else None)
+
+    # 回填目录项中的起始扇区
+    directory = bytearray(b"".join(contents[sector] for sector in directory_chain))
+    if mini_stream_chain:
+        struct.pack_into("<I", directory, 116, mini_stream_chain[0])
+    for index, (name, data) in enumerate(streams, start=1):
+        start = chains[name][0] if name in chains else mini_chains[name][0] if mini_chains[name] else END_OF_CHAIN
+        struct.pack_into("<I", directory, index * 128 + 116, start)
+    for sector, block in zip(directory_chain, _sectors(bytes(directory), SECTOR_SIZE)):
+        contents[sector] = block
+
+    # FAT 和 DIFAT 放在文件末尾，数量要能覆盖包括它们自己在内的所有扇区
+    fat_count = 1
+    while True:
+        difat_count = -(-max(0, fat_count - HEADER_DIFAT_COUNT) // (ENTRIES_PER_SECTOR - 1))
+        if next_free + fat_count + difat_count <= fat_count * ENTRIES_PER_SECTOR:
+            break
+        fat_count += 1
+    fat_sectors = list(range(next_free, next_free + fat_count))
+    difat_sectors = list(range(next_free + fat_count, next_free + fat_count + difat_count))
+    for sector in fat_sectors:
+        fat[sector] = FAT_SECTOR
+    for sector in difat_sectors:
+        fat[sector] = DIFAT_SECTOR
+    fat_table = [fat.get(sector, FREE_SECTOR) for sector in range(fat_count * ENTRIES_PER_SECTOR)]
+    for sector, block in zip(fat_sectors, _sectors(struct.pack(f"<{len(fat_table)}I", *fat_table), SECTOR_SIZE)):
+        contents[sector] = block
+    overflow = fat_sectors[HEADER_DIFAT_COUNT:]
+    for position, sector in enumerate(difat_sectors):
+        values = overflow[position * (ENTRIES_PER_SECTOR - 1):(position + 1) * (ENTRIES_PER_SECTOR - 1)]
+        values += [FREE_SECTOR] * (ENTRIES_PER_SECTOR - 1 - len(values))
+        following = difat_sectors[position + 1] if position + 1 < len(difat_sectors) else END_OF_CHAIN
+        contents[sector] = struct.pack(f"<{ENTRIES_PER_SECTOR}I", *values, following)
+
+    header = bytearray(SECTOR_SIZE)
+    header[:8] = OLE_SIGNATURE
+    struct.pack_into("<HHHHH", header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<IIIIIIII", header, 0x2C, fat_count, directory_chain[0], 0, MINI_STREAM_CUTOFF,
+                     minifat_chain[0] if minifat_chain else END_OF_CHAIN, len(minifat_chain),
+                     difat_sectors[0] if difat_sectors else END_OF_CHAIN, difat_count)
+    header_difat = fat_sectors[:HEADER_DIFAT_COUNT]
+    header_difat += [FREE_SECTOR] * (HEADER_DIFAT_COUNT - len(header_difat))
+    struct.pack_into(f"<{HEADER_DIFAT_COUNT}I", header, 0x4C, *header_difat)
+
+    total = next_free + fat_count + difat_count
+    empty = b"\x00" * SECTOR_SIZE
+    with open(path, "wb") as f:
+        f.write(header)
+        for sector in range(total):
+            f.write(contents.get(sector, empty))
+    return OleLayout(str(path), chains, mini_chains, fat_sectors, minifat_chain)
@@ -0,0 +1,57 @@
+import os
+import shutil
+
+import conversion_cache
+from conversion_cache import ConversionCache
+from conversion_pool import STATUS_CONVERTED
+from conversion_scheduler import ConversionScheduler
+from fake_engines import FakeEngine, write_package
+
+KEY = "ab" + "0" * 62
+
+
+def _unreachable_cache(tmp_path):
+    """创建缓存后把缓存文件夹换成同名文件，模拟共享文件夹断开"""
+    directory = tmp_path / "cache"
+    cache = ConversionCache(str(directory))
+    shutil.rmtree(directory)
+    directory.write_bytes(b"")
+    return cache
+
+
+def test_store_returns_false_when_cache_root_is_unreachable(tmp_path):
+    output = tmp_path / "a.docx"
+    write_package(str(output))
+    cache = _unreachable_cache(tmp_path)
+    assert cache.store(KEY, str(output)) is False
+    assert cache.stores == 0
+    assert cache.total_bytes == 0
+
+
+def test_store_returns_false_when_entry_is_evicted_concurrently(tmp_path, monkeypatch):
+    output = tmp_path / "a.docx"
+    write_package(str(output))
+    cache = ConversionCache(str(tmp_path / "cache"))
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(conversion_cache.os.path, "getsize", evicted)
+    assert cache.store(KEY, str(output)) is False
+    assert cache.total_bytes == 0
+
+
+def test_conversion_succeeds_with_unreachable_cache(tmp_path):
+    source = tmp_path / "a.doc"
+    source.write_bytes(b"content")
+    scheduler = ConversionScheduler(cache=_unreachable_cache(tmp_path))
+    scheduler.add_route(".doc", ".docx", FakeEngine, workers=1)
+    scheduler.start()
+    try:
+        scheduler.submit(str(source))
+        scheduler.close()
+        results = list(scheduler.results())
+    finally:
+        scheduler.shutdown()
+    assert [result.status for result in results] == [STATUS_CONVERTED]
+    assert os.path.exists(str(tmp_path / "a.docx"))
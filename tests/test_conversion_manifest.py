@@ -0,0 +1,117 @@
+import os
+import sqlite3
+
+import conversion_manifest
+from conversion_journal import ConversionJournal, default_journal_path
+from conversion_manifest import ConversionManifest, OUTCOME_CONVERTED, default_manifest_path
+from file_discovery import DiscoveryStats, build_extension_map, iter_work_items
+
+
+def _scan(source, manifest):
+    stats = DiscoveryStats()
+    items = list(iter_work_items(str(source), build_extension_map(), stats=stats, manifest=manifest))
+    return items, stats
+
+
+def test_state_files_are_kept_outside_the_source_tree(tmp_path, local_app_data):
+    source = tmp_path / "src"
+    source.mkdir()
+    for path in (default_manifest_path(str(source)), default_journal_path(str(source))):
+        assert str(local_app_data) in path
+        assert not os.path.abspath(path).startswith(str(source) + os.sep)
+
+
+def test_record_uses_known_content_hash(tmp_path, monkeypatch):
+    source = tmp_path / "a.doc"
+    source.write_bytes(b"doc")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("源文件不应再次计算哈希")
+
+    monkeypatch.setattr(conversion_manifest, "hash_file", fail)
+    with ConversionManifest(str(tmp_path / "manifest.db")) as manifest:
+        manifest.record(str(source), str(tmp_path / "a.docx"), OUTCOME_CONVERTED, "0" * 64)
+        row = manifest._conn.execute("SELECT content_hash FROM files").fetchone()
+    assert row[0] == "0" * 64
+
+
+def test_unchanged_root_is_not_rescanned(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "a.doc").write_bytes(b"a")
+    (source / "sub" / "b.xls").write_bytes(b"b")
+
+    # 第一次运行：与 office_converter 相同的顺序打开清单和断点续传日志
+    journal = ConversionJournal(default_journal_path(str(source)))
+    journal.start_run()
+    with ConversionManifest(default_manifest_path(str(source))) as manifest:
+        items, stats = _scan(source, manifest)
+        assert len(items) == 2
+        for item in items:
+            journal.record_done(item.path, item.path + "x", OUTCOME_CONVERTED)
+            manifest.record(item.path, item.path + "x", OUTCOME_CONVERTED)
+        manifest.finalize_directories()
+    journal.finish()
+
+    with ConversionManifest(default_manifest_path(str(source))) as manifest:
+        items, stats = _scan(source, manifest)
+    assert items == []
+    assert stats.dirs_scanned == 0
+    assert stats.dirs_unchanged == 2
+
+
+def test_toggling_file_types_rescans_unchanged_directories(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.doc").write_bytes(b"a")
+    (source / "b.xls").write_bytes(b"b")
+    manifest_path = str(tmp_path / "manifest.db")
+
+    # 第一次只转换 Word 文档
+    with ConversionManifest(manifest_path) as manifest:
+        items = list(iter_work_items(str(source), build_extension_map(convert_xls=False), manifest=manifest))
+        assert [os.path.basename(item.path) for item in items] == ["a.doc"]
+        for item in items:
+            manifest.record(item.path, item.path + "x", OUTCOME_CONVERTED)
+        manifest.finalize_directories()
+
+    # 再勾选 Excel：目录修改时间未变，但仍需重新枚举，并且只产出新类型的文件
+    with ConversionManifest(manifest_path) as manifest:
+        stats = DiscoveryStats()
+        items = list(iter_work_items(str(source), build_extension_map(), stats=stats, manifest=manifest))
+    assert [os.path.basename(item.path) for item in items] == ["b.xls"]
+    assert stats.dirs_scanned == 1
+    assert stats.dirs_unchanged == 0
+
+
+def test_changing_exclude_patterns_rescans_unchanged_directories(tmp_path):
+    source = tmp_path / "src"
+    (source / "skip").mkdir(parents=True)
+    (source / "skip" / "a.doc").write_bytes(b"a")
+    manifest_path = str(tmp_path / "manifest.db")
+
+    with ConversionManifest(manifest_path) as manifest:
+        assert list(iter_work_items(str(source), build_extension_map(), exclude_patterns=["skip"],
+                                    manifest=manifest)) == []
+        manifest.finalize_directories()
+
+    with ConversionManifest(manifest_path) as manifest:
+        items = list(iter_work_items(str(source), build_extension_map(), exclude_patterns=[], manifest=manifest))
+    assert [os.path.basename(item.path) for item in items] == ["a.doc"]
+
+
+def test_directories_from_an_old_manifest_are_rescanned(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.doc").write_bytes(b"a")
+    manifest_path = str(tmp_path / "manifest.db")
+    conn = sqlite3.connect(manifest_path)
+    conn.execute("CREATE TABLE directories (path TEXT PRIMARY KEY, mtime REAL NOT NULL, subdirs TEXT NOT NULL)")
+    conn.execute("INSERT INTO directories VALUES (?, ?, ?)",
+                 (os.path.normcase(os.path.abspath(str(source))), os.stat(str(source)).st_mtime, "[]"))
+    conn.commit()
+    conn.close()
+
+    with ConversionManifest(manifest_path) as manifest:
+        items = list(iter_work_items(str(source), build_extension_map(), manifest=manifest))
+    assert [os.path.basename(item.path) for item in items] == ["a.doc"]
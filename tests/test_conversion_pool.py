@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+
+from conversion_pool import ConversionPool, STATUS_CANCELLED, STATUS_CONVERTED, STATUS_TIMEOUT
+from fake_engines import CONTENT_HANG, CONTENT_SLOW, FakeEngine
+
+TIMEOUT = 1
+
+
+def _source(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path), str(path) + "x"
+
+
+def test_hanging_file_times_out_and_worker_is_replaced(tmp_path):
+    hang_source, hang_target = _source(tmp_path, "hang.doc", CONTENT_HANG)
+    next_source, next_target = _source(tmp_path, "next.doc", b"next")
+    with ConversionPool(FakeEngine, workers=1, timeout=TIMEOUT) as pool:
+        hung_process = pool._processes[0]
+        pool.submit(hang_source, hang_target)
+        pool.submit(next_source, next_target)
+        pool.close()
+        results = {result.source_path: result for result in pool.results()}
+        replacement = pool._processes[0]
+
+        assert results[hang_source].status == STATUS_TIMEOUT
+        assert results[hang_source].elapsed >= TIMEOUT
+        assert pool.timeouts == 1
+        assert not hung_process.is_alive()
+        assert replacement is not hung_process
+        assert results[next_source].status == STATUS_CONVERTED
+        assert results[next_source].worker_id == 0
+    assert os.path.exists(next_target)
+    assert os.path.exists(hang_source)
+    assert not os.path.exists(hang_target)
+
+
+def test_result_already_queued_is_not_timed_out(tmp_path):
+    source, target = _source(tmp_path, "slow.doc", CONTENT_SLOW)
+    with ConversionPool(FakeEngine, workers=1, timeout=TIMEOUT) as pool:
+        pool.submit(source, target)
+        pool.close()
+        # 调用方很久之后才读取结果：结果早已在队列中，不能因为 "started" 时间过早判为超时
+        time.sleep(TIMEOUT * 3)
+        results = list(pool.results())
+    assert [result.status for result in results] == [STATUS_CONVERTED]
+    assert pool.timeouts == 0
+    assert os.path.exists(target)
+
+
+def test_messages_from_a_replaced_worker_are_dropped(tmp_path):
+    pool = ConversionPool(FakeEngine, workers=1, timeout=TIMEOUT)
+    pool._incarnations[0] = 1
+    pool._pending[7] = ("a.doc", "a.docx")
+    # 代数 0 的进程已被结束，它迟到的 "started" 不能把文件记到当前进程名下
+    assert pool._handle_message(("started", 0, 0, 7, time.time(), TIMEOUT)) is None
+    assert pool._running == {}
+    pool._handle_message(("started", 0, 1, 7, time.time(), TIMEOUT))
+    assert pool._running[0][0] == 7
+
+
+def test_every_submission_returns_a_result_with_recycling(tmp_path):
+    sources = [_source(tmp_path, f"{i}.doc", f"file {i}".encode()) for i in range(12)]
+    with ConversionPool(FakeEngine, workers=2, recycle_after=2) as pool:
+        seqs = [pool.submit(source, target) for source, target in sources]
+        pool.close()
+        results = list(pool.results())
+    assert sorted(result.seq for result in results) == seqs
+    assert {result.status for result in results} == {STATUS_CONVERTED}
+    assert pool.recycle_events
+    assert all(event.files == 2 for event in pool.recycle_events)
+    for _, target in sources:
+        assert os.path.exists(target)
+
+
+def test_ordered_results_follow_submission_order(tmp_path):
+    # 第一个文件最慢，按完成顺序它会最后返回
+    sources = [_source(tmp_path, "0.doc", CONTENT_SLOW)]
+    sources += [_source(tmp_path, f"{i}.doc", f"file {i}".encode()) for i in range(1, 6)]
+    with ConversionPool(FakeEngine, workers=3) as pool:
+        for source, target in sources:
+            pool.submit(source, target)
+        pool.close()
+        results = list(pool.results(ordered=True))
+    assert [result.source_path for result in results] == [source for source, _ in sources]
+
+
+def test_close_after_cancel(tmp_path):
+    sources = [_source(tmp_path, "0.doc", CONTENT_SLOW)]
+    sources += [_source(tmp_path, f"{i}.doc", f"file {i}".encode()) for i in range(1, 8)]
+    pool = ConversionPool(FakeEngine, workers=1)
+    pool.start()
+    try:
+        for source, target in sources:
+            pool.submit(source, target)
+        pool.cancel()
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.submit(*sources[0])
+        results = list(pool.results())
+    finally:
+        started = time.monotonic()
+        pool.shutdown()
+    assert time.monotonic() - started < 5
+    assert len(results) == len(sources)
+    assert STATUS_CANCELLED in {result.status for result in results}
+    assert {result.status for result in results} <= {STATUS_CONVERTED, STATUS_CANCELLED}
+    assert pool.pending_count == 0
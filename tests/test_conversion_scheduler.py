@@ -0,0 +1,69 @@
+import hashlib
+import os
+import threading
+import time
+
+import conversion_scheduler
+from conversion_pool import STATUS_CONVERTED, STATUS_ERROR
+from conversion_scheduler import ConversionScheduler
+from fake_engines import FakeEngine
+
+
+def test_results_carry_the_content_hash(tmp_path):
+    sources = []
+    for name, content in (("a.doc", b"same"), ("b.doc", b"same"), ("c.doc", b"other")):
+        path = tmp_path / name
+        path.write_bytes(content)
+        sources.append((str(path), hashlib.sha256(content).hexdigest()))
+
+    scheduler = ConversionScheduler(dedupe=True)
+    scheduler.add_route(".doc", ".docx", FakeEngine, workers=1)
+    scheduler.start()
+    try:
+        for path, _ in sources:
+            scheduler.submit(path)
+        scheduler.close()
+        results = {result.source_path: result for result in scheduler.results()}
+    finally:
+        scheduler.shutdown()
+
+    for path, digest in sources:
+        assert results[path].status == STATUS_CONVERTED
+        assert results[path].content_hash == digest
+
+
+def test_pools_stay_open_while_outputs_are_being_verified(tmp_path, monkeypatch):
+    # 两个内容相同的文件：第一个的转换结果校验失败后，等待中的重复文件要重新交给转换池
+    for name in ("a.doc", "b.doc"):
+        (tmp_path / name).write_bytes(b"same")
+    release = threading.Event()
+
+    def verify(source_path, target_path):
+        release.wait(10)
+        return "校验失败" if source_path.endswith("a.doc") else None
+
+    monkeypatch.setattr(conversion_scheduler, "verify_output", verify)
+    scheduler = ConversionScheduler(dedupe=True, verify=True)
+    pool = scheduler.add_route(".doc", ".docx", FakeEngine, workers=1)
+    scheduler.start()
+    try:
+        scheduler.submit(str(tmp_path / "a.doc"))
+        scheduler.submit(str(tmp_path / "b.doc"))
+        scheduler.close()
+        results = []
+        deadline = time.monotonic() + 10
+        while not scheduler._verifying and time.monotonic() < deadline:
+            results.extend(scheduler.results(wait=False))
+            time.sleep(0.05)
+        assert scheduler._verifying
+        assert not pool._closed
+        release.set()
+        results.extend(scheduler.results())
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+    statuses = {os.path.basename(result.source_path): result.status for result in results}
+    assert statuses == {"a.doc": STATUS_ERROR, "b.doc": STATUS_CONVERTED}
+    assert pool._closed
+    assert scheduler.verify_failures == 1
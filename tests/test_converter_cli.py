@@ -0,0 +1,29 @@
+import io
+import json
+import os
+
+import converter_cli
+from file_discovery import ARCHIVE_FOLDER_NAME, QUARANTINE_FOLDER_NAME
+
+
+def _dry_run(argv):
+    parser = converter_cli.build_parser()
+    stdout = io.StringIO()
+    assert converter_cli.dry_run(parser.parse_args(argv + ["--dry-run"]), stdout) == 0
+    records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    return sorted(os.path.relpath(record["source"]) for record in records if record["type"] == "file")
+
+
+def test_user_excludes_keep_converter_folders_excluded(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    for folder in (ARCHIVE_FOLDER_NAME, QUARANTINE_FOLDER_NAME, "归档", "skip", "keep"):
+        (source / folder).mkdir(parents=True)
+        (source / folder / "a.doc").write_bytes(b"a")
+    monkeypatch.chdir(source)
+
+    # 用户规则替换了默认规则，默认归档文件夹和隔离文件夹仍不转换
+    assert _dry_run([str(source), "--exclude", "skip"]) == [os.path.join("keep", "a.doc"),
+                                                           os.path.join("归档", "a.doc")]
+    # 相对路径的归档文件夹与实际转换一样按绝对路径排除，此时默认归档文件夹只是普通文件夹
+    assert _dry_run([str(source), "--exclude", "skip", "--archive-dir", "归档"]) == [
+        os.path.join("keep", "a.doc"), os.path.join(ARCHIVE_FOLDER_NAME, "a.doc")]
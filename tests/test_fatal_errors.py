@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import converter_cli
+import office_converter
+import office_engines
+from fake_engines import BrokenVersionEngine
+
+
+@pytest.fixture
+def broken_doc_engine(monkeypatch):
+    monkeypatch.setitem(office_engines.DOC_ENGINES, office_engines.DOC_ENGINE_OFFICE, BrokenVersionEngine)
+
+
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "src"
+    directory.mkdir()
+    (directory / "a.doc").write_bytes(b"a")
+    return directory
+
+
+def test_convert_office_files_reraises_fatal_errors(tmp_path, source, broken_doc_engine):
+    with pytest.raises(RuntimeError, match="无法读取引擎版本"):
+        office_converter.convert_office_files(
+            str(source), None, convert_xls=False, word_workers=1, cache_dir=str(tmp_path / "cache"),
+            originals=office_converter.ORIGINALS_KEEP)
+    assert (source / "a.doc").exists()
+
+
+def test_cli_reports_aborted_run(tmp_path, source, broken_doc_engine, capsys):
+    code = converter_cli.main([str(source), "--types", "doc", "--originals", "keep", "--word-workers", "1",
+                               "--cache-dir", str(tmp_path / "cache"), "--stats-interval", "0"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert code == 1
+    assert records[-2]["type"] == "error"
+    assert records[-2]["source"] == str(source)
+    assert "无法读取引擎版本" in records[-2]["message"]
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["aborted"] == 1
@@ -0,0 +1,194 @@
+import hashlib
+import struct
+import zipfile
+
+import pytest
+
+from file_discovery import KIND_DOC, KIND_XLS
+from file_sniffer import (
+    BIFF_BOF,
+    BIFF_EOF,
+    BIFF_FILEPASS,
+    EXCEL_DEFAULT_PASSWORD,
+    FIB_ENCRYPTED,
+    FIB_IDENT,
+    FIB_OBFUSCATED,
+    SNIFF_EMPTY,
+    SNIFF_ENCRYPTED,
+    SNIFF_MISNAMED,
+    SNIFF_OLE,
+    SNIFF_OOXML,
+    SNIFF_TEXT,
+    SNIFF_UNKNOWN,
+    _rc4,
+    _xor_password_verifier,
+    sniff_file,
+)
+from ole_builder import build_ole
+
+SALT = bytes(range(16))
+VERIFIER = bytes(range(100, 116))
+
+
+def _fib(flags=0):
+    fib = bytearray(0x200)
+    struct.pack_into("<H", fib, 0, FIB_IDENT)
+    struct.pack_into("<H", fib, 0x0A, flags)
+    return bytes(fib)
+
+
+def _record(record_type, body=b""):
+    return struct.pack("<HH", record_type, len(body)) + body
+
+
+def _workbook(*records):
+    return _record(BIFF_BOF, struct.pack("<HH", 0x0600, 0x0005) + b"\x00" * 12) + b"".join(records) + _record(BIFF_EOF)
+
+
+def _xor_filepass(password):
+    return struct.pack("<HHH", 0, 0x1234, _xor_password_verifier(password))
+
+
+def _rc4_filepass(password):
+    # MS-OFFCRYPTO 2.3.6.2：由密码和盐派生第 0 块的 RC4 密钥，加密校验值及其 MD5
+    truncated = hashlib.md5(password.encode("utf-16-le")).digest()[:5]
+    intermediate = hashlib.md5((truncated + SALT) * 16).digest()[:5]
+    key = hashlib.md5(intermediate + struct.pack("<I", 0)).digest()
+    encrypted = _rc4(key, VERIFIER + hashlib.md5(VERIFIER).digest())
+    return struct.pack("<HHH", 1, 1, 1) + SALT + encrypted
+
+
+def _cryptoapi_filepass(password, key_bits):
+    # MS-OFFCRYPTO 2.3.5：EncryptionHeader 之后是 EncryptionVerifier
+    header = struct.pack("<IIIIIIII", 0x04, 0, 0x6801, 0x8004, key_bits, 1, 0, 0)
+    h0 = hashlib.sha1(SALT + password.encode("utf-16-le")).digest()
+    key = hashlib.sha1(h0 + struct.pack("<I", 0)).digest()[:key_bits // 8]
+    if len(key) == 5:
+        key += b"\x00" * 11
+    encrypted = _rc4(key, VERIFIER + hashlib.sha1(VERIFIER).digest())
+    verifier = struct.pack("<I", 16) + SALT + encrypted[:16] + struct.pack("<I", 20) + encrypted[16:]
+    return struct.pack("<HHHII", 1, 2, 2, 0x04, len(header)) + header + verifier
+
+
+def _write_ole(tmp_path, streams, name="file.bin"):
+    path = tmp_path / name
+    build_ole(path, streams)
+    return str(path)
+
+
+def test_xor_password_verifier_matches_the_known_vector():
+    # Excel 工作表保护使用同一算法："password" 的校验值为 0x83AF
+    assert _xor_password_verifier("password") == 0x83AF
+    assert _xor_password_verifier("test") == 0xCBEB
+
+
+def test_rc4_matches_the_known_vector():
+    assert _rc4(b"Key", b"Plaintext").hex() == "bbf316e8d940af0ad3"
+
+
+@pytest.mark.parametrize("flags, verdict, detail", [
+    (0, SNIFF_OLE, ""),
+    (FIB_ENCRYPTED, SNIFF_ENCRYPTED, "文档已加密"),
+    (FIB_ENCRYPTED | FIB_OBFUSCATED, SNIFF_ENCRYPTED, "文档已加密（XOR 混淆）"),
+])
+def test_word_fib_encryption_flags(tmp_path, flags, verdict, detail):
+    path = _write_ole(tmp_path, [("WordDocument", _fib(flags)), ("1Table", b"\x00" * 16)])
+    assert sniff_file(path, KIND_DOC) == (verdict, detail)
+
+
+def test_word_document_named_xls_is_misnamed(tmp_path):
+    path = _write_ole(tmp_path, [("WordDocument", _fib())])
+    assert sniff_file(path, KIND_XLS).verdict == SNIFF_MISNAMED
+
+
+def test_word_stream_without_fib_ident_is_left_to_office(tmp_path):
+    path = _write_ole(tmp_path, [("WordDocument", b"\x00" * 0x200)])
+    assert sniff_file(path, KIND_DOC).verdict == SNIFF_UNKNOWN
+
+
+def test_agile_encrypted_package_is_encrypted(tmp_path):
+    path = _write_ole(tmp_path, [("EncryptionInfo", b"\x04\x00\x04\x00"), ("EncryptedPackage", b"\x00" * 64)])
+    assert sniff_file(path, KIND_DOC).verdict == SNIFF_ENCRYPTED
+    assert sniff_file(path, KIND_XLS).verdict == SNIFF_ENCRYPTED
+
+
+@pytest.mark.parametrize("filepass, verdict", [
+    (_xor_filepass(EXCEL_DEFAULT_PASSWORD), SNIFF_OLE),
+    (_xor_filepass("secret"), SNIFF_ENCRYPTED),
+    (_rc4_filepass(EXCEL_DEFAULT_PASSWORD), SNIFF_OLE),
+    (_rc4_filepass("secret"), SNIFF_ENCRYPTED),
+    (_cryptoapi_filepass(EXCEL_DEFAULT_PASSWORD, 128), SNIFF_OLE),
+    (_cryptoapi_filepass(EXCEL_DEFAULT_PASSWORD, 40), SNIFF_OLE),
+    (_cryptoapi_filepass("secret", 128), SNIFF_ENCRYPTED),
+    (b"\x01\x00", SNIFF_ENCRYPTED),
+])
+def test_workbook_filepass(tmp_path, filepass, verdict):
+    path = _write_ole(tmp_path, [("Workbook", _workbook(_record(BIFF_FILEPASS, filepass)))])
+    assert sniff_file(path, KIND_XLS).verdict == verdict
+
+
+def test_plain_workbook_and_misnamed_workbook(tmp_path):
+    path = _write_ole(tmp_path, [("Workbook", _workbook(_record(0x0042, b"\xb0\x04")))])
+    assert sniff_file(path, KIND_XLS) == (SNIFF_OLE, "")
+    assert sniff_file(path, KIND_DOC).verdict == SNIFF_MISNAMED
+
+
+def test_workbook_not_starting_with_bof_is_left_to_office(tmp_path):
+    path = _write_ole(tmp_path, [("Workbook", _record(BIFF_EOF))])
+    assert sniff_file(path, KIND_XLS).verdict == SNIFF_UNKNOWN
+
+
+def test_ole_without_office_streams_is_misnamed(tmp_path):
+    path = _write_ole(tmp_path, [("Contents", b"data")])
+    assert sniff_file(path, KIND_DOC).verdict == SNIFF_MISNAMED
+
+
+def test_damaged_ole_is_left_to_office(tmp_path):
+    path = tmp_path / "damaged.doc"
+    layout = build_ole(path, [("WordDocument", _fib())])
+    # 目录扇区链指向自身
+    layout.set_fat_entry(0, 0)
+    assert sniff_file(str(path), KIND_DOC).verdict == SNIFF_UNKNOWN
+
+
+@pytest.mark.parametrize("kind, content_type, verdict", [
+    (KIND_DOC, "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml", SNIFF_OOXML),
+    (KIND_XLS, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml", SNIFF_OOXML),
+    (KIND_XLS, "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml", SNIFF_MISNAMED),
+    (KIND_DOC, "application/vnd.ms-word.document.macroEnabled.main+xml", SNIFF_UNKNOWN),
+])
+def test_zip_packages(tmp_path, kind, content_type, verdict):
+    path = tmp_path / "file.bin"
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("[Content_Types].xml", f'<Types><Override ContentType="{content_type}"/></Types>')
+    assert sniff_file(str(path), kind).verdict == verdict
+
+
+def test_zip_without_content_types_is_unknown(tmp_path):
+    path = tmp_path / "file.bin"
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("readme.txt", "hello")
+    assert sniff_file(str(path), KIND_DOC).verdict == SNIFF_UNKNOWN
+
+
+@pytest.mark.parametrize("content, detail", [
+    (b"{\\rtf1\\ansi hello}", "RTF"),
+    (b"\xef\xbb\xbf<html><body>x</body></html>", "HTML/XML"),
+    (b"<?xml version=\"1.0\"?><Workbook/>", "HTML/XML"),
+    (b"\xff\xfeh\x00i\x00", "Unicode 文本"),
+    ("姓名,年龄\n张三,30\n".encode("gbk"), "CSV/文本"),
+    (b"a\tb\n1\t2\n", "CSV/文本"),
+])
+def test_text_formats(tmp_path, content, detail):
+    path = tmp_path / "file.bin"
+    path.write_bytes(content)
+    assert sniff_file(str(path), KIND_XLS) == (SNIFF_TEXT, detail)
+
+
+def test_empty_and_unrecognised_files(tmp_path):
+    empty = tmp_path / "empty.doc"
+    empty.write_bytes(b"")
+    binary = tmp_path / "binary.doc"
+    binary.write_bytes(b"\x00\x01\x02garbage")
+    assert sniff_file(str(empty), KIND_DOC).verdict == SNIFF_EMPTY
+    assert sniff_file(str(binary), KIND_DOC).verdict == SNIFF_UNKNOWN
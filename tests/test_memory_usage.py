@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+import office_engines
+from conversion_pool import ConversionPool, STATUS_CONVERTED
+from office_engines import NativeXlsEngine, process_memory_usage
+
+
+def test_memory_is_measured_without_pywin32():
+    memory = process_memory_usage([os.getpid()])
+    assert memory is not None and memory > 0
+
+
+def test_memory_is_none_when_it_cannot_be_measured(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    monkeypatch.setattr(office_engines.os.path, "isdir", lambda path: False)
+    assert process_memory_usage([os.getpid()]) is None
+    assert process_memory_usage([]) == 0
+
+
+def test_native_engine_reports_peak_memory(tmp_path):
+    xlwt = pytest.importorskip("xlwt")
+    source = tmp_path / "book.xls"
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    for row in range(200):
+        sheet.write(row, 0, row)
+        sheet.write(row, 1, f"行 {row}")
+    workbook.save(str(source))
+
+    with ConversionPool(NativeXlsEngine, workers=1) as pool:
+        pool.submit(str(source), str(tmp_path / "book.xlsx"))
+        pool.close()
+        results = list(pool.results())
+    assert [result.status for result in results] == [STATUS_CONVERTED]
+    assert results[0].peak_memory is not None and results[0].peak_memory > 0
+    assert pool.memory_peaks[0] == 1
@@ -0,0 +1,194 @@
+import struct
+
+import pytest
+
+from doc_reader import (
+    DocFormatError,
+    FIB_COMPLEX,
+    FIB_ENCRYPTED,
+    FIB_IDENT,
+    FIB_WHICH_TABLE,
+    FC_CLX,
+    LW_CCP_TEXT,
+    NFIB_WORD97,
+    UnsupportedFeature,
+    read_document,
+    read_main_text,
+)
+from docx_writer import write_document
+from fake_engines import FakeEngine
+from office_engines import FastDocEngine
+from ole_reader import OleFile
+from ole_builder import build_ole
+
+# 用 python-docx 读回转换结果，只是测试依赖
+docx = pytest.importorskip("docx")
+
+TEXT_OFFSET = 0x800
+
+
+def _fib(ccp_text, clx_size, flags=FIB_WHICH_TABLE, nfib=0x00C1):
+    fib = bytearray(struct.pack("<HH", FIB_IDENT, nfib) + b"\x00" * 6 + struct.pack("<H", flags))
+    fib += b"\x00" * (0x20 - len(fib))
+    fib += struct.pack("<H", 14) + b"\x00" * 28
+    lengths = [0] * 22
+    lengths[LW_CCP_TEXT] = ccp_text
+    fib += struct.pack("<H22i", 22, *lengths)
+    fc_lcb = [0] * (0x5D * 2)
+    fc_lcb[FC_CLX * 2 + 1] = clx_size
+    fib += struct.pack(f"<H{len(fc_lcb)}I", 0x5D, *fc_lcb)
+    return bytes(fib)
+
+
+def write_doc(path, pieces, flags=FIB_WHICH_TABLE, nfib=0x00C1, extra_streams=(), prc=False, reverse=False):
+    """写出只有正文和片段表的 .doc
+
+    pieces 为 [(文字, 是否压缩)]：压缩片段每个字符一个字节（cp1252），否则为 UTF-16LE。
+    reverse 为 True 时片段在 WordDocument 流中倒序存放；
+    prc 为 True 时在片段表前加一个属性修改块（快速保存的文档才有）。
+    """
+    encoded = [text.encode("cp1252" if compressed else "utf-16-le") for text, compressed in pieces]
+    offsets = {}
+    text_bytes = bytearray()
+    for index in (reversed(range(len(pieces))) if reverse else range(len(pieces))):
+        offsets[index] = TEXT_OFFSET + len(text_bytes)
+        text_bytes += encoded[index]
+    cps = [0]
+    descriptors = []
+    for index, (text, compressed) in enumerate(pieces):
+        fc_value = (offsets[index] * 2) | 0x40000000 if compressed else offsets[index]
+        cps.append(cps[-1] + len(text))
+        descriptors.append(struct.pack("<HIH", 0, fc_value, 0))
+    plc = struct.pack(f"<{len(cps)}I", *cps) + b"".join(descriptors)
+    clx = b""
+    if prc:
+        clx += struct.pack("<BH", 1, 3) + struct.pack("<HB", 0x0835, 1)
+    clx += struct.pack("<BI", 2, len(plc)) + plc
+    fib = _fib(cps[-1], len(clx), flags, nfib)
+    word = fib + b"\x00" * (TEXT_OFFSET - len(fib)) + bytes(text_bytes)
+    table_name = "1Table" if flags & FIB_WHICH_TABLE else "0Table"
+    build_ole(path, [("WordDocument", word), (table_name, clx)] + list(extra_streams))
+    return str(path)
+
+
+def _paragraph_texts(document):
+    return ["".join(run.text for run in block.runs) for block in document.blocks]
+
+
+def test_compressed_and_unicode_pieces(tmp_path):
+    path = write_doc(tmp_path / "pieces.doc", [
+        ("Hello café ", True),
+        ("世界\r第二段", False),
+        (" end\r", True),
+    ])
+    document = read_document(path)
+    assert _paragraph_texts(document) == ["Hello café 世界", "第二段 end"]
+    assert read_main_text(path) == "Hello café 世界\r第二段 end\r"
+
+    write_document(document, str(tmp_path / "pieces.docx"))
+    assert [p.text for p in docx.Document(str(tmp_path / "pieces.docx")).paragraphs] == [
+        "Hello café 世界", "第二段 end"]
+
+
+def test_pieces_out_of_file_order_and_table_stream_0(tmp_path):
+    # 片段按 CP 排列，但在 WordDocument 流中的位置可以任意；旧文档使用 0Table
+    path = write_doc(tmp_path / "reordered.doc", [("first\r", True), ("第二\r", False), ("third\r", True)],
+                     flags=0, reverse=True)
+    assert _paragraph_texts(read_document(path)) == ["first", "第二", "third"]
+
+
+def test_reading_leaves_no_view_on_the_mapped_file(tmp_path, monkeypatch):
+    # 解析时从流中切出的视图都要在关闭前释放，否则 Windows 上文件一直被锁定
+    closed = []
+    close = OleFile.close
+
+    def recording_close(self):
+        mapping = self._map
+        close(self)
+        closed.append(mapping.closed)
+
+    monkeypatch.setattr(OleFile, "close", recording_close)
+    path = write_doc(tmp_path / "plain.doc", [("text\r", True), ("文字\r", False)])
+    read_document(path)
+    read_main_text(path)
+    assert closed == [True, True]
+
+
+def test_field_codes_are_replaced_by_their_results(tmp_path):
+    path = write_doc(tmp_path / "field.doc", [("see \x13 HYPERLINK \"x\" \x14the link\x15 here\r", True)])
+    assert _paragraph_texts(read_document(path)) == ["see the link here"]
+
+
+def test_encrypted_document_is_rejected(tmp_path):
+    path = write_doc(tmp_path / "encrypted.doc", [("secret\r", True)], flags=FIB_WHICH_TABLE | FIB_ENCRYPTED)
+    with pytest.raises(UnsupportedFeature, match="加密"):
+        read_document(path)
+    with pytest.raises(UnsupportedFeature):
+        read_main_text(path)
+
+
+def test_fast_saved_document_is_rejected(tmp_path):
+    path = write_doc(tmp_path / "complex.doc", [("fast saved\r", True)],
+                     flags=FIB_WHICH_TABLE | FIB_COMPLEX, prc=True)
+    with pytest.raises(UnsupportedFeature, match="快速保存"):
+        read_document(path)
+    # 正文文字仍可按片段表读出，用于校验 Word 的转换结果
+    assert read_main_text(path) == "fast saved\r"
+
+
+def test_word95_and_damaged_fib(tmp_path):
+    with pytest.raises(UnsupportedFeature):
+        read_document(write_doc(tmp_path / "word95.doc", [("x\r", True)], nfib=NFIB_WORD97 - 1))
+    path = tmp_path / "damaged.doc"
+    build_ole(path, [("WordDocument", b"\x00" * 0x400), ("1Table", b"")])
+    with pytest.raises(DocFormatError):
+        read_document(str(path))
+
+
+@pytest.mark.parametrize("stream, feature", [("Macros", "宏"), ("ObjectPool", "嵌入对象")])
+def test_macros_and_embedded_objects_are_rejected(tmp_path, stream, feature):
+    path = write_doc(tmp_path / "extra.doc", [("x\r", True)], extra_streams=[(stream, b"\x00" * 16)])
+    with pytest.raises(UnsupportedFeature, match=feature):
+        read_document(path)
+
+
+class _RecordingFallback(FakeEngine):
+    converted = []
+
+    def convert(self, source_path, target_path):
+        type(self).converted.append(source_path)
+        super().convert(source_path, target_path)
+
+
+class _FakeWordDocEngine(FastDocEngine):
+    fallback_factory = _RecordingFallback
+
+
+@pytest.mark.parametrize("pieces, flags", [
+    ([("picture \x01\r", True)], FIB_WHICH_TABLE),
+    ([("fast saved\r", True)], FIB_WHICH_TABLE | FIB_COMPLEX),
+])
+def test_unsupported_documents_fall_back_to_word(tmp_path, pieces, flags):
+    source = write_doc(tmp_path / "unsupported.doc", pieces, flags=flags)
+    target = tmp_path / "unsupported.docx"
+
+    _RecordingFallback.converted = []
+    engine = _FakeWordDocEngine()
+    try:
+        message = engine.convert(source, str(target))
+    finally:
+        engine.stop()
+    assert _RecordingFallback.converted == [source]
+    assert message.startswith("由 fake 转换")
+    assert target.exists()
+
+
+def test_supported_document_does_not_start_word(tmp_path):
+    source = write_doc(tmp_path / "plain.doc", [("plain text\r", True)])
+    target = tmp_path / "plain.docx"
+
+    _RecordingFallback.converted = []
+    engine = _FakeWordDocEngine()
+    assert engine.convert(source, str(target)) is None
+    assert engine.fallback is None
+    assert [p.text for p in docx.Document(str(target)).paragraphs] == ["plain text"]
@@ -0,0 +1,209 @@
+import datetime
+import struct
+
+import pytest
+
+import xls_reader
+from office_engines import NativeXlsEngine
+from ole_builder import build_ole
+from ole_reader import OleFile
+from xls_reader import RT_CONTINUE, RT_EOF, RT_SST, UnsupportedFeature, open_workbook
+from xlsx_writer import write_workbook
+from fake_engines import FakeEngine
+
+# 用 xlwt 写出 .xls、用 openpyxl 读回转换结果，两者只是测试依赖
+xlwt = pytest.importorskip("xlwt")
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _convert(source, target):
+    with open_workbook(str(source)) as book:
+        write_workbook(book, str(target))
+    return openpyxl.load_workbook(str(target))
+
+
+def _save(workbook, path):
+    workbook.save(str(path))
+    return path
+
+
+def test_values_dates_and_number_formats(tmp_path):
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("数据")
+    sheet.write(0, 0, "文本")
+    sheet.write(0, 1, 3.25)
+    sheet.write(0, 2, 42)
+    sheet.write(0, 3, True)
+    sheet.write(0, 4, -1e-7)
+    sheet.write(1, 0, datetime.date(2024, 3, 1), xlwt.easyxf(num_format_str="yyyy-mm-dd"))
+    sheet.write(1, 1, datetime.datetime(2024, 3, 1, 13, 45), xlwt.easyxf(num_format_str="yyyy-mm-dd hh:mm"))
+    sheet.write(1, 2, 1234.5, xlwt.easyxf(num_format_str="#,##0.00"))
+    sheet.write(1, 3, 0.125, xlwt.easyxf(num_format_str="0.0%"))
+    sheet.write(2, 0, "粗体", xlwt.easyxf("font: bold on, italic on"))
+    hidden = workbook.add_sheet("隐藏")
+    hidden.visibility = 1
+    hidden.write(0, 0, "x")
+
+    book = _convert(_save(workbook, tmp_path / "values.xls"), tmp_path / "values.xlsx")
+    ws = book["数据"]
+    assert [cell.value for cell in ws[1]] == ["文本", 3.25, 42, True, -1e-7]
+    assert ws["A2"].value == datetime.datetime(2024, 3, 1)
+    assert ws["A2"].number_format == "yyyy-mm-dd"
+    assert ws["B2"].value == datetime.datetime(2024, 3, 1, 13, 45)
+    assert ws["B2"].number_format == "yyyy-mm-dd hh:mm"
+    assert (ws["C2"].value, ws["C2"].number_format) == (1234.5, "#,##0.00")
+    assert (ws["D2"].value, ws["D2"].number_format) == (0.125, "0.0%")
+    assert ws["A3"].font.bold and ws["A3"].font.italic
+    assert book["隐藏"].sheet_state == "hidden"
+
+
+def test_merged_cells(tmp_path):
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("Sheet1")
+    sheet.write_merge(0, 1, 0, 2, "标题")
+    sheet.write_merge(3, 3, 1, 4, "行")
+
+    book = _convert(_save(workbook, tmp_path / "merged.xls"), tmp_path / "merged.xlsx")
+    ws = book["Sheet1"]
+    assert sorted(str(merged) for merged in ws.merged_cells.ranges) == ["A1:C2", "B4:E4"]
+    assert ws["A1"].value == "标题"
+    assert ws["B4"].value == "行"
+
+
+def test_formulas_including_cross_sheet_references(tmp_path):
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("Main")
+    other = workbook.add_sheet("Other Sheet")
+    other.write(0, 0, 10)
+    other.write(1, 0, 20)
+    sheet.write(0, 0, 1.5)
+    sheet.write(0, 1, 2)
+    sheet.write(1, 0, xlwt.Formula("A1*2+B1"))
+    sheet.write(1, 1, xlwt.Formula("SUM(A1:B1)"))
+    sheet.write(1, 2, xlwt.Formula("'Other Sheet'!A1+1"))
+    sheet.write(1, 3, xlwt.Formula("SUM('Other Sheet'!A1:A2)"))
+    sheet.write(1, 4, xlwt.Formula('IF(A1>1,"big","small")'))
+    sheet.write(1, 5, xlwt.Formula("$A$1&\"x\""))
+
+    book = _convert(_save(workbook, tmp_path / "formulas.xls"), tmp_path / "formulas.xlsx")
+    ws = book["Main"]
+    assert [cell.value for cell in ws[2]] == [
+        "=A1*2+B1",
+        "=SUM(A1:B1)",
+        "='Other Sheet'!A1+1",
+        "=SUM('Other Sheet'!A1:A2)",
+        '=IF(A1>1,"big","small")',
+        '=$A$1&"x"',
+    ]
+
+
+def _sst_continue_count(path):
+    with OleFile(str(path)) as ole:
+        stream = bytes(ole.read_stream("Workbook"))
+    offset = 0
+    count = None
+    while offset + 4 <= len(stream):
+        record_type, length = struct.unpack_from("<HH", stream, offset)
+        if record_type == RT_SST:
+            count = 0
+        elif count is not None:
+            if record_type != RT_CONTINUE:
+                return count
+            count += 1
+        offset += 4 + length
+    return count
+
+
+def _many_strings():
+    # 共享字符串表超过一个记录（8224 字节）后由 CONTINUE 记录续接，
+    # 混入中文字符，使字符串在压缩和双字节两种编码之间切换
+    return [f"string {i} " + ("长" if i % 3 == 0 else "") + "x" * (i % 50) for i in range(3000)]
+
+
+def test_shared_strings_spanning_continue_records(tmp_path):
+    strings = _many_strings()
+    long_text = "跨记录的长字符串" * 2000
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("Sheet1")
+    for row, text in enumerate(strings):
+        sheet.write(row, 0, text)
+    sheet.write(0, 1, long_text)
+
+    source = _save(workbook, tmp_path / "sst.xls")
+    assert _sst_continue_count(source) > 2
+
+    book = _convert(source, tmp_path / "sst.xlsx")
+    ws = book["Sheet1"]
+    assert [row[0] for row in ws.iter_rows(max_col=1, values_only=True)] == strings
+    assert ws["B1"].value == long_text
+
+
+def test_shared_strings_spilled_to_a_temporary_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(xls_reader, "SST_SPILL_BYTES", 4096)
+    strings = _many_strings()
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("Sheet1")
+    for row, text in enumerate(strings):
+        sheet.write(row, 0, text)
+    source = _save(workbook, tmp_path / "spill.xls")
+
+    with open_workbook(str(source)) as book:
+        assert book.shared_strings.spilled
+        write_workbook(book, str(tmp_path / "spill.xlsx"))
+    ws = openpyxl.load_workbook(str(tmp_path / "spill.xlsx"))["Sheet1"]
+    assert [row[0] for row in ws.iter_rows(max_col=1, values_only=True)] == strings
+
+
+def _with_unsupported_record(source, target, record_type):
+    """在唯一一张工作表的 EOF 之前插入一条内置引擎不支持的记录"""
+    with OleFile(str(source)) as ole:
+        stream = bytes(ole.read_stream("Workbook"))
+    eof = struct.pack("<HH", RT_EOF, 0)
+    position = stream.rindex(eof)
+    stream = stream[:position] + struct.pack("<HH", record_type, 4) + b"\x00" * 4 + stream[position:]
+    build_ole(target, [("Workbook", stream)])
+    return target
+
+
+class _RecordingFallback(FakeEngine):
+    converted = []
+
+    def convert(self, source_path, target_path):
+        type(self).converted.append(source_path)
+        super().convert(source_path, target_path)
+
+
+class _FakeOfficeXlsEngine(NativeXlsEngine):
+    fallback_factory = _RecordingFallback
+
+
+def test_unsupported_records_fall_back_to_office(tmp_path):
+    workbook = xlwt.Workbook()
+    workbook.add_sheet("Sheet1").write(0, 0, "a")
+    source = _with_unsupported_record(_save(workbook, tmp_path / "plain.xls"), tmp_path / "link.xls", 0x01B8)
+
+    with pytest.raises(UnsupportedFeature):
+        _convert(source, tmp_path / "native.xlsx")
+
+    _RecordingFallback.converted = []
+    engine = _FakeOfficeXlsEngine()
+    try:
+        message = engine.convert(str(source), str(tmp_path / "link.xlsx"))
+    finally:
+        engine.stop()
+    assert _RecordingFallback.converted == [str(source)]
+    assert "超链接" in message
+    assert (tmp_path / "link.xlsx").exists()
+
+
+def test_supported_workbook_does_not_start_office(tmp_path):
+    workbook = xlwt.Workbook()
+    workbook.add_sheet("Sheet1").write(0, 0, "a")
+    source = _save(workbook, tmp_path / "plain.xls")
+
+    _RecordingFallback.converted = []
+    engine = _FakeOfficeXlsEngine()
+    assert engine.convert(str(source), str(tmp_path / "plain.xlsx")) is None
+    assert engine.fallback is None
+    assert _RecordingFallback.converted == []
+    assert openpyxl.load_workbook(str(tmp_path / "plain.xlsx"))["Sheet1"]["A1"].value == "a"
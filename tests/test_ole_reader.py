@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from ole_reader import END_OF_CHAIN, OleFile, OleFormatError
+from ole_builder import build_ole
+
+BIG = bytes(range(256)) * 40           # 10 KB，存放在普通扇区中
+SMALL = b"0123456789" * 30             # 300 字节，存放在 MiniStream 中
+
+
+def _streams():
+    return [("Big", BIG), ("Small", SMALL), ("One", b"x"), ("Empty", b"")]
+
+
+@pytest.mark.parametrize("scatter", [False, True])
+def test_fat_and_minifat_chains(tmp_path, scatter):
+    path = tmp_path / "file.ole"
+    build_ole(path, _streams(), scatter=scatter)
+    with OleFile(str(path)) as ole:
+        assert ole.listdir() == ["Big", "Small", "One", "Empty"]
+        assert ole.exists("big") and not ole.exists("Missing")
+        for name, data in _streams():
+            assert ole.stream_size(name) == len(data)
+            assert bytes(ole.read_stream(name)) == data
+        assert bytes(ole.read_stream("Big", 1000)) == BIG[:1000]
+        assert bytes(ole.read_stream("Small", 100)) == SMALL[:100]
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Missing")
+
+
+def test_fat_sectors_listed_in_difat_sectors(tmp_path):
+    # 数据从第 14000 个扇区开始，FAT 需要 110 个以上的扇区，超出文件头能记录的 109 个
+    path = tmp_path / "large.ole"
+    layout = build_ole(path, _streams(), data_start=14000)
+    assert len(layout.fat_sectors) > 109
+    with OleFile(str(path)) as ole:
+        assert bytes(ole.read_stream("Big")) == BIG
+        assert bytes(ole.read_stream("Small")) == SMALL
+
+
+def test_cyclic_fat_chain(tmp_path):
+    path = tmp_path / "file.ole"
+    layout = build_ole(path, _streams())
+    chain = layout.chains["Big"]
+    layout.set_fat_entry(chain[1], chain[0])
+    with OleFile(str(path)) as ole:
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Big")
+
+
+def test_cyclic_minifat_chain(tmp_path):
+    path = tmp_path / "file.ole"
+    layout = build_ole(path, _streams())
+    chain = layout.mini_chains["Small"]
+    layout.set_minifat_entry(chain[1], chain[0])
+    with OleFile(str(path)) as ole:
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Small")
+
+
+def test_chain_shorter_than_the_stream(tmp_path):
+    path = tmp_path / "file.ole"
+    layout = build_ole(path, _streams())
+    layout.set_fat_entry(layout.chains["Big"][2], END_OF_CHAIN)
+    layout.set_minifat_entry(layout.mini_chains["Small"][1], END_OF_CHAIN)
+    with OleFile(str(path)) as ole:
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Big")
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Small")
+        # 只读取链上还在的部分时不受影响
+        assert bytes(ole.read_stream("Big", 512)) == BIG[:512]
+
+
+def test_chain_pointing_past_the_end_of_the_file(tmp_path):
+    path = tmp_path / "file.ole"
+    layout = build_ole(path, _streams())
+    layout.set_fat_entry(layout.chains["Big"][0], 5000)
+    with OleFile(str(path)) as ole:
+        with pytest.raises(OleFormatError):
+            ole.read_stream("Big")
+
+
+def test_truncated_file(tmp_path):
+    path = tmp_path / "file.ole"
+    build_ole(path, _streams())
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) - 1000])
+    with pytest.raises(OleFormatError):
+        with OleFile(str(path)) as ole:
+            ole.read_stream("Big")
+
+
+@pytest.mark.parametrize("content", [b"", b"not an ole file" * 100])
+def test_not_an_ole_file(tmp_path, content):
+    path = tmp_path / "file.doc"
+    path.write_bytes(content)
+    with pytest.raises(OleFormatError):
+        OleFile(str(path))
+
+
+@pytest.mark.parametrize("scatter", [False, True])
+def test_close_releases_stream_views_and_the_mapping(tmp_path, scatter):
+    path = tmp_path / "file.ole"
+    build_ole(path, _streams(), scatter=scatter)
+    ole = OleFile(str(path))
+    views = [ole.read_stream(name) for name, _ in _streams()]
+    ole.close()
+    # 交出去的视图全部释放，映射真正关闭（Windows 上文件不再被锁定）
+    for view in views:
+        with pytest.raises(ValueError):
+            bytes(view)
+    assert ole._map.closed
+    os.replace(str(path), str(tmp_path / "renamed.ole"))
+    ole.close()
@@ -0,0 +1,98 @@
+import random
+import sys
+import time
+from threading import Event, Thread
+
+import pytest
+
+from progress_events import (
+    EVENT_CONVERTED,
+    EVENT_DISCOVERED,
+    EVENT_ERROR,
+    EVENT_SKIPPED,
+    EVENT_STARTED,
+    ProgressEventBus,
+    ProgressTracker,
+)
+from ui_commands import UiCommandQueue
+
+WORKERS = 16
+FILES = 500
+UI_TICK_SECONDS = 0.002
+OUTCOMES = (EVENT_CONVERTED, EVENT_CONVERTED, EVENT_CONVERTED, EVENT_SKIPPED, EVENT_ERROR)
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    # 线程切换更频繁，更容易暴露计数竞争
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _increment_updates(ui_state):
+    ui_state["updates"] += 1
+
+
+def _fake_worker(worker_id, bus, commands, shared_tracker, ui_state, expected):
+    """模拟转换线程：每个文件发送开始和结束事件，并提交一次界面修改"""
+    rng = random.Random(worker_id)
+    for i in range(FILES):
+        path = f"w{worker_id}/f{i}.doc"
+        outcome = rng.choice(OUTCOMES)
+        expected[outcome] += 1
+        for event in ((EVENT_STARTED, path), (outcome, path, 0.001)):
+            bus.emit(*event)
+            shared_tracker.apply(event)
+        # 不加锁的界面状态只在界面线程中修改
+        commands.post(ui_state.__setitem__, "last", path)
+        commands.post(_increment_updates, ui_state)
+
+
+def test_counts_are_exact_under_concurrent_workers(frequent_thread_switches):
+    """许多转换线程同时发送进度事件和界面命令，界面线程汇总（与 GUI 的 update_log 相同）的计数
+    和所有线程直接并发 apply() 的 ProgressTracker 计数都必须完全准确"""
+    bus = ProgressEventBus()
+    commands = UiCommandQueue()
+    tracker = ProgressTracker()
+    shared_tracker = ProgressTracker()
+    ui_state = {"updates": 0, "last": None}
+    expectations = [{EVENT_CONVERTED: 0, EVENT_SKIPPED: 0, EVENT_ERROR: 0} for _ in range(WORKERS)]
+    total = WORKERS * FILES
+    bus.emit(EVENT_DISCOVERED, total)
+    shared_tracker.apply((EVENT_DISCOVERED, total))
+
+    stop = Event()
+
+    def ui_loop():
+        while True:
+            finished = stop.is_set()
+            commands.run_pending()
+            for event in bus.drain():
+                tracker.apply(event)
+            # 读取一次快照，模拟刷新统计文本
+            tracker.stats_text()
+            if finished:
+                return
+            time.sleep(UI_TICK_SECONDS)
+
+    ui_thread = Thread(target=ui_loop)
+    ui_thread.start()
+    threads = [Thread(target=_fake_worker, args=(i, bus, commands, shared_tracker, ui_state, expectations[i]))
+               for i in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    ui_thread.join()
+
+    expected = {kind: sum(e[kind] for e in expectations) for kind in expectations[0]}
+    for stats in (tracker.snapshot(), shared_tracker.snapshot()):
+        assert {EVENT_CONVERTED: stats.converted, EVENT_SKIPPED: stats.skipped, EVENT_ERROR: stats.errors} == expected
+        assert stats.processed == total
+        assert stats.total == total
+        assert stats.in_progress == 0
+    assert ui_state["updates"] == total
+    assert ui_state["last"] is not None
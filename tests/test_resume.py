@@ -0,0 +1,33 @@
+import office_converter
+import office_engines
+from conversion_journal import ConversionJournal, default_journal_path
+from conversion_pool import STATUS_CONVERTED, STATUS_ERROR
+from fake_engines import CONTENT_FAIL, FakeEngine
+
+
+def test_failed_files_from_a_crashed_run_are_retried_later(tmp_path, monkeypatch):
+    monkeypatch.setitem(office_engines.DOC_ENGINES, office_engines.DOC_ENGINE_OFFICE, FakeEngine)
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.doc").write_bytes(CONTENT_FAIL)
+    (source / "b.doc").write_bytes(b"b")
+    archive = tmp_path / "archive"
+    archive.mkdir()
+
+    # 上次运行在 a.doc 转换失败后崩溃，断点续传日志保留了它的结果
+    journal = ConversionJournal(default_journal_path(str(source)))
+    journal.start_run()
+    journal.record_submitted(str(source / "a.doc"), str(source / "a.docx"))
+    journal.record_done(str(source / "a.doc"), str(source / "a.docx"), STATUS_ERROR)
+    journal.close()
+
+    def run():
+        results = []
+        office_converter.convert_office_files(str(source), str(archive), convert_xls=False, word_workers=1,
+                                              verify=False, on_result=results.append)
+        return {result.source_path: result.status for result in results}
+
+    # 续传的运行跳过 a.doc，只转换 b.doc
+    assert run() == {str(source / "b.doc"): STATUS_CONVERTED}
+    # a.doc 未成功处理，所在目录不能按清单跳过，下一次运行重新转换它
+    assert run() == {str(source / "a.doc"): STATUS_ERROR}
@@ -0,0 +1,30 @@
+import sys
+
+import office_converter
+import office_engines
+from conversion_pool import STATUS_CONVERTED
+from fake_engines import FakeEngine
+
+
+def test_run_continues_without_pywin32(tmp_path, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "win32file", None)
+    monkeypatch.setattr(office_converter, "_timestamps_unavailable", False)
+    monkeypatch.setitem(office_engines.DOC_ENGINES, office_engines.DOC_ENGINE_OFFICE, FakeEngine)
+    source = tmp_path / "src"
+    source.mkdir()
+    names = ["a", "b", "c"]
+    for name in names:
+        (source / f"{name}.doc").write_bytes(name.encode())
+    archive = tmp_path / "archive"
+    archive.mkdir()
+
+    results = []
+    office_converter.convert_office_files(str(source), str(archive), convert_xls=False, word_workers=1,
+                                          verify=False, on_result=results.append)
+
+    assert sorted(result.status for result in results) == [STATUS_CONVERTED] * len(names)
+    for name in names:
+        assert (source / f"{name}.docx").exists()
+        assert not (source / f"{name}.doc").exists()
+        assert (archive / f"{name}.doc").exists()
+    assert capsys.readouterr().out.count("未安装 pywin32") == 1
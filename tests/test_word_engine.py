@@ -0,0 +1,28 @@
+import sys
+
+import office_engines
+from office_engines import WordComEngine
+
+
+class _WordApp:
+    Caption = ""
+
+
+def _engine(monkeypatch, pids_after):
+    # 没有 pywin32 时找不到窗口，只能按进程列表差异判断
+    monkeypatch.setitem(sys.modules, "win32gui", None)
+    monkeypatch.setattr(office_engines, "list_process_ids", lambda image_name: set(pids_after))
+    engine = WordComEngine()
+    engine.word_app = _WordApp()
+    return engine
+
+
+def test_single_new_word_process_is_taken_as_its_own(monkeypatch):
+    engine = _engine(monkeypatch, {10, 20})
+    assert engine._find_word_pids({10}) == [20]
+
+
+def test_ambiguous_word_processes_are_never_claimed(monkeypatch):
+    # 另一个工作进程同时启动了 Word：无法区分，宁可不结束任何进程
+    engine = _engine(monkeypatch, {10, 20, 30})
+    assert engine._find_word_pids({10}) == []
@@ -0,0 +1,26 @@
+import queue
+
+
+class UiCommandQueue:
+    """转换线程对界面控件的修改排队，由界面线程在定时刷新时按顺序执行
+
+    Tk 控件只能在创建它的线程中修改；其他线程调用 post() 提交修改，不直接调用 config 或弹出对话框。
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def post(self, func, *args, **kwargs):
+        self._queue.put((func, args, kwargs))
+
+    def run_pending(self):
+        """在界面线程中执行已提交的修改，返回执行的条数"""
+        count = 0
+        try:
+            while True:
+                func, args, kwargs = self._queue.get_nowait()
+                func(*args, **kwargs)
+                count += 1
+        except queue.Empty:
+            pass
+        return count
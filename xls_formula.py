@@ -0,0 +1,267 @@
+import struct
+from collections import namedtuple
+
+# 把 BIFF8 公式的逆波兰解析记号（Ptg）还原为 XLSX 使用的公式文本。
+# 只覆盖常用的记号和函数，遇到无法可靠翻译的内容抛出 FormulaError，整个文件交给 Office 转换。
+
+
+class FormulaError(Exception):
+    """公式中包含无法翻译的记号"""
+
+
+FormulaContext = namedtuple("FormulaContext", ["sheet_names", "external_sheets", "supbooks"])
+
+ERROR_CODES = {
+    0x00: "#NULL!",
+    0x07: "#DIV/0!",
+    0x0F: "#VALUE!",
+    0x17: "#REF!",
+    0x1D: "#NAME?",
+    0x24: "#NUM!",
+    0x2A: "#N/A",
+}
+
+BINARY_OPERATORS = {
+    0x03: "+", 0x04: "-", 0x05: "*", 0x06: "/", 0x07: "^", 0x08: "&",
+    0x09: "<", 0x0A: "<=", 0x0B: "=", 0x0C: ">=", 0x0D: ">", 0x0E: "<>",
+    0x0F: " ", 0x10: ",", 0x11: ":",
+}
+
+# 函数编号 → (函数名, 固定参数个数；None 表示参数个数可变)
+FUNCTIONS = {
+    0: ("COUNT", None), 1: ("IF", None), 2: ("ISNA", 1), 3: ("ISERROR", 1), 4: ("SUM", None),
+    5: ("AVERAGE", None), 6: ("MIN", None), 7: ("MAX", None), 8: ("ROW", None), 9: ("COLUMN", None),
+    10: ("NA", 0), 11: ("NPV", None), 12: ("STDEV", None), 13: ("DOLLAR", None), 14: ("FIXED", None),
+    15: ("SIN", 1), 16: ("COS", 1), 17: ("TAN", 1), 18: ("ATAN", 1), 19: ("PI", 0), 20: ("SQRT", 1),
+    21: ("EXP", 1), 22: ("LN", 1), 23: ("LOG10", 1), 24: ("ABS", 1), 25: ("INT", 1), 26: ("SIGN", 1),
+    27: ("ROUND", 2), 28: ("LOOKUP", None), 29: ("INDEX", None), 30: ("REPT", 2), 31: ("MID", 3),
+    32: ("LEN", 1), 33: ("VALUE", 1), 34: ("TRUE", 0), 35: ("FALSE", 0), 36: ("AND", None),
+    37: ("OR", None), 38: ("NOT", 1), 39: ("MOD", 2), 40: ("DCOUNT", 3), 41: ("DSUM", 3),
+    42: ("DAVERAGE", 3), 43: ("DMIN", 3), 44: ("DMAX", 3), 45: ("DSTDEV", 3), 46: ("VAR", None),
+    47: ("DVAR", 3), 48: ("TEXT", 2), 56: ("PV", None), 57: ("FV", None), 58: ("NPER", None),
+    59: ("PMT", None), 60: ("RATE", None), 61: ("MIRR", 3), 62: ("IRR", None), 63: ("RAND", 0),
+    64: ("MATCH", None), 65: ("DATE", 3), 66: ("TIME", 3), 67: ("DAY", 1), 68: ("MONTH", 1),
+    69: ("YEAR", 1), 70: ("WEEKDAY", None), 71: ("HOUR", 1), 72: ("MINUTE", 1), 73: ("SECOND", 1),
+    74: ("NOW", 0), 75: ("AREAS", 1), 76: ("ROWS", 1), 77: ("COLUMNS", 1), 78: ("OFFSET", None),
+    82: ("SEARCH", None), 83: ("TRANSPOSE", 1), 86: ("TYPE", 1), 97: ("ATAN2", 2), 98: ("ASIN", 1),
+    99: ("ACOS", 1), 100: ("CHOOSE", None), 101: ("HLOOKUP", None), 102: ("VLOOKUP", None),
+    105: ("ISREF", 1), 109: ("LOG", None), 111: ("CHAR", 1), 112: ("LOWER", 1), 113: ("UPPER", 1),
+    114: ("PROPER", 1), 115: ("LEFT", None), 116: ("RIGHT", None), 117: ("EXACT", 2), 118: ("TRIM", 1),
+    119: ("REPLACE", 4), 120: ("SUBSTITUTE", None), 121: ("CODE", 1), 124: ("FIND", None),
+    125: ("CELL", None), 126: ("ISERR", 1), 127: ("ISTEXT", 1), 128: ("ISNUMBER", 1),
+    129: ("ISBLANK", 1), 130: ("T", 1), 131: ("N", 1), 140: ("DATEVALUE", 1), 141: ("TIMEVALUE", 1),
+    142: ("SLN", 3), 143: ("SYD", 4), 144: ("DDB", None), 148: ("INDIRECT", None), 162: ("CLEAN", 1),
+    163: ("MDETERM", 1), 164: ("MINVERSE", 1), 165: ("MMULT", 2), 167: ("IPMT", None),
+    168: ("PPMT", None), 169: ("COUNTA", None), 183: ("PRODUCT", None), 184: ("FACT", 1),
+    189: ("DPRODUCT", 3), 190: ("ISNONTEXT", 1), 193: ("STDEVP", None), 194: ("VARP", None),
+    195: ("DSTDEVP", 3), 196: ("DVARP", 3), 197: ("TRUNC", None), 198: ("ISLOGICAL", 1),
+    199: ("DCOUNTA", 3), 212: ("ROUNDUP", 2), 213: ("ROUNDDOWN", 2), 216: ("RANK", None),
+    219: ("ADDRESS", None), 220: ("DAYS360", None), 221: ("TODAY", 0), 222: ("VDB", None),
+    227: ("MEDIAN", None), 228: ("SUMPRODUCT", None), 229: ("SINH", 1), 230: ("COSH", 1),
+    231: ("TANH", 1), 232: ("ASINH", 1), 233: ("ACOSH", 1), 234: ("ATANH", 1), 235: ("DGET", 3),
+    247: ("DB", None), 252: ("FREQUENCY", 2), 261: ("ERROR.TYPE", 1), 269: ("AVEDEV", None),
+    276: ("COMBIN", 2), 279: ("EVEN", 1), 285: ("FLOOR", 2), 288: ("CEILING", 2), 298: ("ODD", 1),
+    299: ("PERMUT", 2), 307: ("CORREL", 2), 318: ("DEVSQ", None), 319: ("GEOMEAN", None),
+    320: ("HARMEAN", None), 321: ("SUMSQ", None), 325: ("LARGE", 2), 326: ("SMALL", 2),
+    327: ("QUARTILE", 2), 328: ("PERCENTILE", 2), 330: ("MODE", None), 336: ("CONCATENATE", None),
+    337: ("POWER", 2), 342: ("RADIANS", 1), 343: ("DEGREES", 1), 344: ("SUBTOTAL", None),
+    345: ("SUMIF", None), 346: ("COUNTIF", 2), 347: ("COUNTBLANK", 1), 351: ("DATEDIF", 3),
+    354: ("ROMAN", None), 361: ("AVERAGEA", None), 362: ("MAXA", None), 363: ("MINA", None),
+}
+
+MAX_ROW = 0x10000
+MAX_COL = 0x100
+
+
+def column_name(col):
+    name = ""
+    col += 1
+    while col:
+        col, remainder = divmod(col - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def cell_reference(row, col, row_absolute=False, col_absolute=False):
+    return f"{'$' if col_absolute else ''}{column_name(col)}{'$' if row_absolute else ''}{row + 1}"
+
+
+def _reference(row, col_field, base_row, base_col, shared):
+    """RgceLoc / RgceLocRel → A1 形式的引用文本"""
+    row_relative = bool(col_field & 0x8000)
+    col_relative = bool(col_field & 0x4000)
+    col = col_field & 0x3FFF
+    if shared:
+        # 共享公式中相对部分是相对于公式所在单元格的偏移
+        if row_relative:
+            row = (base_row + (row - 0x10000 if row & 0x8000 else row)) % MAX_ROW
+        if col_relative:
+            col = (base_col + ((col & 0xFF) - 0x100 if col & 0x80 else col & 0xFF)) % MAX_COL
+    return cell_reference(row, col, not row_relative, not col_relative)
+
+
+def _format_number(value):
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _sheet_prefix(context, ixti):
+    if ixti >= len(context.external_sheets):
+        raise FormulaError("无效的工作表引用")
+    supbook, first, last = context.external_sheets[ixti]
+    if supbook >= len(context.supbooks) or not context.supbooks[supbook]:
+        raise FormulaError("引用了外部工作簿")
+    if first >= len(context.sheet_names) or last >= len(context.sheet_names):
+        return None
+    names = context.sheet_names[first]
+    if last != first:
+        names += ":" + context.sheet_names[last]
+    return "'" + names.replace("'", "''") + "'!"
+
+
+def decompile(tokens, context, base_row, base_col, shared=False):
+    """把公式记号翻译为公式文本（不带前导等号）
+
+    shared=True 表示共享公式（SHRFMLA），其中的 PtgRef / PtgArea 按相对偏移解释。
+    """
+    stack = []
+    pos = 0
+    size = len(tokens)
+    try:
+        while pos < size:
+            ptg = tokens[pos]
+            pos += 1
+            if ptg in BINARY_OPERATORS:
+                right = stack.pop()
+                left = stack.pop()
+                stack.append(left + BINARY_OPERATORS[ptg] + right)
+            elif ptg == 0x12:
+                stack.append("+" + stack.pop())
+            elif ptg == 0x13:
+                stack.append("-" + stack.pop())
+            elif ptg == 0x14:
+                stack.append(stack.pop() + "%")
+            elif ptg == 0x15:
+                stack.append("(" + stack.pop() + ")")
+            elif ptg == 0x16:
+                stack.append("")
+            elif ptg == 0x17:
+                count, flags = tokens[pos], tokens[pos + 1]
+                pos += 2
+                if flags & 0x01:
+                    text = str(tokens[pos:pos + count * 2], "utf-16-le")
+                    pos += count * 2
+                else:
+                    text = str(tokens[pos:pos + count], "latin-1")
+                    pos += count
+                stack.append('"' + text.replace('"', '""') + '"')
+            elif ptg == 0x19:
+                attribute = tokens[pos]
+                if attribute & 0x04:
+                    cases, = struct.unpack_from("<H", tokens, pos + 1)
+                    pos += 3 + (cases + 1) * 2
+                    continue
+                pos += 3
+                if attribute & 0x10:
+                    stack.append("SUM(" + stack.pop() + ")")
+            elif ptg == 0x1C:
+                stack.append(ERROR_CODES.get(tokens[pos], "#N/A"))
+                pos += 1
+            elif ptg == 0x1D:
+                stack.append("TRUE" if tokens[pos] else "FALSE")
+                pos += 1
+            elif ptg == 0x1E:
+                stack.append(str(struct.unpack_from("<H", tokens, pos)[0]))
+                pos += 2
+            elif ptg == 0x1F:
+                stack.append(_format_number(struct.unpack_from("<d", tokens, pos)[0]))
+                pos += 8
+            elif 0x20 <= ptg < 0x80:
+                # 引用类、值类、数组类记号共用同一组基础编号
+                pos = _operand(ptg & 0x1F | 0x20, tokens, pos, stack, context, base_row, base_col, shared)
+            else:
+                raise FormulaError(f"不支持的记号 {ptg:#04x}")
+    except (IndexError, struct.error):
+        raise FormulaError("公式数据不完整")
+    if len(stack) != 1:
+        raise FormulaError("公式结构无效")
+    return stack[0]
+
+
+def _operand(base, tokens, pos, stack, context, base_row, base_col, shared):
+    if base == 0x21:
+        function_id, = struct.unpack_from("<H", tokens, pos)
+        name, argc = _function(function_id)
+        if argc is None:
+            raise FormulaError(f"函数 {name} 缺少参数个数")
+        _call(stack, name, argc)
+        return pos + 2
+    if base == 0x22:
+        argc = tokens[pos] & 0x7F
+        function_id, = struct.unpack_from("<H", tokens, pos + 1)
+        if function_id & 0x8000:
+            raise FormulaError("宏表函数")
+        name, _ = _function(function_id)
+        _call(stack, name, argc)
+        return pos + 3
+    if base in (0x24, 0x2C):
+        row, col = struct.unpack_from("<HH", tokens, pos)
+        stack.append(_reference(row, col, base_row, base_col, shared or base == 0x2C))
+        return pos + 4
+    if base in (0x25, 0x2D):
+        first_row, last_row, first_col, last_col = struct.unpack_from("<HHHH", tokens, pos)
+        relative = shared or base == 0x2D
+        stack.append(_reference(first_row, first_col, base_row, base_col, relative) + ":"
+                     + _reference(last_row, last_col, base_row, base_col, relative))
+        return pos + 8
+    if base in (0x26, 0x27, 0x28, 0x2E, 0x2F):
+        # PtgMem*：后面紧跟的子表达式照常计算，这里只跳过头部
+        return pos + 6
+    if base == 0x29:
+        return pos + 2
+    if base == 0x2A:
+        stack.append("#REF!")
+        return pos + 4
+    if base == 0x2B:
+        stack.append("#REF!")
+        return pos + 8
+    if base == 0x3A:
+        ixti, row, col = struct.unpack_from("<HHH", tokens, pos)
+        prefix = _sheet_prefix(context, ixti)
+        stack.append("#REF!" if prefix is None else prefix + _reference(row, col, base_row, base_col, shared))
+        return pos + 6
+    if base == 0x3B:
+        ixti, first_row, last_row, first_col, last_col = struct.unpack_from("<HHHHH", tokens, pos)
+        prefix = _sheet_prefix(context, ixti)
+        if prefix is None:
+            stack.append("#REF!")
+        else:
+            stack.append(prefix + _reference(first_row, first_col, base_row, base_col, shared) + ":"
+                         + _reference(last_row, last_col, base_row, base_col, shared))
+        return pos + 10
+    if base == 0x3C:
+        stack.append("#REF!")
+        return pos + 6
+    if base == 0x3D:
+        stack.append("#REF!")
+        return pos + 10
+    raise FormulaError(f"不支持的记号 {base:#04x}")
+
+
+def _function(function_id):
+    entry = FUNCTIONS.get(function_id)
+    if entry is None:
+        raise FormulaError(f"不支持的函数编号 {function_id}")
+    return entry
+
+
+def _call(stack, name, argc):
+    if argc:
+        args = stack[-argc:]
+        del stack[-argc:]
+    else:
+        args = []
+    if len(args) != argc:
+        raise FormulaError("函数参数不足")
+    stack.append(f"{name}({','.join(args)})")
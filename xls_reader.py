@@ -0,0 +1,610 @@
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+from ole_reader import OleFile
+from xls_formula import FormulaContext, FormulaError, cell_reference, decompile
+
+# 读取 BIFF8（Excel 97-2003）工作簿，供内置的 XLS → XLSX 引擎使用。
+# 保留单元格值、共享字符串、数字格式、字体/填充/边框/对齐、合并单元格、列宽行高和多个工作表；
+# 遇到图形、批注、条件格式等内置引擎无法保留的内容时抛出 UnsupportedFeature，由 Office 转换。
+# 工作表单元格不整体读入内存，而是按行块（DBCELL）逐行产出，供写入端边读边写。
+
+
+class UnsupportedFeature(Exception):
+    """工作簿包含内置引擎不支持的内容，需要交给 Office 转换"""
+
+
+class BiffFormatError(Exception):
+    """工作簿流结构损坏"""
+
+
+# 记录类型
+RT_FORMULA = 0x0006
+RT_EOF = 0x000A
+RT_CONTINUE = 0x003C
+RT_EXTERNSHEET = 0x0017
+RT_NAME = 0x0018
+RT_DATEMODE = 0x0022
+RT_FILEPASS = 0x002F
+RT_FONT = 0x0031
+RT_COLINFO = 0x007D
+RT_BOUNDSHEET = 0x0085
+RT_PALETTE = 0x0092
+RT_MULRK = 0x00BD
+RT_MULBLANK = 0x00BE
+RT_XF = 0x00E0
+RT_MERGEDCELLS = 0x00E5
+RT_DBCELL = 0x00D7
+RT_SST = 0x00FC
+RT_LABELSST = 0x00FD
+RT_SUPBOOK = 0x01AE
+RT_DIMENSIONS = 0x0200
+RT_BLANK = 0x0201
+RT_NUMBER = 0x0203
+RT_LABEL = 0x0204
+RT_BOOLERR = 0x0205
+RT_STRING = 0x0207
+RT_ROW = 0x0208
+RT_RK = 0x027E
+RT_FORMAT = 0x041E
+RT_SHRFMLA = 0x04BC
+RT_BOF = 0x0809
+
+BIFF8_VERSION = 0x0600
+BOF_WORKSHEET = 0x0010
+
+# 单元格记录
+CELL_RECORDS = frozenset((
+    RT_NUMBER, RT_RK, RT_MULRK, RT_LABELSST, RT_LABEL, RT_BOOLERR, RT_BLANK, RT_MULBLANK, RT_FORMULA,
+))
+
+# 没有 DBCELL 记录（非 Excel 生成的文件）时，缓存超过该行数即输出已完整的行
+ROW_BLOCK_SIZE = 32
+
+# 内存中的共享字符串超过该字节数后，其余字符串写入临时文件
+SST_SPILL_BYTES = 32 * 1024 * 1024
+
+# 内置引擎无法保留、需要交给 Office 的记录
+UNSUPPORTED_RECORDS = {
+    0x001C: "批注",
+    0x005D: "图形对象",
+    0x009D: "自动筛选",
+    0x00B0: "数据透视表",
+    0x00EB: "图形对象",
+    0x00EC: "图形对象",
+    0x01B0: "条件格式",
+    0x01B2: "数据有效性",
+    0x01B6: "文本框",
+    0x01B8: "超链接",
+    0x0221: "数组公式",
+    0x0236: "模拟运算表",
+}
+
+# 单元格类型
+CELL_NUMBER = "n"
+CELL_SHARED_STRING = "s"
+CELL_TEXT = "str"
+CELL_BOOL = "b"
+CELL_ERROR = "e"
+CELL_BLANK = ""
+
+Cell = namedtuple("Cell", ["col", "kind", "value", "xf", "formula"])
+Font = namedtuple("Font", ["name", "height", "bold", "italic", "underline", "strike", "color", "script"])
+CellFormat = namedtuple("CellFormat", [
+    "font", "num_format", "horizontal", "vertical", "wrap", "indent", "rotation", "shrink",
+    "border_styles", "border_colors", "pattern", "fore_color", "back_color", "locked", "hidden",
+])
+ColumnInfo = namedtuple("ColumnInfo", ["first", "last", "width", "xf", "hidden"])
+RowInfo = namedtuple("RowInfo", ["height", "custom_height", "hidden", "xf"])
+
+ERROR_CODES = {
+    0x00: "#NULL!",
+    0x07: "#DIV/0!",
+    0x0F: "#VALUE!",
+    0x17: "#REF!",
+    0x1D: "#NAME?",
+    0x24: "#NUM!",
+    0x2A: "#N/A",
+}
+
+# BIFF8 默认调色板，索引 8-63（索引 0-7 与 8-15 相同）
+DEFAULT_PALETTE = [
+    "000000", "FFFFFF", "FF0000", "00FF00", "0000FF", "FFFF00", "FF00FF", "00FFFF",
+    "800000", "008000", "000080", "808000", "800080", "008080", "C0C0C0", "808080",
+    "9999FF", "993366", "FFFFCC", "CCFFFF", "660066", "FF8080", "0066CC", "CCCCFF",
+    "000080", "FF00FF", "FFFF00", "00FFFF", "800080", "800000", "008080", "0000FF",
+    "00CCFF", "CCFFFF", "CCFFCC", "FFFF99", "99CCFF", "FF99CC", "CC99FF", "FFCC99",
+    "3366FF", "33CCCC", "99CC00", "FFCC00", "FF9900", "FF6600", "666699", "969696",
+    "003366", "339966", "003300", "333300", "993300", "993366", "333399", "333333",
+]
+
+
+class SharedStringTable:
+    """共享字符串表
+
+    内存中的字符串（按 sys.getsizeof 计）达到 spill_bytes 后，其余依次写入临时文件，
+    只支持按顺序遍历（写入 sharedStrings.xml 时使用）。
+    """
+
+    def __init__(self, spill_bytes=None):
+        self.spill_bytes = SST_SPILL_BYTES if spill_bytes is None else spill_bytes
+        self._strings = []
+        self._bytes = 0
+        self._count = 0
+        self._spill = None
+
+    def append(self, text):
+        self._count += 1
+        if self._spill is None and self._bytes < self.spill_bytes:
+            self._strings.append(text)
+            self._bytes += sys.getsizeof(text)
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile()
+        data = text.encode("utf-8")
+        self._spill.write(struct.pack("<I", len(data)) + data)
+
+    @property
+    def spilled(self):
+        return self._spill is not None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        yield from self._strings
+        if self._spill is None:
+            return
+        self._spill.flush()
+        self._spill.seek(0)
+        for _ in range(self._count - len(self._strings)):
+            length, = struct.unpack("<I", self._spill.read(4))
+            yield self._spill.read(length).decode("utf-8")
+        self._spill.seek(0, 2)
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class Worksheet:
+    """工作表：列宽、合并单元格等在打开工作簿时读取，单元格通过 iter_rows 逐行读取"""
+
+    def __init__(self, book, name, state, stream, position):
+        self.book = book
+        self.name = name
+        self.state = state
+        self.columns = []
+        self.merged = []
+        # (首行, 末行+1, 首列, 末列+1)，来自 DIMENSIONS 记录
+        self.dimension = None
+        self._stream = stream
+        self._position = position
+        self._shared_formulas = {}
+        self._scan()
+
+    def release(self):
+        self._stream = None
+        self._shared_formulas = {}
+
+    def _scan(self):
+        """遍历一遍记录头：检查不支持的内容，读取列信息、合并单元格和共享公式"""
+        records = _iter_records(self._stream, self._position)
+        record_type, data, _ = next(records, (None, b"", 0))
+        if record_type != RT_BOF:
+            raise BiffFormatError(f"工作表 {self.name} 的位置无效")
+        if struct.unpack_from("<H", data, 2)[0] != BOF_WORKSHEET:
+            raise UnsupportedFeature("包含非普通工作表")
+        for record_type, data, _ in records:
+            if record_type == RT_EOF:
+                break
+            if record_type in UNSUPPORTED_RECORDS:
+                raise UnsupportedFeature(UNSUPPORTED_RECORDS[record_type])
+            if record_type == RT_BOF:
+                raise UnsupportedFeature("包含嵌入图表")
+            if record_type == RT_SHRFMLA:
+                first_row, last_row, first_col, last_col = struct.unpack_from("<HHBB", data, 0)
+                formula_size, = struct.unpack_from("<H", data, 8)
+                self._shared_formulas[(first_row, first_col)] = data[10:10 + formula_size]
+            elif record_type == RT_MERGEDCELLS:
+                count, = struct.unpack_from("<H", data, 0)
+                for i in range(count):
+                    self.merged.append(struct.unpack_from("<HHHH", data, 2 + i * 8))
+            elif record_type == RT_COLINFO:
+                first, last, width, xf, flags = struct.unpack_from("<HHHHH", data, 0)
+                self.columns.append(ColumnInfo(first, last, width / 256.0, xf, bool(flags & 0x01)))
+            elif record_type == RT_DIMENSIONS:
+                self.dimension = struct.unpack_from("<IIHH", data, 0)
+
+    def iter_rows(self):
+        """按行号顺序产出 (行号, RowInfo 或 None, 按列排序的单元格列表)
+
+        只缓存当前行块（Excel 以 DBCELL 结束每 32 行）的单元格，内存占用与工作表大小无关。
+        """
+        book = self.book
+        context = FormulaContext(book.sheet_names, book.external_sheets, book.supbooks)
+        rows = {}
+        row_info = {}
+        flushed_row = -1
+        pending_string = None
+
+        def add_cell(row, cell):
+            if row <= flushed_row:
+                raise UnsupportedFeature("单元格记录未按行排列")
+            rows.setdefault(row, []).append(cell)
+
+        def flush(before=None):
+            nonlocal flushed_row
+            ready = {row for row in rows if before is None or row < before}
+            ready.update(row for row, info in row_info.items()
+                         if (before is None or row < before) and (info.custom_height or info.hidden))
+            for row in sorted(ready):
+                cells = rows.pop(row, [])
+                cells.sort(key=lambda cell: cell.col)
+                yield row, row_info.pop(row, None), cells
+                flushed_row = row
+            if before is None:
+                row_info.clear()
+
+        records = _iter_records(self._stream, self._position)
+        next(records)
+        for record_type, data, _ in records:
+            if pending_string is not None and record_type not in (RT_STRING, RT_CONTINUE, RT_SHRFMLA):
+                # 公式结果为字符串却没有 STRING 记录
+                pending_string = None
+            if record_type == RT_EOF:
+                break
+            if record_type not in CELL_RECORDS:
+                if record_type == RT_DBCELL:
+                    yield from flush()
+                elif record_type == RT_STRING and pending_string is not None:
+                    row, index = pending_string
+                    cell = rows[row][index]
+                    rows[row][index] = cell._replace(value=_unicode_string(data, 0)[0])
+                    pending_string = None
+                elif record_type == RT_ROW:
+                    row, _, _, height = struct.unpack_from("<HHHH", data, 0)
+                    flags, = struct.unpack_from("<I", data, 12)
+                    if row <= flushed_row:
+                        raise UnsupportedFeature("行记录未按顺序排列")
+                    row_info[row] = RowInfo(
+                        (height & 0x7FFF) / 20.0, bool(flags & 0x40), bool(flags & 0x20),
+                        (flags >> 16) & 0x0FFF if flags & 0x80 else None)
+                continue
+
+            row, = struct.unpack_from("<H", data, 0)
+            if len(rows) > ROW_BLOCK_SIZE and row not in rows:
+                yield from flush(before=row)
+            if record_type == RT_NUMBER:
+                row, col, xf, value = struct.unpack_from("<HHHd", data, 0)
+                add_cell(row, Cell(col, CELL_NUMBER, value, xf, None))
+            elif record_type == RT_RK:
+                row, col, xf, rk = struct.unpack_from("<HHHI", data, 0)
+                add_cell(row, Cell(col, CELL_NUMBER, decode_rk(rk), xf, None))
+            elif record_type == RT_MULRK:
+                row, first_col = struct.unpack_from("<HH", data, 0)
+                for i in range((len(data) - 6) // 6):
+                    xf, rk = struct.unpack_from("<HI", data, 4 + i * 6)
+                    add_cell(row, Cell(first_col + i, CELL_NUMBER, decode_rk(rk), xf, None))
+            elif record_type == RT_LABELSST:
+                row, col, xf, index = struct.unpack_from("<HHHI", data, 0)
+                add_cell(row, Cell(col, CELL_SHARED_STRING, index, xf, None))
+            elif record_type == RT_LABEL:
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                add_cell(row, Cell(col, CELL_TEXT, _unicode_string(data, 6)[0], xf, None))
+            elif record_type == RT_BOOLERR:
+                row, col, xf, value, is_error = struct.unpack_from("<HHHBB", data, 0)
+                if is_error:
+                    add_cell(row, Cell(col, CELL_ERROR, ERROR_CODES.get(value, "#N/A"), xf, None))
+                else:
+                    add_cell(row, Cell(col, CELL_BOOL, bool(value), xf, None))
+            elif record_type == RT_BLANK:
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                add_cell(row, Cell(col, CELL_BLANK, None, xf, None))
+            elif record_type == RT_MULBLANK:
+                row, first_col = struct.unpack_from("<HH", data, 0)
+                for i in range((len(data) - 6) // 2):
+                    xf, = struct.unpack_from("<H", data, 4 + i * 2)
+                    add_cell(row, Cell(first_col + i, CELL_BLANK, None, xf, None))
+            elif record_type == RT_FORMULA:
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                result = data[6:14]
+                formula_size, = struct.unpack_from("<H", data, 20)
+                formula = self._formula_text(data[22:22 + formula_size], context, row, col)
+                if result[6:8] == b"\xff\xff":
+                    result_type = result[0]
+                    if result_type == 0:
+                        cell = Cell(col, CELL_TEXT, "", xf, formula)
+                        pending_string = (row, len(rows.get(row, ())))
+                    elif result_type == 1:
+                        cell = Cell(col, CELL_BOOL, bool(result[2]), xf, formula)
+                    elif result_type == 2:
+                        cell = Cell(col, CELL_ERROR, ERROR_CODES.get(result[2], "#N/A"), xf, formula)
+                    else:
+                        cell = Cell(col, CELL_TEXT, "", xf, formula)
+                else:
+                    cell = Cell(col, CELL_NUMBER, struct.unpack("<d", result)[0], xf, formula)
+                add_cell(row, cell)
+        yield from flush()
+
+    def _formula_text(self, tokens, context, row, col):
+        # 共享公式的 SHRFMLA 记录在打开工作表时已经读取
+        try:
+            if tokens[:1] == b"\x01" and len(tokens) >= 5:
+                anchor = struct.unpack_from("<HH", tokens, 1)
+                shared = self._shared_formulas.get(anchor)
+                if shared is None:
+                    raise UnsupportedFeature("数组公式或模拟运算表")
+                return decompile(shared, context, row, col, shared=True)
+            return decompile(tokens, context, row, col)
+        except FormulaError as e:
+            raise UnsupportedFeature(f"公式 {cell_reference(row, col)}: {e}")
+
+
+class Workbook:
+    def __init__(self):
+        self.sheets = []
+        self.shared_strings = SharedStringTable()
+        self.formats = {}
+        self.fonts = []
+        self.cell_formats = []
+        self.palette = list(DEFAULT_PALETTE)
+        self.date1904 = False
+        self.sheet_names = []
+        self.external_sheets = []
+        self.supbooks = []
+        # 文档摘要信息（标题、作者等），来自 OLE2 的 SummaryInformation 流
+        self.properties = {}
+
+    def close(self):
+        self.shared_strings.close()
+        # 释放对映射内存的引用，之后 OleFile 才能关闭映射
+        for sheet in self.sheets:
+            sheet.release()
+
+    def color(self, index):
+        """调色板索引 → RGB 十六进制；系统颜色（自动）返回 None"""
+        if index < 8:
+            return DEFAULT_PALETTE[index]
+        if index - 8 < len(self.palette):
+            return self.palette[index - 8]
+        return None
+
+
+def _iter_records(stream, offset=0):
+    """依次产出 (记录类型, 记录数据, 记录起始偏移)"""
+    size = len(stream)
+    while offset + 4 <= size:
+        record_type, length = struct.unpack_from("<HH", stream, offset)
+        data = stream[offset + 4:offset + 4 + length]
+        if len(data) < length:
+            raise BiffFormatError("记录超出工作簿流末尾")
+        yield record_type, data, offset
+        offset += 4 + length
+
+
+class _ContinuedReader:
+    """读取跨越 CONTINUE 记录的数据
+
+    字符串的字符部分在记录边界处被截断时，下一段以一个字节的编码标志开头。
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.index = 0
+        self.pos = 0
+
+    def _advance(self):
+        self.index += 1
+        self.pos = 0
+        if self.index >= len(self.chunks):
+            raise BiffFormatError("字符串数据不完整")
+
+    def read(self, count):
+        parts = []
+        while count > 0:
+            chunk = self.chunks[self.index]
+            if self.pos >= len(chunk):
+                self._advance()
+                continue
+            part = chunk[self.pos:self.pos + count]
+            self.pos += len(part)
+            count -= len(part)
+            parts.append(part)
+        return b"".join(parts)
+
+    def read_chars(self, count, high_byte):
+        parts = []
+        while count > 0:
+            chunk = self.chunks[self.index]
+            if self.pos >= len(chunk):
+                self._advance()
+                high_byte = self.chunks[self.index][0] & 0x01
+                self.pos = 1
+                continue
+            width = 2 if high_byte else 1
+            available = min(count, (len(chunk) - self.pos) // width)
+            raw = chunk[self.pos:self.pos + available * width]
+            parts.append(str(raw, "utf-16-le" if high_byte else "latin-1"))
+            self.pos += available * width
+            count -= available
+        return "".join(parts)
+
+    def read_unicode_string(self):
+        """XLUnicodeRichExtendedString"""
+        count, flags = struct.unpack("<HB", self.read(3))
+        runs = struct.unpack("<H", self.read(2))[0] if flags & 0x08 else 0
+        ext_size = struct.unpack("<I", self.read(4))[0] if flags & 0x04 else 0
+        text = self.read_chars(count, flags & 0x01)
+        self.read(runs * 4 + ext_size)
+        return text
+
+
+def _unicode_string(data, offset, length_size=2):
+    """XLUnicodeString / ShortXLUnicodeString，返回 (文本, 结束偏移)"""
+    if length_size == 1:
+        count = data[offset]
+    else:
+        count, = struct.unpack_from("<H", data, offset)
+    flags = data[offset + length_size]
+    offset += length_size + 1
+    if flags & 0x08:
+        runs, = struct.unpack_from("<H", data, offset)
+        offset += 2
+    else:
+        runs = 0
+    if flags & 0x04:
+        ext_size, = struct.unpack_from("<I", data, offset)
+        offset += 4
+    else:
+        ext_size = 0
+    if flags & 0x01:
+        text = str(data[offset:offset + count * 2], "utf-16-le")
+        offset += count * 2
+    else:
+        text = str(data[offset:offset + count], "latin-1")
+        offset += count
+    return text, offset + runs * 4 + ext_size
+
+
+def decode_rk(rk):
+    if rk & 0x02:
+        value = rk >> 2
+        if value & 0x20000000:
+            value -= 0x40000000
+    else:
+        value, = struct.unpack("<d", struct.pack("<Q", (rk & 0xFFFFFFFC) << 32))
+    if rk & 0x01:
+        value /= 100
+    return value
+
+
+@contextmanager
+def open_workbook(path):
+    """打开 .xls 文件，产出 Workbook
+
+    工作表单元格在遍历 iter_rows 时才从映射的工作簿流中读取，因此只能在 with 块内使用。
+    """
+    with OleFile(path) as ole:
+        if ole.exists("_VBA_PROJECT_CUR"):
+            raise UnsupportedFeature("包含宏")
+        if not ole.exists("Workbook"):
+            if ole.exists("Book"):
+                raise UnsupportedFeature("Excel 5.0/95 格式")
+            raise BiffFormatError("没有工作簿流")
+        book = _parse_workbook(ole.read_stream("Workbook"))
+        book.properties = ole.summary_information()
+        try:
+            yield book
+        finally:
+            book.close()
+
+
+def _parse_workbook(stream):
+    book = Workbook()
+    sheet_entries = []
+    records = _iter_records(stream)
+    first = True
+    pending_sst = None
+    for record_type, data, _ in records:
+        if pending_sst is not None:
+            if record_type == RT_CONTINUE:
+                pending_sst.append(data)
+                continue
+            _parse_sst(book, pending_sst)
+            pending_sst = None
+        if first:
+            if record_type != RT_BOF:
+                raise BiffFormatError("工作簿流不以 BOF 开头")
+            version, = struct.unpack_from("<H", data, 0)
+            if version != BIFF8_VERSION:
+                raise UnsupportedFeature("不是 BIFF8 工作簿")
+            first = False
+            continue
+        if record_type == RT_EOF:
+            break
+        if record_type in UNSUPPORTED_RECORDS:
+            raise UnsupportedFeature(UNSUPPORTED_RECORDS[record_type])
+        if record_type == RT_FILEPASS:
+            raise UnsupportedFeature("工作簿已加密")
+        if record_type == RT_SST:
+            pending_sst = [data]
+        elif record_type == RT_FORMAT:
+            format_id, = struct.unpack_from("<H", data, 0)
+            book.formats[format_id] = _unicode_string(data, 2)[0]
+        elif record_type == RT_FONT:
+            book.fonts.append(_parse_font(data))
+            if len(book.fonts) == 4:
+                # 字体索引 4 不存在，占位使后续索引与 XF 中的 ifnt 一致
+                book.fonts.append(book.fonts[0])
+        elif record_type == RT_XF:
+            book.cell_formats.append(_parse_xf(data))
+        elif record_type == RT_PALETTE:
+            count, = struct.unpack_from("<H", data, 0)
+            for i in range(min(count, len(book.palette))):
+                r, g, b = data[2 + i * 4:5 + i * 4]
+                book.palette[i] = f"{r:02X}{g:02X}{b:02X}"
+        elif record_type == RT_DATEMODE:
+            book.date1904 = struct.unpack_from("<H", data, 0)[0] == 1
+        elif record_type == RT_BOUNDSHEET:
+            position, state, sheet_type = struct.unpack_from("<IBB", data, 0)
+            name = _unicode_string(data, 6, length_size=1)[0]
+            if sheet_type != 0:
+                raise UnsupportedFeature("包含图表工作表或宏表")
+            sheet_entries.append((position, name, state & 0x03))
+            book.sheet_names.append(name)
+        elif record_type == RT_SUPBOOK:
+            # 自引用的 SUPBOOK 数据为 ctab + 0x0401
+            book.supbooks.append(len(data) == 4 and data[2:4] == b"\x01\x04")
+        elif record_type == RT_EXTERNSHEET:
+            count, = struct.unpack_from("<H", data, 0)
+            book.external_sheets = [struct.unpack_from("<HHH", data, 2 + i * 6) for i in range(count)]
+    if pending_sst is not None:
+        _parse_sst(book, pending_sst)
+
+    for position, name, state in sheet_entries:
+        book.sheets.append(Worksheet(book, name, state, stream, position))
+    return book
+
+
+def _parse_sst(book, chunks):
+    _, unique_count = struct.unpack_from("<II", chunks[0], 0)
+    chunks[0] = chunks[0][8:]
+    reader = _ContinuedReader(chunks)
+    for _ in range(unique_count):
+        book.shared_strings.append(reader.read_unicode_string())
+
+
+def _parse_font(data):
+    height, flags, color, weight, script, underline = struct.unpack_from("<HHHHHB", data, 0)
+    name = _unicode_string(data, 14, length_size=1)[0]
+    return Font(name, height / 20.0, weight >= 700, bool(flags & 0x02), underline,
+                bool(flags & 0x08), color, script)
+
+
+def _parse_xf(data):
+    font, num_format, protection, alignment, rotation, misc = struct.unpack_from("<HHHBBB", data, 0)
+    border1, border2, fill = struct.unpack_from("<IIH", data, 10)
+    border_styles = (border1 & 0x0F, (border1 >> 4) & 0x0F, (border1 >> 8) & 0x0F, (border1 >> 12) & 0x0F)
+    border_colors = ((border1 >> 16) & 0x7F, (border1 >> 23) & 0x7F, border2 & 0x7F, (border2 >> 7) & 0x7F)
+    return CellFormat(
+        font=font,
+        num_format=num_format,
+        horizontal=alignment & 0x07,
+        vertical=(alignment >> 4) & 0x07,
+        wrap=bool(alignment & 0x08),
+        indent=misc & 0x0F,
+        rotation=rotation,
+        shrink=bool(misc & 0x10),
+        border_styles=border_styles,
+        border_colors=border_colors,
+        pattern=(border2 >> 26) & 0x3F,
+        fore_color=fill & 0x7F,
+        back_color=(fill >> 7) & 0x7F,
+        locked=bool(protection & 0x01),
+        hidden=bool(protection & 0x02),
+    )
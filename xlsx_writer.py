@@ -0,0 +1,321 @@
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from ooxml_package import CORE_PROPERTIES_REL, CORE_PROPERTIES_TYPE, core_properties_xml
+from xls_formula import cell_reference
+from xls_reader import (
+    CELL_BLANK,
+    CELL_BOOL,
+    CELL_ERROR,
+    CELL_NUMBER,
+    CELL_SHARED_STRING,
+    CELL_TEXT,
+)
+
+# 把 xls_reader 读出的 Workbook 写成 XLSX 包，每个工作表逐行写入 ZIP 条目。
+# 共享字符串表可能已溢出到临时文件，在所有工作表之后顺序写出。
+
+SHEET_STATES = {1: "hidden", 2: "veryHidden"}
+
+HORIZONTAL_ALIGNMENTS = {1: "left", 2: "center", 3: "right", 4: "fill", 5: "justify", 6: "centerContinuous", 7: "distributed"}
+VERTICAL_ALIGNMENTS = {0: "top", 1: "center", 3: "justify", 4: "distributed"}
+
+BORDER_STYLES = [
+    None, "thin", "medium", "dashed", "dotted", "thick", "double", "hair",
+    "mediumDashed", "dashDot", "mediumDashDot", "dashDotDot", "mediumDashDotDot", "slantDashDot",
+]
+
+FILL_PATTERNS = [
+    "none", "solid", "mediumGray", "darkGray", "lightGray", "darkHorizontal", "darkVertical",
+    "darkDown", "darkUp", "darkGrid", "darkTrellis", "lightHorizontal", "lightVertical",
+    "lightDown", "lightUp", "lightGrid", "lightTrellis", "gray125", "gray0625",
+]
+
+UNDERLINE_STYLES = {0x01: "single", 0x02: "double", 0x21: "singleAccounting", 0x22: "doubleAccounting"}
+
+# 单元格（或共享字符串）数量达到该值的条目按 ZIP64 写入
+ZIP64_CELL_COUNT = 4 * 1024 * 1024
+
+# XLSX 中自定义数字格式的编号从 164 开始
+FIRST_CUSTOM_NUM_FORMAT = 164
+
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+
+ROOT_RELS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+)
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def _xml_text(text):
+    """转义 XML 特殊字符，XML 不允许的控制字符按 _xHHHH_ 形式写入"""
+    text = escape(text.replace("_x", "_x005F_x")) if "_x" in text else escape(text)
+    return _INVALID_XML_CHARS.sub(lambda m: f"_x{ord(m.group()):04X}_", text)
+
+
+def _preserve(text):
+    return ' xml:space="preserve"' if text[:1].isspace() or text[-1:].isspace() else ""
+
+
+def _number(value):
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def write_workbook(book, target_path):
+    with zipfile.ZipFile(target_path, "w", zipfile.ZIP_DEFLATED) as package:
+        sheet_count = len(book.sheets)
+        properties = getattr(book, "properties", None)
+        package.writestr("[Content_Types].xml", CONTENT_TYPES_HEAD + "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, sheet_count + 1)
+        ) + (CORE_PROPERTIES_TYPE if properties else "") + "</Types>")
+        package.writestr("_rels/.rels", ROOT_RELS_HEAD + (CORE_PROPERTIES_REL if properties else "") + "</Relationships>")
+        if properties:
+            package.writestr("docProps/core.xml", core_properties_xml(properties))
+        package.writestr("xl/workbook.xml", _workbook_xml(book))
+        package.writestr("xl/_rels/workbook.xml.rels", _workbook_rels(sheet_count))
+        package.writestr("xl/styles.xml", _styles_xml(book))
+        for index, sheet in enumerate(book.sheets, 1):
+            _write_sheet(package, f"xl/worksheets/sheet{index}.xml", book, sheet)
+        _write_shared_strings(package, book.shared_strings)
+
+
+def _workbook_xml(book):
+    sheets = []
+    for index, sheet in enumerate(book.sheets, 1):
+        state = SHEET_STATES.get(sheet.state)
+        state_attr = f' state="{state}"' if state else ""
+        sheets.append(f'<sheet name="{_xml_text(sheet.name)}" sheetId="{index}"{state_attr} r:id="rId{index}"/>')
+    date1904 = ' date1904="1"' if book.date1904 else ""
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+        f'<workbookPr{date1904}/><bookViews><workbookView/></bookViews>'
+        f'<sheets>{"".join(sheets)}</sheets></workbook>'
+    )
+
+
+def _workbook_rels(sheet_count):
+    rels = [
+        f'<Relationship Id="rId{i}" Type="{REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, sheet_count + 1)
+    ]
+    rels.append(f'<Relationship Id="rId{sheet_count + 1}" Type="{REL_NS}/styles" Target="styles.xml"/>')
+    rels.append(f'<Relationship Id="rId{sheet_count + 2}" Type="{REL_NS}/sharedStrings" Target="sharedStrings.xml"/>')
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + "".join(rels) + "</Relationships>"
+    )
+
+
+def _write_shared_strings(package, strings):
+    with package.open("xl/sharedStrings.xml", "w", force_zip64=len(strings) >= ZIP64_CELL_COUNT) as part:
+        part.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<sst xmlns="{MAIN_NS}" count="{len(strings)}" uniqueCount="{len(strings)}">').encode("utf-8"))
+        for text in strings:
+            part.write(f"<si><t{_preserve(text)}>{_xml_text(text)}</t></si>".encode("utf-8"))
+        part.write(b"</sst>")
+
+
+def _color(book, index, tag="color"):
+    rgb = book.color(index)
+    return f'<{tag} rgb="FF{rgb}"/>' if rgb else ""
+
+
+def _styles_xml(book):
+    num_formats = {}
+    custom_ids = {}
+    for format_id, code in sorted(book.formats.items()):
+        custom_ids[format_id] = FIRST_CUSTOM_NUM_FORMAT + len(custom_ids)
+        num_formats[custom_ids[format_id]] = code
+
+    fonts = []
+    for font in book.fonts or []:
+        parts = []
+        if font.bold:
+            parts.append("<b/>")
+        if font.italic:
+            parts.append("<i/>")
+        if font.strike:
+            parts.append("<strike/>")
+        underline = UNDERLINE_STYLES.get(font.underline)
+        if underline:
+            parts.append("<u/>" if underline == "single" else f'<u val="{underline}"/>')
+        if font.script in (1, 2):
+            parts.append(f'<vertAlign val="{"superscript" if font.script == 1 else "subscript"}"/>')
+        parts.append(f'<sz val="{_number(font.height)}"/>')
+        parts.append(_color(book, font.color))
+        parts.append(f'<name val="{_xml_text(font.name)}"/>')
+        fonts.append(f"<font>{''.join(parts)}</font>")
+    if not fonts:
+        fonts.append('<font><sz val="11"/><name val="Calibri"/></font>')
+
+    fills = ['<fill><patternFill patternType="none"/></fill>', '<fill><patternFill patternType="gray125"/></fill>']
+    fill_ids = {}
+    borders = ["<border><left/><right/><top/><bottom/><diagonal/></border>"]
+    border_ids = {}
+    cell_xfs = []
+    for xf in book.cell_formats:
+        fill_id = 0
+        if xf.pattern:
+            pattern = FILL_PATTERNS[xf.pattern] if xf.pattern < len(FILL_PATTERNS) else "solid"
+            fill = (f'<fill><patternFill patternType="{pattern}">'
+                    f'{_color(book, xf.fore_color, "fgColor")}{_color(book, xf.back_color, "bgColor")}'
+                    '</patternFill></fill>')
+            fill_id = fill_ids.get(fill)
+            if fill_id is None:
+                fill_id = fill_ids[fill] = len(fills)
+                fills.append(fill)
+
+        border_id = 0
+        if any(xf.border_styles):
+            sides = []
+            for side, style, color in zip(("left", "right", "top", "bottom"), xf.border_styles, xf.border_colors):
+                style_name = BORDER_STYLES[style] if style < len(BORDER_STYLES) else "thin"
+                if style_name:
+                    sides.append(f'<{side} style="{style_name}">{_color(book, color)}</{side}>')
+                else:
+                    sides.append(f"<{side}/>")
+            border = f"<border>{''.join(sides)}<diagonal/></border>"
+            border_id = border_ids.get(border)
+            if border_id is None:
+                border_id = border_ids[border] = len(borders)
+                borders.append(border)
+
+        alignment = []
+        if xf.horizontal in HORIZONTAL_ALIGNMENTS:
+            alignment.append(f'horizontal="{HORIZONTAL_ALIGNMENTS[xf.horizontal]}"')
+        if xf.vertical in VERTICAL_ALIGNMENTS:
+            alignment.append(f'vertical="{VERTICAL_ALIGNMENTS[xf.vertical]}"')
+        if xf.wrap:
+            alignment.append('wrapText="1"')
+        if xf.indent:
+            alignment.append(f'indent="{xf.indent}"')
+        if xf.rotation:
+            alignment.append(f'textRotation="{xf.rotation}"')
+        if xf.shrink:
+            alignment.append('shrinkToFit="1"')
+        alignment_xml = f"<alignment {' '.join(alignment)}/>" if alignment else ""
+        protection_xml = ""
+        if not xf.locked or xf.hidden:
+            protection_xml = f'<protection locked="{int(xf.locked)}" hidden="{int(xf.hidden)}"/>'
+
+        num_format_id = custom_ids.get(xf.num_format, xf.num_format)
+        font_id = xf.font if xf.font < len(fonts) else 0
+        attributes = (f'numFmtId="{num_format_id}" fontId="{font_id}" fillId="{fill_id}" borderId="{border_id}" xfId="0"'
+                      ' applyNumberFormat="1" applyFont="1" applyFill="1" applyBorder="1"')
+        if alignment_xml:
+            attributes += ' applyAlignment="1"'
+        if protection_xml:
+            attributes += ' applyProtection="1"'
+        if alignment_xml or protection_xml:
+            cell_xfs.append(f"<xf {attributes}>{alignment_xml}{protection_xml}</xf>")
+        else:
+            cell_xfs.append(f"<xf {attributes}/>")
+    if not cell_xfs:
+        cell_xfs.append('<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>')
+
+    num_formats_xml = ""
+    if num_formats:
+        num_formats_xml = f'<numFmts count="{len(num_formats)}">' + "".join(
+            f'<numFmt numFmtId="{format_id}" formatCode="{_xml_text(code)}"/>'
+            for format_id, code in num_formats.items()
+        ) + "</numFmts>"
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<styleSheet xmlns="{MAIN_NS}">{num_formats_xml}'
+        f'<fonts count="{len(fonts)}">{"".join(fonts)}</fonts>'
+        f'<fills count="{len(fills)}">{"".join(fills)}</fills>'
+        f'<borders count="{len(borders)}">{"".join(borders)}</borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        f'<cellXfs count="{len(cell_xfs)}">{"".join(cell_xfs)}</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
+
+
+def _cell_xml(book, row, cell):
+    ref = cell_reference(row, cell.col)
+    style = f' s="{cell.xf}"' if 0 < cell.xf < len(book.cell_formats) else ""
+    formula = f"<f>{_xml_text(cell.formula)}</f>" if cell.formula else ""
+    kind = cell.kind
+    if kind == CELL_NUMBER:
+        return f'<c r="{ref}"{style}>{formula}<v>{_number(cell.value)}</v></c>'
+    if kind == CELL_SHARED_STRING:
+        return f'<c r="{ref}"{style} t="s"><v>{cell.value}</v></c>'
+    if kind == CELL_TEXT:
+        if formula:
+            return f'<c r="{ref}"{style} t="str">{formula}<v>{_xml_text(cell.value)}</v></c>'
+        return (f'<c r="{ref}"{style} t="inlineStr"><is><t{_preserve(cell.value)}>'
+                f'{_xml_text(cell.value)}</t></is></c>')
+    if kind == CELL_BOOL:
+        return f'<c r="{ref}"{style} t="b">{formula}<v>{int(cell.value)}</v></c>'
+    if kind == CELL_ERROR:
+        return f'<c r="{ref}"{style} t="e">{formula}<v>{cell.value}</v></c>'
+    if kind == CELL_BLANK and style:
+        return f'<c r="{ref}"{style}/>'
+    return ""
+
+
+def _write_sheet(package, part_name, book, sheet):
+    dimension = "A1"
+    cell_count = 0
+    if sheet.dimension and sheet.dimension[1] > sheet.dimension[0] and sheet.dimension[3] > sheet.dimension[2]:
+        first_row, end_row, first_col, end_col = sheet.dimension
+        dimension = f"{cell_reference(first_row, first_col)}:{cell_reference(end_row - 1, end_col - 1)}"
+        cell_count = (end_row - first_row) * (end_col - first_col)
+
+    # 大小未知的流式条目超过 2 GB 需要 ZIP64，只对可能这么大的工作表启用
+    with package.open(part_name, "w", force_zip64=cell_count >= ZIP64_CELL_COUNT) as part:
+        part.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+                    f'<dimension ref="{dimension}"/>').encode("utf-8"))
+        if sheet.columns:
+            columns = []
+            for info in sheet.columns:
+                hidden = ' hidden="1"' if info.hidden else ""
+                style = f' style="{info.xf}"' if 0 < info.xf < len(book.cell_formats) else ""
+                columns.append(f'<col min="{info.first + 1}" max="{min(info.last, 255) + 1}" '
+                               f'width="{info.width:.4g}" customWidth="1"{style}{hidden}/>')
+            part.write(f"<cols>{''.join(columns)}</cols>".encode("utf-8"))
+
+        # 单元格按行流式写入，内存中只保留读取端当前的行块
+        part.write(b"<sheetData>")
+        for row, info, cells in sheet.iter_rows():
+            attributes = f'r="{row + 1}"'
+            if info is not None:
+                if info.custom_height:
+                    attributes += f' ht="{_number(info.height)}" customHeight="1"'
+                if info.hidden:
+                    attributes += ' hidden="1"'
+                if info.xf is not None and 0 < info.xf < len(book.cell_formats):
+                    attributes += f' s="{info.xf}" customFormat="1"'
+            part.write(f"<row {attributes}>{''.join(_cell_xml(book, row, cell) for cell in cells)}</row>".encode("utf-8"))
+        part.write(b"</sheetData>")
+
+        if sheet.merged:
+            merged = "".join(
+                f'<mergeCell ref="{cell_reference(first_row, first_col)}:{cell_reference(last_row, last_col)}"/>'
+                for first_row, last_row, first_col, last_col in sheet.merged
+            )
+            part.write(f'<mergeCells count="{len(sheet.merged)}">{merged}</mergeCells>'.encode("utf-8"))
+        part.write(b"</worksheet>")